@@ -358,7 +358,9 @@ class CheckIn:
             包含 success 和 client_id 或 error 的字典
         """
         try:
-            response = session.get(self.provider_config.get_status_url(), headers=headers, timeout=30)
+            response = await asyncio.to_thread(
+                session.get, self.provider_config.get_status_url(), headers=headers, timeout=30
+            )
 
             if response.status_code == 200:
                 data = response_resolve(response, f"get_auth_client_id_{provider}", self.account_name)
@@ -511,7 +513,8 @@ class CheckIn:
             headers: 请求头
         """
         try:
-            response = session.get(
+            response = await asyncio.to_thread(
+                session.get,
                 self.provider_config.get_auth_state_url(),
                 headers=headers,
                 timeout=30,
@@ -672,7 +675,9 @@ class CheckIn:
     async def get_user_info(self, session: curl_requests.Session, headers: dict) -> dict:
         """获取用户信息"""
         try:
-            response = session.get(self.provider_config.get_user_info_url(), headers=headers, timeout=30)
+            response = await asyncio.to_thread(
+                session.get, self.provider_config.get_user_info_url(), headers=headers, timeout=30
+            )
 
             if response.status_code == 200:
                 json_data = response_resolve(response, "get_user_info", self.account_name)
@@ -887,7 +892,8 @@ class CheckIn:
             topup_count += 1
             print(f"💰 {self.account_name}: Executing topup #{topup_count} with CDK: {cdk}")
 
-            topup_result = topup(
+            topup_result = await asyncio.to_thread(
+                topup,
                 provider_config=self.provider_config,
                 account_config=self.account_config,
                 headers=topup_headers,
@@ -969,7 +975,8 @@ class CheckIn:
                 # 如果配置了签到状态查询，先检查是否已签到
                 check_in_status_func = self.provider_config.get_check_in_status_func()
                 if check_in_status_func:
-                    checked_in_today = check_in_status_func(
+                    checked_in_today = await asyncio.to_thread(
+                        check_in_status_func,
                         provider_config=self.provider_config,
                         account_config=self.account_config,
                         cookies=cookies,
@@ -979,11 +986,12 @@ class CheckIn:
                         print(f"ℹ️ {self.account_name}: Already checked in today, skipping check-in")
                     else:
                         # 未签到，执行签到
-                        check_in_result = self.execute_check_in(session, headers, api_user)
+                        check_in_result = await asyncio.to_thread(self.execute_check_in, session, headers, api_user)
                         if not check_in_result.get("success"):
                             return False, {"error": check_in_result.get("error", "Check-in failed")}
                         # 签到成功后再次查询状态（显示最新状态）
-                        check_in_status_func(
+                        await asyncio.to_thread(
+                            check_in_status_func,
                             provider_config=self.provider_config,
                             account_config=self.account_config,
                             cookies=cookies,
@@ -991,7 +999,7 @@ class CheckIn:
                         )
                 else:
                     # 没有配置签到状态查询函数，直接执行签到
-                    check_in_result = self.execute_check_in(session, headers, api_user)
+                    check_in_result = await asyncio.to_thread(self.execute_check_in, session, headers, api_user)
                     if not check_in_result.get("success"):
                         return False, {"error": check_in_result.get("error", "Check-in failed")}
             else:
@@ -1148,7 +1156,7 @@ class CheckIn:
                         print(f"ℹ️ {self.account_name}: Updating headers with OAuth browser fingerprint")
                         updated_headers.update(oauth_browser_headers)
 
-                    response = session.get(callback_url, headers=updated_headers, timeout=30)
+                    response = await asyncio.to_thread(session.get, callback_url, headers=updated_headers, timeout=30)
 
                     if response.status_code == 200:
                         json_data = response_resolve(response, "github_oauth_callback", self.account_name)
@@ -1311,7 +1319,7 @@ class CheckIn:
                         print(f"ℹ️ {self.account_name}: Updating headers with OAuth browser fingerprint")
                         updated_headers.update(oauth_browser_headers)
 
-                    response = session.get(callback_url, headers=updated_headers, timeout=30)
+                    response = await asyncio.to_thread(session.get, callback_url, headers=updated_headers, timeout=30)
 
                     if response.status_code == 200:
                         json_data = response_resolve(response, "linuxdo_oauth_callback", self.account_name)
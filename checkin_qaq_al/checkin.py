@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 """
 qaq.al 自动签到 - CheckIn 类
-PoW 签到流程: 获取 cf_clearance → 检查签到状态 → 获取挑战 → 计算 nonce → 提交签到
+PoW 签到流程: 获取 cf_clearance → 检查签到状态 → 获取挑战 → (无缓存时测算 HPS) → 计算 nonce → 提交签到
 """
 
+import asyncio
 import hashlib
+import json
+import os
+import platform
 import statistics
 import sys
+import threading
 import time
 from pathlib import Path
 
+import orjson
 from curl_cffi import requests as curl_requests
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,47 +23,72 @@ from utils.get_cf_clearance import get_cf_clearance
 from utils.get_headers import get_curl_cffi_impersonate
 from utils.http_utils import proxy_resolve, response_resolve
 
+try:
+    # 原生加速模块，构建方式见 checkin_qaq_al/setup.py
+    import qaq_pow
+except ImportError:
+    qaq_pow = None
+
+try:
+    # 无 C 编译器时的 JIT 回退，需要安装 numba 可选依赖（uv sync --extra numba）
+    import pow_numba
+except ImportError:
+    pow_numba = None
+
 BASE_URL = "https://sign.qaq.al"
 BENCH_ROUNDS = 3
 BENCH_DURATION_MS = 1200
+# 原生内核波动小，单轮时长可以更短
+NATIVE_BENCH_DURATION_MS = 400
+# HPS 只与机器和求解后端有关，缓存 7 天避免每次签到都重新测算
+HPS_CACHE_FILE = Path.home() / ".cache" / "qaq_al" / "hps.json"
+HPS_CACHE_TTL = 7 * 86400
+# 没有缓存时上报的估计 HPS，服务端据此给出难度，求解仍按实际难度进行
+DEFAULT_HPS_GUESS = 1_000_000
+# 纯 Python 求解的进度输出：每 4096 次迭代看一次时钟，至少间隔 1 秒输出
+PROGRESS_CHECK_MASK = 0xFFF
+PROGRESS_INTERVAL = 1.0
+
+# 多账号并发时只让一个线程测算，其余等待后直接命中缓存
+_hps_lock = threading.Lock()
+# 测算和 nonce 求解都会占满所有 CPU 核心，多账号并发时串行执行，只让浏览器/HTTP 阶段重叠，
+# 避免线程互相争抢导致求解变慢、打印的 H/s 失真，以及把偏低的测算结果写入缓存
+_pow_lock = threading.Lock()
 
 
 def count_leading_zero_bits(hash_bytes: bytes) -> int:
-    """计算哈希值的前导零位数"""
-    count = 0
-    for byte in hash_bytes:
-        if byte == 0:
-            count += 8
-        else:
-            b = byte
-            while (b & 0x80) == 0 and count < 256:
-                count += 1
-                b <<= 1
-            break
-    return count
+    """计算哈希值的前导零位数（全零时 bit_length() 为 0，结果为 256）"""
+    return 256 - int.from_bytes(hash_bytes, "big").bit_length()
 
 
 def benchmark_hps() -> int:
     """自动测算本机 HPS (Hashes Per Second)
 
-    执行 3 轮测试，每轮 1.2 秒，取中位数。
-    使用纯 Python hashlib SHA-256，与 WASM 算法一致。
+    执行 3 轮测试取中位数。已构建 qaq_pow 时使用与求解相同的原生内核（每轮 0.4 秒），
+    否则使用纯 Python hashlib SHA-256（每轮 1.2 秒），保证上报的 HPS 与实际求解速度一致。
     """
     print("⚙️ 正在测算本机算力 (HPS)...")
     challenge_prefix = b"benchmark:"
     samples = []
 
     for i in range(BENCH_ROUNDS):
-        nonce = 0
-        start = time.time()
-        end_time = start + BENCH_DURATION_MS / 1000
+        if qaq_pow:
+            hps = qaq_pow.benchmark(NATIVE_BENCH_DURATION_MS)
+        else:
+            nonce = 0
+            start = time.time()
+            end_time = start + BENCH_DURATION_MS / 1000
 
-        while time.time() < end_time:
-            hashlib.sha256(challenge_prefix + str(nonce).encode()).digest()
-            nonce += 1
+            prefix_hash = hashlib.sha256(challenge_prefix)
 
-        elapsed = time.time() - start
-        hps = round(nonce / elapsed) if elapsed > 0 else 0
+            while time.time() < end_time:
+                h = prefix_hash.copy()
+                h.update(str(nonce).encode())
+                h.digest()
+                nonce += 1
+
+            elapsed = time.time() - start
+            hps = round(nonce / elapsed) if elapsed > 0 else 0
         samples.append(hps)
         print(f"  第 {i + 1}/{BENCH_ROUNDS} 轮: {hps:,} H/s")
 
@@ -66,36 +97,116 @@ def benchmark_hps() -> int:
     return final_hps
 
 
-def calculate_nonce(challenge: str, difficulty: int) -> dict:
-    """计算满足难度要求的 nonce
+def pow_backend() -> str:
+    """当前 nonce 求解使用的后端名称"""
+    if qaq_pow:
+        return f"{qaq_pow.backend} x{qaq_pow.threads}"
+    if pow_numba:
+        return "numba"
+    return "python"
 
-    算法: SHA-256(challenge + ":" + str(nonce))，找到前导零位数 >= difficulty 的 nonce。
+
+def _hps_fingerprint() -> str:
+    """机器 + Python 版本 + 求解后端的指纹，任一变化都需要重新测算"""
+    raw = platform.machine() + platform.processor() + sys.version + pow_backend()
+    return hashlib.sha256(raw.encode()).hexdigest()[:12]
+
+
+def _load_hps_cache() -> dict:
+    try:
+        cache = json.loads(HPS_CACHE_FILE.read_text(encoding="utf-8"))
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cached_hps() -> int | None:
+    """读取未过期的缓存 HPS，没有时返回 None"""
+    entry = _load_hps_cache().get(_hps_fingerprint())
+    if isinstance(entry, dict) and time.time() - entry.get("ts", 0) < HPS_CACHE_TTL and entry.get("hps", 0) > 0:
+        return int(entry["hps"])
+    return None
+
+
+def get_hps() -> int:
+    """获取本机 HPS，优先读取缓存，缓存缺失或过期时测算并写回"""
+    with _hps_lock:
+        hps = load_cached_hps()
+        if hps:
+            print(f"⚙️ 使用缓存的本机算力: {hps:,} H/s")
+            return hps
+
+        with _pow_lock:
+            hps = benchmark_hps()
+        cache = _load_hps_cache()
+        cache[_hps_fingerprint()] = {"hps": hps, "ts": int(time.time())}
+        try:
+            # 先写临时文件再替换，避免中断时留下损坏的缓存
+            HPS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = HPS_CACHE_FILE.with_name(f"{HPS_CACHE_FILE.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(cache), encoding="utf-8")
+            os.replace(tmp_file, HPS_CACHE_FILE)
+        except OSError as e:
+            print(f"⚠️ 写入算力缓存失败: {e}")
+        return hps
+
+
+def _calculate_nonce_python(challenge_prefix: bytes, difficulty: int, start: float) -> tuple[int, bytes]:
+    """纯 Python 实现的 nonce 搜索，qaq_pow 和 numba 均不可用时使用
+
+    前缀只吸收一次，每个候选从其 copy() 出发（保留 midstate），无需重复压缩前缀也不必拼接字节串。
+    进度每 PROGRESS_CHECK_MASK + 1 次迭代检查一次时钟，至少间隔 PROGRESS_INTERVAL 秒输出一行。
     """
-    print(f"  开始计算 nonce (difficulty={difficulty})...")
-    challenge_prefix = (challenge + ":").encode()
+    prefix_hash = hashlib.sha256(challenge_prefix)
     nonce = 0
-    start = time.time()
-    last_report = 0
+    next_log_at = start + PROGRESS_INTERVAL
 
     while True:
-        hash_bytes = hashlib.sha256(challenge_prefix + str(nonce).encode()).digest()
+        h = prefix_hash.copy()
+        h.update(str(nonce).encode())
+        hash_bytes = h.digest()
         leading = count_leading_zero_bits(hash_bytes)
 
-        if nonce - last_report >= 100000:
-            last_report = nonce
-            elapsed = time.time() - start
-            hps = round(nonce / elapsed) if elapsed > 0 else 0
-            print(f"    进度: {nonce:,} | leading={leading} | {hps:,} H/s | {elapsed:.1f}s")
-
         if leading >= difficulty:
-            elapsed = time.time() - start
-            hps = round(nonce / elapsed) if elapsed > 0 else 0
-            print(f"  ✓ 找到 nonce={nonce}, leading={leading}, 耗时 {elapsed:.1f}s, {hps:,} H/s")
-            return {"nonce": nonce, "leading": leading, "hash": hash_bytes.hex(), "elapsed": round(elapsed, 1), "hps": hps}
+            return nonce, hash_bytes
+
+        if not nonce & PROGRESS_CHECK_MASK:
+            now = time.perf_counter()
+            if now >= next_log_at:
+                next_log_at = now + PROGRESS_INTERVAL
+                elapsed = now - start
+                print(f"    进度: {nonce:,} | leading={leading} | {round(nonce / elapsed):,} H/s | {elapsed:.1f}s")
 
         nonce += 1
 
 
+def calculate_nonce(challenge: str, difficulty: int) -> dict:
+    """计算满足难度要求的 nonce
+
+    算法: SHA-256(challenge + ":" + str(nonce))，找到前导零位数 >= difficulty 的 nonce。
+    优先使用 qaq_pow 原生模块，其次 numba JIT，最后回退到纯 Python 实现。
+    """
+    challenge_prefix = (challenge + ":").encode()
+
+    with _pow_lock:
+        print(f"  开始计算 nonce (difficulty={difficulty}, backend={pow_backend()})...")
+        start = time.perf_counter()
+
+        if qaq_pow:
+            nonce, hash_bytes = qaq_pow.find_nonce(challenge_prefix, difficulty, 0)
+        elif pow_numba:
+            nonce, hash_bytes = pow_numba.find_nonce(challenge_prefix, difficulty)
+        else:
+            nonce, hash_bytes = _calculate_nonce_python(challenge_prefix, difficulty, start)
+
+        elapsed = time.perf_counter() - start
+
+    leading = count_leading_zero_bits(hash_bytes)
+    hps = round((nonce + 1) / elapsed) if elapsed > 0 else 0
+    print(f"  ✓ 找到 nonce={nonce}, leading={leading}, 耗时 {elapsed:.1f}s, {hps:,} H/s")
+    return {"nonce": nonce, "leading": leading, "hash": hash_bytes.hex(), "elapsed": round(elapsed, 1), "hps": hps}
+
+
 class CheckIn:
     """qaq.al PoW 签到管理类"""
 
@@ -127,7 +238,7 @@ class CheckIn:
     def _build_session(
         self, sid: str, cf_cookies: dict | None, browser_headers: dict | None
     ) -> curl_requests.Session:
-        """创建带 cookie 和浏览器指纹的 session"""
+        """创建带 cookie 和浏览器指纹的 session（每个账号独立，并发账号之间互不阻塞、不串 cookie）"""
         # 根据浏览器指纹选择 impersonate
         impersonate = "chrome"
         if browser_headers and browser_headers.get("User-Agent"):
@@ -198,7 +309,8 @@ class CheckIn:
         try:
             resp = session.post(
                 f"{BASE_URL}/api/pow/submit",
-                json={"challengeId": challenge_id, "nonce": nonce, "tier": tier},
+                data=orjson.dumps({"challengeId": challenge_id, "nonce": nonce, "tier": tier}),
+                headers={"Content-Type": "application/json"},
                 timeout=30,
             )
             data = response_resolve(resp, "submit_checkin", self.account_name)
@@ -216,12 +328,15 @@ class CheckIn:
             print(f"  ❌ {self.account_name}: 提交异常 - {e}")
             return None
 
-    async def execute(self, sid: str, tier: int = 4) -> tuple[bool, dict]:
+    async def execute(
+        self, sid: str, tier: int = 4, cf_bundle: tuple[dict | None, dict | None] | None = None
+    ) -> tuple[bool, dict]:
         """执行完整签到流程
 
         Args:
             sid: 用户 session ID (从 cookie 获取)
             tier: 难度等级 1-4，默认 4 (最高奖励)
+            cf_bundle: BrowserPool 预先获取的 (cf_cookies, browser_headers)，为 None 时自行启动浏览器获取
 
         Returns:
             (是否成功, 签到结果或错误信息)
@@ -229,12 +344,16 @@ class CheckIn:
         print(f"\n⏳ 开始处理 {self.account_name}")
 
         # 1. 获取 cf_clearance
-        cf_cookies, browser_headers = await self._get_cf_clearance()
+        if cf_bundle is not None:
+            cf_cookies, browser_headers = cf_bundle
+            print(f"  {self.account_name}: 使用共享浏览器获取的 cf_clearance")
+        else:
+            cf_cookies, browser_headers = await self._get_cf_clearance()
 
         session = self._build_session(sid, cf_cookies, browser_headers)
         try:
             # 2. 检查是否已签到
-            me_data = self._check_me(session)
+            me_data = await asyncio.to_thread(self._check_me, session)
             if me_data and me_data.get("signedInToday"):
                 today = me_data.get("todaySignin", {})
                 print(f"  ✅ {self.account_name}: 今日已签到，跳过 PoW")
@@ -247,19 +366,27 @@ class CheckIn:
             if not me_data:
                 return False, {"error": "获取用户信息失败，可能 cf_clearance 无效"}
 
-            # 3. 测算 HPS
-            hps = benchmark_hps()
-
-            # 4. 获取挑战
-            challenge_data = self._get_challenge(session, tier, hps)
+            # 3. 获取挑战：优先使用缓存的 HPS，没有缓存时先用估计值，获取失败时不必测算
+            cached_hps = load_cached_hps()
+            challenge_data = await asyncio.to_thread(
+                self._get_challenge, session, tier, cached_hps or DEFAULT_HPS_GUESS
+            )
             if not challenge_data:
                 return False, {"error": "获取挑战失败"}
 
-            # 5. 计算 nonce
-            result = calculate_nonce(challenge_data["challenge"], challenge_data["difficulty"])
+            # 4. 没有缓存时测算 HPS 并写入缓存，供后续运行使用
+            if cached_hps is None:
+                await asyncio.to_thread(get_hps)
+
+            # 5. 计算 nonce（在线程池中执行，不阻塞其他账号的事件循环）
+            result = await asyncio.to_thread(
+                calculate_nonce, challenge_data["challenge"], challenge_data["difficulty"]
+            )
 
             # 6. 提交签到
-            submit_data = self._submit(session, challenge_data["challengeId"], result["nonce"], tier)
+            submit_data = await asyncio.to_thread(
+                self._submit, session, challenge_data["challengeId"], result["nonce"], tier
+            )
             if not submit_data:
                 return False, {"error": "提交签到失败"}
 
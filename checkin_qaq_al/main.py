@@ -8,20 +8,70 @@ import hashlib
 import json
 import os
 import sys
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
-from checkin import CheckIn
+from checkin import BASE_URL, CheckIn
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from utils.get_cf_clearance import BrowserPool
 from utils.notify import notify
 from utils.balance_hash import load_balance_hash, save_balance_hash
 
 load_dotenv(override=True)
 
 CHECKIN_HASH_FILE = "balance_hash_qaq_al.txt"
+NOTIFICATION_SEPARATOR = "\n\n-------------------------------\n"
+
+
+@dataclass(slots=True)
+class AccountResult:
+    """单个账号的签到结果"""
+
+    name: str
+    ok: bool
+    reward: str | float = ""
+    tier: str = ""
+    elapsed: float | str = "?"
+    hps: int = 0
+    err: str = ""
+    already_signed: bool = False
+    exception: bool = False
+
+    @classmethod
+    def from_outcome(cls, name: str, outcome: tuple[bool, dict] | BaseException) -> "AccountResult":
+        """由 CheckIn.execute 的返回值（或 gather 捕获的异常）构建"""
+        if isinstance(outcome, BaseException):
+            return cls(name=name, ok=False, err=str(outcome)[:100], exception=True)
+
+        success, result = outcome
+        result = result or {}
+        if not success:
+            return cls(name=name, ok=False, err=result.get("error", "未知错误"))
+        return cls(
+            name=name,
+            ok=True,
+            reward=result.get("reward_final", "0"),
+            tier=result.get("tier_name", ""),
+            elapsed=result.get("pow_elapsed", "?"),
+            hps=result.get("pow_hps", 0),
+            already_signed=bool(result.get("already_signed")),
+        )
+
+
+def format_result(r: AccountResult) -> str:
+    """格式化单个账号的通知内容"""
+    if r.exception:
+        return f"  ❌ {r.name} 异常: {r.err}..."
+    if not r.ok:
+        return f"  ❌ {r.name}: {r.err}"
+    if r.already_signed:
+        return f"  📝 {r.name}: ✅ 今日已签到 | 💰奖励 {r.reward} ({r.tier})"
+    return f"  📝 {r.name}: 💰奖励 {r.reward} ({r.tier}) | ⚡PoW {r.elapsed}s @ {r.hps:,} H/s"
 
 
 def load_accounts() -> list[str] | None:
@@ -52,16 +102,14 @@ def load_accounts() -> list[str] | None:
         return None
 
 
-def generate_checkin_hash(results: dict) -> str:
-    """生成签到结果的 hash"""
-    if not results:
+def generate_checkin_hash(results: list[AccountResult]) -> str:
+    """生成签到结果的 hash（只统计成功的账号）"""
+    rewards = {r.name: r.reward for r in results if r.ok}
+    if not rewards:
         return ""
-    rewards = {}
-    for key, info in results.items():
-        if info:
-            rewards[key] = info.get("reward_final", "0")
-    data = json.dumps(rewards, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(data.encode()).hexdigest()[:16]
+    # 与 json.dumps(sort_keys=True, separators=(",", ":")) 输出一致，历史 hash 不受影响
+    data = orjson.dumps(rewards, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(data).hexdigest()[:16]
 
 
 async def main():
@@ -97,46 +145,45 @@ async def main():
     tier = int(os.getenv("QAQ_AL_TIER", "4"))
     print(f"⚙️ 签到难度等级: {tier}")
 
-    success_count = 0
-    total_count = len(sids)
-    notification_content = []
-    current_info = {}
+    # 并发处理账号数，避免同时启动过多 Camoufox 浏览器
+    concurrency = max(1, int(os.getenv("QAQ_AL_CONCURRENCY", "4")))
+    print(f"⚙️ 并发账号数: {concurrency}")
+    sem = asyncio.Semaphore(concurrency)
 
-    for i, sid in enumerate(sids):
-        account_name = f"account_{i + 1}"
+    account_names = [f"account_{i + 1}" for i in range(len(sids))]
 
-        if notification_content:
-            notification_content.append("\n-------------------------------")
+    # 共享一个浏览器并行获取所有账号的 cf_clearance，失败的账号在 execute 中单独重试
+    cf_bundles = {}
+    try:
+        pool = BrowserPool(global_proxy, max_pages=concurrency)
+        cf_bundles = await pool.get_many([(f"{BASE_URL}/app", account_name) for account_name in account_names])
+    except Exception as e:
+        print(f"⚠️ 共享浏览器获取 cf_clearance 失败，改为逐个账号获取: {e}")
 
-        try:
+    async def process_account(account_name: str, sid: str) -> tuple[bool, dict]:
+        async with sem:
             print(f"🌀 处理 {account_name}")
             checkin = CheckIn(account_name, global_proxy=global_proxy)
-            success, result = await checkin.execute(sid, tier=tier)
-
-            if success:
-                success_count += 1
-                current_info[account_name] = result
-                if result.get("already_signed"):
-                    notification_content.append(
-                        f"  📝 {account_name}: "
-                        f"✅ 今日已签到 | 💰奖励 {result.get('reward_final', '?')} ({result.get('tier_name', '')})"
-                    )
-                else:
-                    notification_content.append(
-                        f"  📝 {account_name}: "
-                        f"💰奖励 {result.get('reward_final', '?')} ({result.get('tier_name', '')}) | "
-                        f"⚡PoW {result.get('pow_elapsed', '?')}s @ {result.get('pow_hps', 0):,} H/s"
-                    )
-            else:
-                error_msg = result.get("error", "未知错误") if result else "未知错误"
-                notification_content.append(f"  ❌ {account_name}: {error_msg}")
-
-        except Exception as e:
-            print(f"❌ {account_name} 处理异常: {e}")
-            notification_content.append(f"  ❌ {account_name} 异常: {str(e)[:100]}...")
+            cf_bundle = cf_bundles.get(account_name)
+            if cf_bundle and not cf_bundle[0]:
+                cf_bundle = None
+            return await checkin.execute(sid, tier=tier, cf_bundle=cf_bundle)
+
+    outcomes = await asyncio.gather(
+        *(process_account(account_name, sid) for account_name, sid in zip(account_names, sids)),
+        return_exceptions=True,
+    )
+
+    results = [AccountResult.from_outcome(name, outcome) for name, outcome in zip(account_names, outcomes)]
+    for r in results:
+        if r.exception:
+            print(f"❌ {r.name} 处理异常: {r.err}")
+
+    success_count = sum(r.ok for r in results)
+    total_count = len(results)
 
     # hash 比较
-    current_hash = generate_checkin_hash(current_info)
+    current_hash = generate_checkin_hash(results)
     print(f"\nℹ️ 当前 hash: {current_hash}, 上次 hash: {last_hash}")
 
     need_notify = False
@@ -149,7 +196,7 @@ async def main():
     else:
         print("ℹ️ 签到信息无变化，跳过通知")
 
-    if need_notify and notification_content:
+    if need_notify and results:
         summary = [
             "-------------------------------",
             "📢 签到结果统计:",
@@ -166,7 +213,11 @@ async def main():
 
         time_info = f'🕓 执行时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
         notify_content = "\n\n".join(
-            [time_info, "📊 签到详情:\n" + "\n".join(notification_content), "\n".join(summary)]
+            [
+                time_info,
+                "📊 签到详情:\n" + NOTIFICATION_SEPARATOR.join(format_result(r) for r in results),
+                "\n".join(summary),
+            ]
         )
 
         print(notify_content)
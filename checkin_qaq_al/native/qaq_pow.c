@@ -0,0 +1,766 @@
+/*
+ * qaq_pow - qaq.al PoW nonce 搜索的原生加速模块
+ *
+ * 算法与 checkin.py 中的纯 Python 实现一致:
+ *   SHA-256(prefix + str(nonce))，找到前导零位数 >= difficulty 的 nonce。
+ *
+ * 导入时检测 CPU 特性并选择内核:
+ *   - 多路并行内核: AVX-512 16 路 > AVX2 8 路
+ *   - 单路内核: SHA-NI > 可移植标量实现
+ * 同时具备 SHA-NI 与多路内核时，低难度（期望迭代次数少）用 SHA-NI，
+ * 期望迭代次数超过约 1e4 时改用多路内核以摊薄 lane 装载开销。
+ *
+ * 搜索在所有 CPU 核心上并行（QAQ_POW_THREADS 可覆盖线程数）：各线程从共享计数器
+ * 按块领取连续 nonce，找到后以原子 min 记录，其余线程领取到更大的块时即退出，
+ * 因此结果与单线程顺序搜索一致（最小的满足条件的 nonce）。
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <stdlib.h>
+#include <string.h>
+
+#include "sha256.h"
+
+#if defined(_WIN32)
+#include <windows.h>
+#include <process.h>
+#else
+#include <pthread.h>
+#include <time.h>
+#include <unistd.h>
+#endif
+
+#if QP_X86
+#if defined(_MSC_VER)
+#include <intrin.h>
+#else
+#include <cpuid.h>
+#endif
+#endif
+
+#define QP_MAX_LANES 16
+/* 2^14 > 1e4，难度达到该值时优先使用多路内核 */
+#define QP_MULTI_MIN_DIFFICULTY 14
+/* benchmark 使用的难度：走与实际求解相同的首字快速判断路径，约 4e9 次哈希才会命中一次 */
+#define QP_BENCH_DIFFICULTY 32
+#define QP_BENCH_CHUNK 65536
+/* 线程每次领取的 nonce 数，也是检查其他线程是否已找到结果的间隔 */
+#define QP_THREAD_CHUNK 4096
+#define QP_MAX_THREADS 256
+
+static sha256_blocks_fn qp_sha256_blocks = sha256_blocks_portable;
+static sha256_multi_fn qp_sha256_multi = NULL;
+static sha256_multi_check_fn qp_sha256_multi_check = NULL;
+static int qp_lanes = 1;
+static int qp_multi_min_difficulty = 0;
+static const char *qp_backend = "portable";
+static int qp_threads = 1;
+
+/* ---------- CPU 特性检测 ---------- */
+
+#if QP_X86
+static void qp_cpuid(int leaf, int subleaf, unsigned int regs[4])
+{
+#if defined(_MSC_VER)
+	int r[4];
+	__cpuidex(r, leaf, subleaf);
+	regs[0] = (unsigned int)r[0];
+	regs[1] = (unsigned int)r[1];
+	regs[2] = (unsigned int)r[2];
+	regs[3] = (unsigned int)r[3];
+#else
+	__cpuid_count(leaf, subleaf, regs[0], regs[1], regs[2], regs[3]);
+#endif
+}
+
+static int qp_cpu_has_shani(void)
+{
+	unsigned int regs[4];
+
+	qp_cpuid(0, 0, regs);
+	if (regs[0] < 7) {
+		return 0;
+	}
+	qp_cpuid(1, 0, regs);
+	/* SSSE3 (ECX bit 9), SSE4.1 (ECX bit 19) */
+	if (!(regs[2] & (1u << 9)) || !(regs[2] & (1u << 19))) {
+		return 0;
+	}
+	qp_cpuid(7, 0, regs);
+	/* SHA (EBX bit 29) */
+	return (regs[1] & (1u << 29)) != 0;
+}
+
+static unsigned long long qp_xgetbv0(void)
+{
+#if defined(_MSC_VER)
+	return _xgetbv(0);
+#else
+	unsigned int eax, edx;
+	__asm__ volatile("xgetbv" : "=a"(eax), "=d"(edx) : "c"(0));
+	return ((unsigned long long)edx << 32) | eax;
+#endif
+}
+
+static int qp_cpu_has_avx2(void)
+{
+	unsigned int regs[4];
+
+	qp_cpuid(0, 0, regs);
+	if (regs[0] < 7) {
+		return 0;
+	}
+	qp_cpuid(1, 0, regs);
+	/* OSXSAVE (ECX bit 27), AVX (ECX bit 28) */
+	if (!(regs[2] & (1u << 27)) || !(regs[2] & (1u << 28))) {
+		return 0;
+	}
+	/* 操作系统需保存 XMM/YMM 状态 */
+	if ((qp_xgetbv0() & 0x6) != 0x6) {
+		return 0;
+	}
+	qp_cpuid(7, 0, regs);
+	/* AVX2 (EBX bit 5) */
+	return (regs[1] & (1u << 5)) != 0;
+}
+
+static int qp_cpu_has_avx512f(void)
+{
+	unsigned int regs[4];
+
+	if (!qp_cpu_has_avx2()) {
+		return 0;
+	}
+	/* 操作系统需保存 opmask/ZMM 状态 */
+	if ((qp_xgetbv0() & 0xE6) != 0xE6) {
+		return 0;
+	}
+	qp_cpuid(7, 0, regs);
+	/* AVX512F (EBX bit 16) */
+	return (regs[1] & (1u << 16)) != 0;
+}
+#endif
+
+/* 环境变量 QAQ_POW_BACKEND 可强制指定内核（CPU 不支持时忽略） */
+static int qp_backend_allowed(const char *forced, const char *name)
+{
+	return forced == NULL || forced[0] == '\0' || strcmp(forced, name) == 0;
+}
+
+static void qp_detect_backend(void)
+{
+	const char *forced = getenv("QAQ_POW_BACKEND");
+
+#if QP_X86
+	if (qp_backend_allowed(forced, "sha-ni") && qp_cpu_has_shani()) {
+		qp_sha256_blocks = sha256_blocks_shani;
+		qp_backend = "sha-ni";
+		qp_multi_min_difficulty = QP_MULTI_MIN_DIFFICULTY;
+	}
+
+	if (qp_backend_allowed(forced, "avx512") && qp_cpu_has_avx512f()) {
+		qp_sha256_multi = sha256_16x_avx512;
+		qp_sha256_multi_check = sha256_16x_avx512_word0_le;
+		qp_lanes = 16;
+		qp_backend = "avx512";
+	} else if (qp_backend_allowed(forced, "avx2") && qp_cpu_has_avx2()) {
+		qp_sha256_multi = sha256_8x_avx2;
+		qp_sha256_multi_check = sha256_8x_avx2_word0_le;
+		qp_lanes = 8;
+		qp_backend = "avx2";
+	}
+#else
+	(void)forced;
+#endif
+}
+
+static int qp_detect_threads(void)
+{
+	const char *forced = getenv("QAQ_POW_THREADS");
+	long n = 0;
+
+	if (forced != NULL && forced[0] != '\0') {
+		n = strtol(forced, NULL, 10);
+	}
+	if (n <= 0) {
+#if defined(_WIN32)
+		SYSTEM_INFO info;
+		GetSystemInfo(&info);
+		n = (long)info.dwNumberOfProcessors;
+#else
+		n = sysconf(_SC_NPROCESSORS_ONLN);
+#endif
+	}
+	if (n < 1) {
+		n = 1;
+	}
+	return n > QP_MAX_THREADS ? QP_MAX_THREADS : (int)n;
+}
+
+/* ---------- 原子操作 ---------- */
+
+#if defined(_MSC_VER) && !defined(__clang__)
+static uint64_t qp_atomic_load(volatile uint64_t *p)
+{
+	return (uint64_t)InterlockedCompareExchange64((volatile LONG64 *)p, 0, 0);
+}
+
+static uint64_t qp_atomic_fetch_add(volatile uint64_t *p, uint64_t v)
+{
+	return (uint64_t)InterlockedExchangeAdd64((volatile LONG64 *)p, (LONG64)v);
+}
+
+static void qp_atomic_min(volatile uint64_t *p, uint64_t v)
+{
+	uint64_t cur = qp_atomic_load(p);
+	while (v < cur) {
+		uint64_t prev = (uint64_t)InterlockedCompareExchange64((volatile LONG64 *)p, (LONG64)v, (LONG64)cur);
+		if (prev == cur) {
+			break;
+		}
+		cur = prev;
+	}
+}
+#else
+static uint64_t qp_atomic_load(volatile uint64_t *p)
+{
+	return __atomic_load_n(p, __ATOMIC_RELAXED);
+}
+
+static uint64_t qp_atomic_fetch_add(volatile uint64_t *p, uint64_t v)
+{
+	return __atomic_fetch_add(p, v, __ATOMIC_RELAXED);
+}
+
+static void qp_atomic_min(volatile uint64_t *p, uint64_t v)
+{
+	uint64_t cur = __atomic_load_n(p, __ATOMIC_RELAXED);
+	while (v < cur && !__atomic_compare_exchange_n(p, &cur, v, 1, __ATOMIC_RELAXED, __ATOMIC_RELAXED)) {
+	}
+}
+#endif
+
+/* ---------- 辅助函数 ---------- */
+
+/* v != 0 时返回 64 位前导零个数，GCC/Clang 编译为 lzcnt/bsr */
+static inline int qp_clz64(uint64_t v)
+{
+#if defined(_MSC_VER) && !defined(__clang__)
+	unsigned long idx;
+#if defined(_M_X64) || defined(_M_ARM64)
+	_BitScanReverse64(&idx, v);
+	return 63 - (int)idx;
+#else
+	if (v >> 32) {
+		_BitScanReverse(&idx, (unsigned long)(v >> 32));
+		return 31 - (int)idx;
+	}
+	_BitScanReverse(&idx, (unsigned long)v);
+	return 63 - (int)idx;
+#endif
+#else
+	return __builtin_clzll(v);
+#endif
+}
+
+/* state 按大端字序即为摘要，每次取两个字拼成 64 位做 clz */
+static int qp_leading_zero_bits(const uint32_t state[8])
+{
+	int i;
+
+	for (i = 0; i < 4; i++) {
+		uint64_t v = ((uint64_t)state[i * 2] << 32) | state[i * 2 + 1];
+		if (v) {
+			return i * 64 + qp_clz64(v);
+		}
+	}
+	return 256;
+}
+
+static int qp_u64_to_ascii(uint64_t value, uint8_t *out)
+{
+	char tmp[20];
+	int n = 0;
+	int i;
+
+	do {
+		tmp[n++] = (char)('0' + value % 10);
+		value /= 10;
+	} while (value);
+
+	for (i = 0; i < n; i++) {
+		out[i] = (uint8_t)tmp[n - 1 - i];
+	}
+	return n;
+}
+
+static void qp_state_to_digest(const uint32_t state[8], uint8_t digest[32])
+{
+	int i;
+
+	for (i = 0; i < 8; i++) {
+		digest[i * 4] = (uint8_t)(state[i] >> 24);
+		digest[i * 4 + 1] = (uint8_t)(state[i] >> 16);
+		digest[i * 4 + 2] = (uint8_t)(state[i] >> 8);
+		digest[i * 4 + 3] = (uint8_t)state[i];
+	}
+}
+
+/*
+ * 对 buf[0:tail_len] 做 SHA-256 填充，返回 buf 中的块数。
+ * absorbed 为已压缩进 midstate 的字节数，计入消息总长度。
+ */
+static size_t qp_pad_message(uint8_t *buf, size_t tail_len, uint64_t absorbed)
+{
+	size_t total = (tail_len + 9 + 63) & ~(size_t)63;
+	uint64_t bit_len = (absorbed + (uint64_t)tail_len) * 8;
+	int i;
+
+	buf[tail_len] = 0x80;
+	memset(buf + tail_len + 1, 0, total - tail_len - 9);
+	for (i = 0; i < 8; i++) {
+		buf[total - 1 - i] = (uint8_t)(bit_len >> (i * 8));
+	}
+	return total / 64;
+}
+
+/*
+ * 对 digits[0:len] 表示的十进制 ASCII 数就地加 n（从最低位向高位进位），返回新的位数。
+ * 位数增加时整体右移一位腾出最高位，调用方需重新填充消息。
+ */
+static int qp_ascii_add(uint8_t *digits, int len, unsigned int n)
+{
+	unsigned int carry = n;
+	int i;
+
+	for (i = len - 1; i >= 0 && carry; i--) {
+		unsigned int d = (unsigned int)(digits[i] - '0') + carry;
+		if (d < 10) {
+			digits[i] = (uint8_t)('0' + d);
+			return len;
+		}
+		digits[i] = (uint8_t)('0' + d % 10);
+		carry = d / 10;
+	}
+	while (carry) {
+		memmove(digits + 1, digits, (size_t)len);
+		digits[0] = (uint8_t)('0' + carry % 10);
+		carry /= 10;
+		len++;
+	}
+	return len;
+}
+
+/* ---------- nonce 搜索 ---------- */
+
+/*
+ * 前缀中完整的 64 字节块对所有候选 nonce 都相同，只在开始时压缩一次得到 midstate，
+ * 每个候选只需从 midstate 出发压缩剩余前缀 + nonce 所在的块。
+ */
+typedef struct {
+	uint32_t midstate[8];
+	uint64_t absorbed;       /* 已压缩进 midstate 的前缀字节数 */
+	const uint8_t *tail;     /* 前缀剩余部分（不足一个块） */
+	size_t tail_len;
+	int difficulty;
+} qp_job;
+
+static void qp_job_init(qp_job *job, const uint8_t *prefix, size_t prefix_len, int difficulty)
+{
+	const size_t full_blocks = prefix_len / 64;
+
+	memcpy(job->midstate, SHA256_IV, sizeof(job->midstate));
+	if (full_blocks) {
+		qp_sha256_blocks(job->midstate, prefix, full_blocks);
+	}
+	job->absorbed = (uint64_t)full_blocks * 64;
+	job->tail = prefix + full_blocks * 64;
+	job->tail_len = prefix_len - full_blocks * 64;
+	job->difficulty = difficulty;
+}
+
+/* nonce 的 ASCII 表示只在开始时格式化一次，之后逐个加 1；填充只在位数变化时重做 */
+static int qp_search_scalar(
+	const qp_job *job, uint8_t *buf, uint64_t start, uint64_t count, uint64_t *found_nonce, uint8_t digest[32])
+{
+	const size_t tail_len = job->tail_len;
+	uint64_t nonce = start;
+	uint64_t i;
+	uint32_t state[8];
+	int digits = qp_u64_to_ascii(start, buf + tail_len);
+	size_t blocks = qp_pad_message(buf, tail_len + (size_t)digits, job->absorbed);
+
+	for (i = 0; i < count && nonce != UINT64_MAX; i++, nonce++) {
+		int next_digits;
+
+		memcpy(state, job->midstate, sizeof(state));
+		qp_sha256_blocks(state, buf, blocks);
+
+		if (qp_leading_zero_bits(state) >= job->difficulty) {
+			*found_nonce = nonce;
+			qp_state_to_digest(state, digest);
+			return 1;
+		}
+
+		next_digits = qp_ascii_add(buf + tail_len, digits, 1);
+		if (next_digits != digits) {
+			digits = next_digits;
+			blocks = qp_pad_message(buf, tail_len + (size_t)digits, job->absorbed);
+		}
+	}
+	return 0;
+}
+
+/*
+ * 每批 qp_lanes 个连续 nonce 并行计算，lane k 负责 nonce + k，每批各 lane 的 ASCII 加 lanes；
+ * 批内消息块数不一致（位数进位）时逐个计算
+ */
+static int qp_search_multi(
+	const qp_job *job, uint8_t *bufs, size_t stride, uint64_t start, uint64_t count, uint64_t *found_nonce,
+	uint8_t digest[32])
+{
+	const uint8_t *msgs[QP_MAX_LANES];
+	size_t blocks[QP_MAX_LANES];
+	int digits[QP_MAX_LANES];
+	uint32_t out[8 * QP_MAX_LANES];
+	uint32_t state[8];
+	const size_t tail_len = job->tail_len;
+	const int lanes = qp_lanes;
+	const int fused = qp_sha256_multi_check != NULL && job->difficulty <= 32;
+	const uint32_t max_word0 = job->difficulty >= 32 ? 0 : 0xFFFFFFFFu >> job->difficulty;
+	uint64_t nonce = start;
+	uint64_t done;
+	int k, i;
+
+	if (start > UINT64_MAX - (uint64_t)lanes) {
+		return 0;
+	}
+	for (k = 0; k < lanes; k++) {
+		uint8_t *buf = bufs + k * stride;
+		msgs[k] = buf;
+		digits[k] = qp_u64_to_ascii(start + (uint64_t)k, buf + tail_len);
+		blocks[k] = qp_pad_message(buf, tail_len + (size_t)digits[k], job->absorbed);
+	}
+
+	for (done = 0; done < count && nonce <= UINT64_MAX - (uint64_t)lanes; done += (uint64_t)lanes, nonce += (uint64_t)lanes) {
+		int uniform = 1;
+
+		for (k = 1; k < lanes; k++) {
+			uniform &= blocks[k] == blocks[0];
+		}
+
+		if (uniform && fused) {
+			/* 难度 <= 32 时只看摘要首字，命中后再为该 lane 计算完整摘要 */
+			uint32_t mask = qp_sha256_multi_check(job->midstate, msgs, blocks[0], max_word0);
+			if (mask) {
+				for (k = 0; !(mask & 1); k++) {
+					mask >>= 1;
+				}
+				memcpy(state, job->midstate, sizeof(state));
+				qp_sha256_blocks(state, msgs[k], blocks[k]);
+				*found_nonce = nonce + (uint64_t)k;
+				qp_state_to_digest(state, digest);
+				return 1;
+			}
+		} else {
+			if (uniform) {
+				qp_sha256_multi(job->midstate, msgs, blocks[0], out);
+			}
+
+			for (k = 0; k < lanes; k++) {
+				if (uniform) {
+					for (i = 0; i < 8; i++) {
+						state[i] = out[i * lanes + k];
+					}
+				} else {
+					memcpy(state, job->midstate, sizeof(state));
+					qp_sha256_blocks(state, msgs[k], blocks[k]);
+				}
+
+				if (qp_leading_zero_bits(state) >= job->difficulty) {
+					*found_nonce = nonce + (uint64_t)k;
+					qp_state_to_digest(state, digest);
+					return 1;
+				}
+			}
+		}
+
+		for (k = 0; k < lanes; k++) {
+			uint8_t *buf = bufs + k * stride;
+			int next_digits = qp_ascii_add(buf + tail_len, digits[k], (unsigned int)lanes);
+			if (next_digits != digits[k]) {
+				digits[k] = next_digits;
+				blocks[k] = qp_pad_message(buf, tail_len + (size_t)next_digits, job->absorbed);
+			}
+		}
+	}
+	return 0;
+}
+
+/* 所有线程共享的搜索状态 */
+typedef struct {
+	qp_job job;
+	int lanes;
+	size_t stride;
+	uint64_t start;
+	uint64_t count;
+	volatile uint64_t next;    /* 下一个待领取块相对 start 的偏移 */
+	volatile uint64_t winner;  /* 已找到的最小 nonce，未找到为 UINT64_MAX */
+	volatile uint64_t oom;
+} qp_shared;
+
+static void qp_worker_run(qp_shared *sh)
+{
+	const qp_job *job = &sh->job;
+	uint8_t digest[32];
+	uint8_t *bufs;
+	int k;
+
+	bufs = (uint8_t *)PyMem_RawMalloc(sh->stride * (size_t)sh->lanes);
+	if (bufs == NULL) {
+		qp_atomic_fetch_add(&sh->oom, 1);
+		return;
+	}
+	for (k = 0; k < sh->lanes; k++) {
+		memcpy(bufs + k * sh->stride, job->tail, job->tail_len);
+	}
+
+	for (;;) {
+		uint64_t offset = qp_atomic_fetch_add(&sh->next, QP_THREAD_CHUNK);
+		uint64_t chunk_start, n, found;
+
+		if (offset >= sh->count || offset > UINT64_MAX - sh->start) {
+			break;
+		}
+		chunk_start = sh->start + offset;
+		/* 更小的 nonce 已命中，后面的块无需再算 */
+		if (chunk_start >= qp_atomic_load(&sh->winner)) {
+			break;
+		}
+		n = sh->count - offset < QP_THREAD_CHUNK ? sh->count - offset : QP_THREAD_CHUNK;
+
+		if (sh->lanes > 1 ? qp_search_multi(job, bufs, sh->stride, chunk_start, n, &found, digest)
+						  : qp_search_scalar(job, bufs, chunk_start, n, &found, digest)) {
+			qp_atomic_min(&sh->winner, found);
+			break;
+		}
+	}
+
+	PyMem_RawFree(bufs);
+}
+
+#if defined(_WIN32)
+static unsigned __stdcall qp_worker_main(void *arg)
+{
+	qp_worker_run((qp_shared *)arg);
+	return 0;
+}
+#else
+static void *qp_worker_main(void *arg)
+{
+	qp_worker_run((qp_shared *)arg);
+	return NULL;
+}
+#endif
+
+/*
+ * 从 start 开始最多尝试 count 个 nonce，找到返回 1，未找到返回 0，内存不足返回 -1。
+ * 当前线程也参与搜索；创建线程失败时由已启动的线程完成剩余的块。
+ */
+static int qp_search(
+	const uint8_t *prefix, size_t prefix_len, int difficulty, uint64_t start, uint64_t count, uint64_t *found_nonce,
+	uint8_t digest[32])
+{
+#if defined(_WIN32)
+	HANDLE handles[QP_MAX_THREADS];
+#else
+	pthread_t handles[QP_MAX_THREADS];
+#endif
+	qp_shared sh;
+	uint8_t tail_buf[64 + 20 + 9 + 64];
+	uint64_t blocks_needed = count / QP_THREAD_CHUNK + (count % QP_THREAD_CHUNK != 0);
+	int spawned = 0;
+	int extra = qp_threads - 1;
+	int t;
+
+	qp_job_init(&sh.job, prefix, prefix_len, difficulty);
+	sh.lanes = (qp_sha256_multi && difficulty >= qp_multi_min_difficulty) ? qp_lanes : 1;
+	sh.stride = (sh.job.tail_len + 20 + 9 + 64 + 63) & ~(size_t)63;
+	sh.start = start;
+	sh.count = count;
+	sh.next = 0;
+	sh.winner = UINT64_MAX;
+	sh.oom = 0;
+
+	if ((uint64_t)extra >= blocks_needed) {
+		extra = blocks_needed ? (int)(blocks_needed - 1) : 0;
+	}
+	for (t = 0; t < extra; t++) {
+#if defined(_WIN32)
+		uintptr_t h = _beginthreadex(NULL, 0, qp_worker_main, &sh, 0, NULL);
+		if (h == 0) {
+			break;
+		}
+		handles[spawned++] = (HANDLE)h;
+#else
+		if (pthread_create(&handles[spawned], NULL, qp_worker_main, &sh) != 0) {
+			break;
+		}
+		spawned++;
+#endif
+	}
+
+	qp_worker_run(&sh);
+
+	for (t = 0; t < spawned; t++) {
+#if defined(_WIN32)
+		WaitForSingleObject(handles[t], INFINITE);
+		CloseHandle(handles[t]);
+#else
+		pthread_join(handles[t], NULL);
+#endif
+	}
+
+	if (sh.winner != UINT64_MAX) {
+		/* 重算一次命中 nonce 的摘要，避免线程间传递摘要 */
+		memcpy(tail_buf, sh.job.tail, sh.job.tail_len);
+		*found_nonce = sh.winner;
+		return qp_search_scalar(&sh.job, tail_buf, sh.winner, 1, found_nonce, digest);
+	}
+	return sh.oom ? -1 : 0;
+}
+
+PyDoc_STRVAR(find_nonce_doc,
+	"find_nonce(prefix: bytes, difficulty: int, start: int = 0) -> tuple[int, bytes]\n\n"
+	"从 start 开始搜索满足 SHA-256(prefix + str(nonce)) 前导零位数 >= difficulty 的 nonce，\n"
+	"返回 (nonce, 32 字节哈希)。");
+
+static PyObject *qp_find_nonce(PyObject *self, PyObject *args)
+{
+	const char *prefix;
+	Py_ssize_t prefix_len;
+	int difficulty;
+	long long start = 0;
+	uint64_t nonce = 0;
+	uint8_t digest[32];
+	int rc;
+
+	(void)self;
+
+	if (!PyArg_ParseTuple(args, "y#i|L:find_nonce", &prefix, &prefix_len, &difficulty, &start)) {
+		return NULL;
+	}
+	if (difficulty < 0 || difficulty > 256) {
+		PyErr_SetString(PyExc_ValueError, "difficulty must be in [0, 256]");
+		return NULL;
+	}
+	if (start < 0) {
+		PyErr_SetString(PyExc_ValueError, "start must be non-negative");
+		return NULL;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	rc = qp_search(
+		(const uint8_t *)prefix, (size_t)prefix_len, difficulty, (uint64_t)start, UINT64_MAX, &nonce, digest);
+	Py_END_ALLOW_THREADS
+
+	if (rc < 0) {
+		return PyErr_NoMemory();
+	}
+	if (rc == 0) {
+		PyErr_SetString(PyExc_RuntimeError, "nonce space exhausted");
+		return NULL;
+	}
+	return Py_BuildValue("Ky#", (unsigned long long)nonce, (const char *)digest, (Py_ssize_t)32);
+}
+
+static double qp_monotonic(void)
+{
+#if defined(_WIN32)
+	LARGE_INTEGER freq, counter;
+	QueryPerformanceFrequency(&freq);
+	QueryPerformanceCounter(&counter);
+	return (double)counter.QuadPart / (double)freq.QuadPart;
+#else
+	struct timespec ts;
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return (double)ts.tv_sec + (double)ts.tv_nsec / 1e9;
+#endif
+}
+
+PyDoc_STRVAR(benchmark_doc,
+	"benchmark(duration_ms: int) -> int\n\n"
+	"使用与 find_nonce 相同的内核对固定前缀 \"benchmark:\" 运行 duration_ms 毫秒，返回每秒哈希数。");
+
+static PyObject *qp_benchmark(PyObject *self, PyObject *args)
+{
+	static const char prefix[] = "benchmark:";
+	int duration_ms;
+	uint64_t hashed = 0;
+	uint64_t unused_nonce;
+	uint8_t unused_digest[32];
+	double start, elapsed;
+	int rc = 0;
+
+	(void)self;
+
+	if (!PyArg_ParseTuple(args, "i:benchmark", &duration_ms)) {
+		return NULL;
+	}
+	if (duration_ms <= 0) {
+		PyErr_SetString(PyExc_ValueError, "duration_ms must be positive");
+		return NULL;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	start = qp_monotonic();
+	do {
+		const uint64_t chunk = (uint64_t)QP_BENCH_CHUNK * (uint64_t)qp_threads;
+		rc = qp_search(
+			(const uint8_t *)prefix, sizeof(prefix) - 1, QP_BENCH_DIFFICULTY, hashed, chunk, &unused_nonce,
+			unused_digest);
+		hashed += chunk;
+		elapsed = qp_monotonic() - start;
+	} while (rc >= 0 && elapsed * 1000.0 < duration_ms);
+	Py_END_ALLOW_THREADS
+
+	if (rc < 0) {
+		return PyErr_NoMemory();
+	}
+	return PyLong_FromUnsignedLongLong((unsigned long long)(hashed / elapsed));
+}
+
+static PyMethodDef qp_methods[] = {
+	{"find_nonce", qp_find_nonce, METH_VARARGS, find_nonce_doc},
+	{"benchmark", qp_benchmark, METH_VARARGS, benchmark_doc},
+	{NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef qp_module = {
+	PyModuleDef_HEAD_INIT,
+	"qaq_pow",
+	"qaq.al PoW nonce 搜索原生加速模块",
+	-1,
+	qp_methods,
+};
+
+PyMODINIT_FUNC PyInit_qaq_pow(void)
+{
+	PyObject *module;
+
+	qp_detect_backend();
+	qp_threads = qp_detect_threads();
+
+	module = PyModule_Create(&qp_module);
+	if (module == NULL) {
+		return NULL;
+	}
+	if (PyModule_AddStringConstant(module, "backend", qp_backend) < 0 ||
+		PyModule_AddIntConstant(module, "threads", qp_threads) < 0) {
+		Py_DECREF(module);
+		return NULL;
+	}
+	return module;
+}
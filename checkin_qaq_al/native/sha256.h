@@ -0,0 +1,55 @@
+/*
+ * qaq_pow SHA-256 内核公共声明
+ */
+
+#ifndef QAQ_POW_SHA256_H
+#define QAQ_POW_SHA256_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+#define QP_X86 1
+#else
+#define QP_X86 0
+#endif
+
+/* GCC/Clang 需要按函数开启指令集，MSVC 可直接使用 intrinsics */
+#if defined(_MSC_VER) && !defined(__clang__)
+#define QP_TARGET(x)
+#else
+#define QP_TARGET(x) __attribute__((target(x)))
+#endif
+
+extern const uint32_t SHA256_IV[8];
+extern const uint32_t SHA256_K[64];
+
+/* 对 data 中连续 blocks 个 64 字节块做压缩，结果累加到 state */
+typedef void (*sha256_blocks_fn)(uint32_t state[8], const uint8_t *data, size_t blocks);
+
+/*
+ * 多路并行压缩：每个 lane 从同一个 init 状态出发，分别处理 msgs[lane] 的 blocks 个块，
+ * 结果转置写入 out[word * lanes + lane]
+ */
+typedef void (*sha256_multi_fn)(const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t *out);
+
+/*
+ * 与 sha256_multi_fn 相同的多路压缩，但只计算摘要首字（state[0] + H0），
+ * 返回首字 <= max_word0 的 lane 位掩码（bit k 对应 msgs[k]）。
+ * 难度 d <= 32 时，前导零 >= d 等价于首字 <= (0xFFFFFFFF >> d)。
+ */
+typedef uint32_t (*sha256_multi_check_fn)(
+	const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t max_word0);
+
+void sha256_blocks_portable(uint32_t state[8], const uint8_t *data, size_t blocks);
+
+#if QP_X86
+void sha256_blocks_shani(uint32_t state[8], const uint8_t *data, size_t blocks);
+void sha256_8x_avx2(const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t *out);
+void sha256_16x_avx512(const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t *out);
+uint32_t sha256_8x_avx2_word0_le(const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t max_word0);
+uint32_t sha256_16x_avx512_word0_le(
+	const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t max_word0);
+#endif
+
+#endif
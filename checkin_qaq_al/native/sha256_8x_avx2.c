@@ -0,0 +1,108 @@
+/*
+ * AVX2 8 路并行 SHA-256
+ *
+ * 8 个候选 nonce 的消息分别放在 8 个 32 位 lane 中（状态转置存放，
+ * 每个工作变量一个 __m256i），一次压缩同时得到 8 个哈希，
+ * 用于没有 SHA-NI 的 CPU。
+ */
+
+#include "sha256.h"
+
+#if QP_X86
+
+#include <immintrin.h>
+
+#define V_ADD(a, b) _mm256_add_epi32(a, b)
+#define V_XOR(a, b) _mm256_xor_si256(a, b)
+#define V_ROTR(x, n) _mm256_or_si256(_mm256_srli_epi32(x, n), _mm256_slli_epi32(x, 32 - (n)))
+#define V_CH(x, y, z) _mm256_xor_si256(_mm256_and_si256(x, y), _mm256_andnot_si256(x, z))
+#define V_MAJ(x, y, z) \
+	_mm256_or_si256(_mm256_and_si256(x, y), _mm256_and_si256(z, _mm256_or_si256(x, y)))
+#define V_BSIG0(x) V_XOR(V_XOR(V_ROTR(x, 2), V_ROTR(x, 13)), V_ROTR(x, 22))
+#define V_BSIG1(x) V_XOR(V_XOR(V_ROTR(x, 6), V_ROTR(x, 11)), V_ROTR(x, 25))
+#define V_SSIG0(x) V_XOR(V_XOR(V_ROTR(x, 7), V_ROTR(x, 18)), _mm256_srli_epi32(x, 3))
+#define V_SSIG1(x) V_XOR(V_XOR(V_ROTR(x, 17), V_ROTR(x, 19)), _mm256_srli_epi32(x, 10))
+
+static inline uint32_t load_be32(const uint8_t *p)
+{
+	return ((uint32_t)p[0] << 24) | ((uint32_t)p[1] << 16) | ((uint32_t)p[2] << 8) | (uint32_t)p[3];
+}
+
+/* 压缩 8 路消息，转置后的最终状态写入 s */
+QP_TARGET("avx2")
+static inline void avx2_compress(const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, __m256i s[8])
+{
+	__m256i w[64];
+	size_t b;
+	int i;
+
+	for (i = 0; i < 8; i++) {
+		s[i] = _mm256_set1_epi32((int)init[i]);
+	}
+
+	for (b = 0; b < blocks; b++) {
+		__m256i a = s[0], bb = s[1], c = s[2], d = s[3];
+		__m256i e = s[4], f = s[5], g = s[6], h = s[7];
+		const size_t off = b * 64;
+
+		for (i = 0; i < 16; i++) {
+			w[i] = _mm256_set_epi32(
+				(int)load_be32(msgs[7] + off + i * 4), (int)load_be32(msgs[6] + off + i * 4),
+				(int)load_be32(msgs[5] + off + i * 4), (int)load_be32(msgs[4] + off + i * 4),
+				(int)load_be32(msgs[3] + off + i * 4), (int)load_be32(msgs[2] + off + i * 4),
+				(int)load_be32(msgs[1] + off + i * 4), (int)load_be32(msgs[0] + off + i * 4));
+		}
+		for (i = 16; i < 64; i++) {
+			w[i] = V_ADD(V_ADD(V_SSIG1(w[i - 2]), w[i - 7]), V_ADD(V_SSIG0(w[i - 15]), w[i - 16]));
+		}
+
+		for (i = 0; i < 64; i++) {
+			__m256i t1 = V_ADD(V_ADD(h, V_BSIG1(e)), V_ADD(V_CH(e, f, g), V_ADD(_mm256_set1_epi32((int)SHA256_K[i]), w[i])));
+			__m256i t2 = V_ADD(V_BSIG0(a), V_MAJ(a, bb, c));
+			h = g;
+			g = f;
+			f = e;
+			e = V_ADD(d, t1);
+			d = c;
+			c = bb;
+			bb = a;
+			a = V_ADD(t1, t2);
+		}
+
+		s[0] = V_ADD(s[0], a);
+		s[1] = V_ADD(s[1], bb);
+		s[2] = V_ADD(s[2], c);
+		s[3] = V_ADD(s[3], d);
+		s[4] = V_ADD(s[4], e);
+		s[5] = V_ADD(s[5], f);
+		s[6] = V_ADD(s[6], g);
+		s[7] = V_ADD(s[7], h);
+	}
+}
+
+QP_TARGET("avx2")
+void sha256_8x_avx2(const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t *out)
+{
+	__m256i s[8];
+	int i;
+
+	avx2_compress(init, msgs, blocks, s);
+	for (i = 0; i < 8; i++) {
+		_mm256_storeu_si256((__m256i *)(out + i * 8), s[i]);
+	}
+}
+
+/* 只比较摘要首字，其余 7 个字不写回；AVX2 没有无符号比较，用 max(x, t) == t 判断 x <= t */
+QP_TARGET("avx2")
+uint32_t sha256_8x_avx2_word0_le(const uint32_t init[8], const uint8_t *const *msgs, size_t blocks, uint32_t max_word0)
+{
+	__m256i s[8];
+	__m256i thr = _mm256_set1_epi32((int)max_word0);
+	__m256i le;
+
+	avx2_compress(init, msgs, blocks, s);
+	le = _mm256_cmpeq_epi32(_mm256_max_epu32(s[0], thr), thr);
+	return (uint32_t)_mm256_movemask_ps(_mm256_castsi256_ps(le));
+}
+
+#endif
@@ -0,0 +1,66 @@
+/*
+ * 基于 Intel SHA 扩展 (SHA-NI) 的 SHA-256 压缩函数
+ *
+ * 状态以 ABEF/CDGH 两个 __m128i 寄存器保存，每条 sha256rnds2 指令完成两轮，
+ * 消息扩展由 sha256msg1/sha256msg2 完成。
+ */
+
+#include "sha256.h"
+
+#if QP_X86
+
+#include <immintrin.h>
+
+QP_TARGET("sha,sse4.1,ssse3")
+void sha256_blocks_shani(uint32_t state[8], const uint8_t *data, size_t blocks)
+{
+	const __m128i bswap_mask = _mm_set_epi64x(0x0c0d0e0f08090a0bULL, 0x0405060700010203ULL);
+	__m128i state0, state1, tmp, msg;
+	__m128i w[4];
+
+	tmp = _mm_loadu_si128((const __m128i *)&state[0]);
+	state1 = _mm_loadu_si128((const __m128i *)&state[4]);
+	tmp = _mm_shuffle_epi32(tmp, 0xB1);            /* CDAB */
+	state1 = _mm_shuffle_epi32(state1, 0x1B);      /* EFGH */
+	state0 = _mm_alignr_epi8(tmp, state1, 8);      /* ABEF */
+	state1 = _mm_blend_epi16(state1, tmp, 0xF0);   /* CDGH */
+
+	while (blocks--) {
+		const __m128i abef_save = state0;
+		const __m128i cdgh_save = state1;
+		int g;
+
+		w[0] = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(data + 0)), bswap_mask);
+		w[1] = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(data + 16)), bswap_mask);
+		w[2] = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(data + 32)), bswap_mask);
+		w[3] = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(data + 48)), bswap_mask);
+
+		/* 16 组，每组 4 轮；w[] 作为滚动窗口保存后续 4 组的消息字 */
+		for (g = 0; g < 16; g++) {
+			msg = _mm_add_epi32(w[g & 3], _mm_loadu_si128((const __m128i *)&SHA256_K[g * 4]));
+			state1 = _mm_sha256rnds2_epu32(state1, state0, msg);
+			msg = _mm_shuffle_epi32(msg, 0x0E);
+			state0 = _mm_sha256rnds2_epu32(state0, state1, msg);
+
+			if (g < 12) {
+				tmp = _mm_alignr_epi8(w[(g + 3) & 3], w[(g + 2) & 3], 4);
+				w[g & 3] = _mm_add_epi32(_mm_sha256msg1_epu32(w[g & 3], w[(g + 1) & 3]), tmp);
+				w[g & 3] = _mm_sha256msg2_epu32(w[g & 3], w[(g + 3) & 3]);
+			}
+		}
+
+		state0 = _mm_add_epi32(state0, abef_save);
+		state1 = _mm_add_epi32(state1, cdgh_save);
+		data += 64;
+	}
+
+	tmp = _mm_shuffle_epi32(state0, 0x1B);          /* FEBA */
+	state1 = _mm_shuffle_epi32(state1, 0xB1);       /* DCHG */
+	state0 = _mm_blend_epi16(tmp, state1, 0xF0);    /* DCBA */
+	state1 = _mm_alignr_epi8(state1, tmp, 8);       /* ABEF */
+
+	_mm_storeu_si128((__m128i *)&state[0], state0);
+	_mm_storeu_si128((__m128i *)&state[4], state1);
+}
+
+#endif
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+qaq.al PoW nonce 搜索 - Numba JIT 实现
+
+无法编译 qaq_pow 原生扩展时（没有 C 编译器），安装 numba 即可把 SHA-256 内循环
+JIT 编译为本地代码。未安装 numba 时导入本模块会抛出 ImportError，调用方回退到纯 Python。
+
+Numba 中小整数运算会提升为 int64，这里所有 32 位字都在 int64 中计算并用 MASK32 截断。
+"""
+
+import hashlib
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+MASK32 = 0xFFFFFFFF
+
+SHA256_IV = np.array(
+    [0x6A09E667, 0xBB67AE85, 0x3C6EF372, 0xA54FF53A, 0x510E527F, 0x9B05688C, 0x1F83D9AB, 0x5BE0CD19],
+    dtype=np.uint32,
+)
+
+K = np.array(
+    [
+        0x428A2F98, 0x71374491, 0xB5C0FBCF, 0xE9B5DBA5, 0x3956C25B, 0x59F111F1, 0x923F82A4, 0xAB1C5ED5,
+        0xD807AA98, 0x12835B01, 0x243185BE, 0x550C7DC3, 0x72BE5D74, 0x80DEB1FE, 0x9BDC06A7, 0xC19BF174,
+        0xE49B69C1, 0xEFBE4786, 0x0FC19DC6, 0x240CA1CC, 0x2DE92C6F, 0x4A7484AA, 0x5CB0A9DC, 0x76F988DA,
+        0x983E5152, 0xA831C66D, 0xB00327C8, 0xBF597FC7, 0xC6E00BF3, 0xD5A79147, 0x06CA6351, 0x14292967,
+        0x27B70A85, 0x2E1B2138, 0x4D2C6DFC, 0x53380D13, 0x650A7354, 0x766A0ABB, 0x81C2C92E, 0x92722C85,
+        0xA2BFE8A1, 0xA81A664B, 0xC24B8B70, 0xC76C51A3, 0xD192E819, 0xD6990624, 0xF40E3585, 0x106AA070,
+        0x19A4C116, 0x1E376C08, 0x2748774C, 0x34B0BCB5, 0x391C0CB3, 0x4ED8AA4A, 0x5B9CCA4F, 0x682E6FF3,
+        0x748F82EE, 0x78A5636F, 0x84C87814, 0x8CC70208, 0x90BEFFFA, 0xA4506CEB, 0xBEF9A3F7, 0xC67178F2,
+    ],
+    dtype=np.uint32,
+)
+
+# 单次搜索的 nonce 上限，足够覆盖所有实际难度
+MAX_NONCE = 1 << 62
+# 并行搜索时每个线程每轮处理的 nonce 数
+CHUNK = 1 << 16
+
+
+@njit(cache=True, inline="always")
+def _rotr(x, n):
+    return ((x >> n) | (x << (32 - n))) & MASK32
+
+
+@njit(cache=True)
+def _compress(state, buf, offset, w):
+    """对 buf[offset:offset + 64] 做一次 SHA-256 压缩，结果累加到 state"""
+    for i in range(16):
+        j = offset + i * 4
+        w[i] = (np.int64(buf[j]) << 24) | (np.int64(buf[j + 1]) << 16) | (np.int64(buf[j + 2]) << 8) | buf[j + 3]
+    for i in range(16, 64):
+        s0 = _rotr(w[i - 15], 7) ^ _rotr(w[i - 15], 18) ^ (w[i - 15] >> 3)
+        s1 = _rotr(w[i - 2], 17) ^ _rotr(w[i - 2], 19) ^ (w[i - 2] >> 10)
+        w[i] = (w[i - 16] + s0 + w[i - 7] + s1) & MASK32
+
+    a = state[0]
+    b = state[1]
+    c = state[2]
+    d = state[3]
+    e = state[4]
+    f = state[5]
+    g = state[6]
+    h = state[7]
+
+    for i in range(64):
+        s1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+        ch = (e & f) ^ ((~e) & g & MASK32)
+        t1 = (h + s1 + ch + K[i] + w[i]) & MASK32
+        s0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        t2 = (s0 + maj) & MASK32
+        h = g
+        g = f
+        f = e
+        e = (d + t1) & MASK32
+        d = c
+        c = b
+        b = a
+        a = (t1 + t2) & MASK32
+
+    state[0] = (state[0] + a) & MASK32
+    state[1] = (state[1] + b) & MASK32
+    state[2] = (state[2] + c) & MASK32
+    state[3] = (state[3] + d) & MASK32
+    state[4] = (state[4] + e) & MASK32
+    state[5] = (state[5] + f) & MASK32
+    state[6] = (state[6] + g) & MASK32
+    state[7] = (state[7] + h) & MASK32
+
+
+@njit(cache=True)
+def _leading_zero_bits(state):
+    """按字跳过全零字，对首个非零字用二分法计数，不再逐位移位"""
+    for i in range(8):
+        word = state[i]
+        if word != 0:
+            count = i * 32
+            if word < 0x10000:
+                count += 16
+                word <<= 16
+            if word < 0x1000000:
+                count += 8
+                word <<= 8
+            if word < 0x10000000:
+                count += 4
+                word <<= 4
+            if word < 0x40000000:
+                count += 2
+                word <<= 2
+            if word < 0x80000000:
+                count += 1
+            return count
+    return 256
+
+
+@njit(cache=True)
+def _write_nonce(buf, prefix_len, nonce):
+    """在 buf 的前缀后写入 nonce 的十进制 ASCII，返回位数"""
+    digits = 1
+    tmp = nonce
+    while tmp >= 10:
+        tmp //= 10
+        digits += 1
+    tmp = nonce
+    for i in range(digits):
+        buf[prefix_len + digits - 1 - i] = 48 + tmp % 10
+        tmp //= 10
+    return digits
+
+
+@njit(cache=True)
+def _ascii_add(buf, prefix_len, digits, n):
+    """对 buf 中的十进制 ASCII nonce 就地加 n 并进位，返回新的位数（位数增加时整体右移）"""
+    carry = n
+    i = prefix_len + digits - 1
+    while i >= prefix_len and carry:
+        d = buf[i] - 48 + carry
+        buf[i] = 48 + d % 10
+        carry = d // 10
+        i -= 1
+    while carry:
+        for j in range(prefix_len + digits, prefix_len, -1):
+            buf[j] = buf[j - 1]
+        buf[prefix_len] = 48 + carry % 10
+        carry //= 10
+        digits += 1
+    return digits
+
+
+@njit(cache=True)
+def _pad_message(buf, msg_len, absorbed):
+    """对 buf[:msg_len] 做 SHA-256 填充，返回填充后的总字节数；absorbed 为已压缩进 midstate 的字节数"""
+    total = (msg_len + 9 + 63) // 64 * 64
+    buf[msg_len] = 0x80
+    for i in range(msg_len + 1, total - 8):
+        buf[i] = 0
+    bit_len = (absorbed + msg_len) * 8
+    for i in range(8):
+        buf[total - 1 - i] = (bit_len >> (i * 8)) & 0xFF
+    return total
+
+
+@njit(cache=True)
+def _hash_message(midstate, buf, total, state, w):
+    for i in range(8):
+        state[i] = midstate[i]
+    for offset in range(0, total, 64):
+        _compress(state, buf, offset, w)
+
+
+@njit(cache=True)
+def _find_nonce(prefix, difficulty, start, stride, count, found):
+    """从 start 开始以 stride 为步长最多尝试 count 个 nonce，found[0] 非零时提前退出；返回 nonce，未找到返回 -1
+
+    nonce 的 ASCII 只在开始时格式化一次，之后就地加 stride；填充只在位数变化时重做。
+    前缀中完整的 64 字节块只压缩一次得到 midstate，每个候选只压缩剩余部分。
+    """
+    prefix_len = prefix.shape[0]
+    absorbed = prefix_len // 64 * 64
+    tail_len = prefix_len - absorbed
+    state = np.zeros(8, dtype=np.int64)
+    w = np.zeros(64, dtype=np.int64)
+
+    midstate = np.zeros(8, dtype=np.int64)
+    for i in range(8):
+        midstate[i] = SHA256_IV[i]
+    for offset in range(0, absorbed, 64):
+        _compress(midstate, prefix, offset, w)
+
+    buf = np.zeros(tail_len + 20 + 9 + 64, dtype=np.uint8)
+    buf[:tail_len] = prefix[absorbed:]
+
+    nonce = start
+    end = min(start + count * stride, MAX_NONCE)
+    digits = _write_nonce(buf, tail_len, nonce)
+    total = _pad_message(buf, tail_len + digits, absorbed)
+    while nonce < end and found[0] == 0:
+        _hash_message(midstate, buf, total, state, w)
+        if _leading_zero_bits(state) >= difficulty:
+            found[0] = 1
+            return nonce
+        nonce += stride
+        next_digits = _ascii_add(buf, tail_len, digits, stride)
+        if next_digits != digits:
+            digits = next_digits
+            total = _pad_message(buf, tail_len + digits, absorbed)
+    return -1
+
+
+@njit(cache=True, parallel=True)
+def _find_nonce_parallel(prefix, difficulty, n_threads):
+    """每轮把 n_threads 个连续的 CHUNK 大小 nonce 块分给各线程，任一线程命中后通过 found 标志让其余线程提前退出
+
+    外层循环以 results 判断是否结束：parfor 外读取 found 可能被编译器视为不变量。
+    """
+    found = np.zeros(1, dtype=np.int8)
+    results = np.full(n_threads, -1, dtype=np.int64)
+    base = 0
+    while base < MAX_NONCE:
+        for t in prange(n_threads):
+            results[t] = _find_nonce(prefix, difficulty, base + t * CHUNK, 1, CHUNK, found)
+        for t in range(n_threads):
+            if results[t] >= 0:
+                return results
+        base += n_threads * CHUNK
+    return results
+
+
+def find_nonce(prefix: bytes, difficulty: int) -> tuple[int, bytes]:
+    """搜索满足 SHA-256(prefix + str(nonce)) 前导零位数 >= difficulty 的 nonce
+
+    Returns:
+        (nonce, 32 字节哈希)
+    """
+    prefix_arr = np.frombuffer(prefix, dtype=np.uint8)
+    n_threads = get_num_threads()
+
+    if n_threads > 1:
+        results = _find_nonce_parallel(prefix_arr, difficulty, n_threads)
+        nonce = int(min(r for r in results if r >= 0))
+    else:
+        nonce = int(_find_nonce(prefix_arr, difficulty, 0, 1, MAX_NONCE, np.zeros(1, dtype=np.int8)))
+
+    return nonce, hashlib.sha256(prefix + str(nonce).encode()).digest()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+qaq_pow 原生扩展构建脚本
+
+用法（在 checkin_qaq_al 目录下执行）:
+    python setup.py build_ext --inplace
+
+构建失败或未构建时，checkin.py 会自动回退到纯 Python 实现。
+运行时可通过环境变量 QAQ_POW_BACKEND (sha-ni / avx512 / avx2 / portable) 强制指定内核，
+QAQ_POW_THREADS 指定搜索线程数（默认为 CPU 核心数）。
+
+设置 QAQ_AL_USE_PGO=1 时启用 -march=native -flto 并做 PGO（仅 GCC）:
+先构建插桩版本，运行一轮 benchmark / find_nonce 采集 profile，再用 -fprofile-use 重新构建。
+-march=native 生成的扩展只能在构建机（或相同 CPU）上运行。MSVC 下只启用 /GL + /LTCG。
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+from setuptools import Extension, setup
+from setuptools.command.build_ext import build_ext
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+os.chdir(HERE)
+
+NATIVE_SOURCES = [
+    "native/qaq_pow.c",
+    "native/sha256.c",
+    "native/sha256_shani.c",
+    "native/sha256_8x_avx2.c",
+    "native/sha256_16x_avx512.c",
+]
+
+USE_PGO = os.getenv("QAQ_AL_USE_PGO") == "1"
+PGO_DIR = os.path.join(HERE, "build", "pgo")
+# 覆盖单路 / 多路内核和不同前缀长度（含 midstate）的训练负载
+PGO_TRAINING = (
+    "import qaq_pow\n"
+    "qaq_pow.benchmark(1500)\n"
+    "for prefix in (b'pgo:', b'p' * 100 + b':'):\n"
+    "    for difficulty in (8, 12, 18):\n"
+    "        qaq_pow.find_nonce(prefix, difficulty)\n"
+)
+
+if sys.platform == "win32":
+    extra_compile_args = ["/O2"]
+    extra_link_args = []
+else:
+    extra_compile_args = ["-O3", "-pthread"]
+    extra_link_args = ["-pthread"]
+
+
+class PgoBuildExt(build_ext):
+    """QAQ_AL_USE_PGO=1 时执行 插桩构建 → 训练 → 按 profile 重新构建"""
+
+    def build_extensions(self):
+        if not USE_PGO:
+            super().build_extensions()
+            return
+
+        if self.compiler.compiler_type == "msvc":
+            self._set_flags(["/GL"], ["/LTCG"])
+            super().build_extensions()
+            return
+
+        base = ["-march=native", "-flto"]
+        if "gcc" not in os.path.basename(self.compiler.compiler_so[0]):
+            print("QAQ_AL_USE_PGO: PGO 仅支持 GCC，当前编译器只启用 -march=native -flto")
+            self._set_flags(base, base)
+            super().build_extensions()
+            return
+
+        shutil.rmtree(PGO_DIR, ignore_errors=True)
+        generate = base + [f"-fprofile-generate={PGO_DIR}"]
+        self._set_flags(generate, generate)
+        self.force = True
+        super().build_extensions()
+
+        for ext in self.extensions:
+            ext_dir = os.path.dirname(os.path.abspath(self.get_ext_fullpath(ext.name)))
+            subprocess.run([sys.executable, "-c", PGO_TRAINING], cwd=ext_dir, check=True)
+
+        use = base + [f"-fprofile-use={PGO_DIR}", "-fprofile-correction", "-Wno-missing-profile"]
+        self._set_flags(use, base)
+        super().build_extensions()
+
+    def _set_flags(self, compile_args: list[str], link_args: list[str]) -> None:
+        for ext in self.extensions:
+            ext.extra_compile_args = extra_compile_args + compile_args
+            ext.extra_link_args = extra_link_args + link_args
+
+
+setup(
+    name="qaq_pow",
+    cmdclass={"build_ext": PgoBuildExt},
+    ext_modules=[
+        Extension(
+            "qaq_pow",
+            sources=NATIVE_SOURCES,
+            include_dirs=["native"],
+            extra_compile_args=extra_compile_args,
+            extra_link_args=extra_link_args,
+        )
+    ],
+)
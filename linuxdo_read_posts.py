@@ -6,17 +6,23 @@
 import asyncio
 import hashlib
 import json
+import logging
 import os
 import re
 import sys
+import time
 import random
 from datetime import datetime
+import orjson
 from dotenv import load_dotenv
 from camoufox.async_api import AsyncCamoufox
 from utils.browser_utils import take_screenshot, save_page_content_to_file
+from utils.disk_cache import get_or_fetch_json
 from utils.notify import notify
 from utils.mask_utils import mask_username
 
+logger = logging.getLogger("linuxdo")
+
 # 默认缓存目录，与 checkin.py 保持一致
 DEFAULT_STORAGE_STATE_DIR = "storage-states"
 
@@ -26,6 +32,68 @@ DEFAULT_BASE_TOPIC_ID = random.randint(1000000, 1100000)
 # 帖子 ID 缓存目录
 TOPIC_ID_CACHE_DIR = "linuxdo_reads"
 
+# latest.json 地址及其磁盘缓存（多个账号在缓存有效期内共享同一份帖子列表）
+LATEST_URL = "https://linux.do/latest.json"
+LATEST_CACHE_DIR = os.path.join(TOPIC_ID_CACHE_DIR, "_cache")
+LATEST_CACHE_TTL = 300
+
+# 页面导航 / 等待元素的超时时间（毫秒）
+NAV_TIMEOUT = 15000
+
+# 阅读帖子时拦截的资源类型和第三方统计域名，只保留页面脚本和接口请求
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+BLOCKED_HOSTS = ("google-analytics.com", "googletagmanager.com")
+
+# 没有历史耗时记录时，按每个帖子的平均耗时（秒）估算账号运行时间
+DEFAULT_SECONDS_PER_TOPIC = 20
+
+# 在页面中执行的滚动阅读脚本：每次滚动后等待随机时间，到达底部时提前结束
+SCROLL_TO_READ_JS = """
+async ({ n, minR, maxR, minW, maxW }) => {
+    let scrolls = 0;
+    let bottom = false;
+    for (let i = 0; i < n; i++) {
+        window.scrollBy(0, window.innerHeight * (minR + Math.random() * (maxR - minR)));
+        scrolls++;
+        await new Promise((resolve) => setTimeout(resolve, minW + Math.random() * (maxW - minW)));
+        if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 100) {
+            bottom = true;
+            break;
+        }
+    }
+    return { scrolls, bottom };
+}
+"""
+
+
+def camoufox_options() -> dict:
+    """Camoufox 启动参数：默认无头且不模拟鼠标轨迹，调试时可通过
+    LINUXDO_HEADLESS=0 显示窗口、LINUXDO_HUMANIZE=1 开启拟人化鼠标移动"""
+    return {
+        "headless": os.getenv("LINUXDO_HEADLESS", "1") != "0",
+        "humanize": os.getenv("LINUXDO_HUMANIZE", "0") == "1",
+        "locale": "en-US",
+    }
+
+
+# 本进程中已确认存在的目录，多个账号实例只需创建一次
+_READY_DIRS: set[str] = set()
+
+
+def _ensure_dir(path: str) -> None:
+    if path not in _READY_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _READY_DIRS.add(path)
+
+
+async def _block_heavy_resources(route) -> None:
+    """context.route 处理函数：中止图片 / 字体 / 媒体和统计脚本请求"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
 
 class LinuxDoReadPosts:
     """Linux.do 帖子浏览类"""
@@ -40,74 +108,114 @@ class LinuxDoReadPosts:
         self.password = password
         self.masked_username = mask_username(username)
         self.storage_state_dir = storage_state_dir
+        # 必须与 checkin.py 中 linuxdo_{hash}_storage_state.json 的命名保持一致（两者共享登录缓存，
+        # workflow 也按该文件名从 Secret 还原），因此不能更换哈希算法
         self.username_hash = hashlib.sha256(username.encode("utf-8")).hexdigest()[:8]
 
-        os.makedirs(self.storage_state_dir, exist_ok=True)
-        os.makedirs(TOPIC_ID_CACHE_DIR, exist_ok=True)
+        _ensure_dir(self.storage_state_dir)
+        _ensure_dir(TOPIC_ID_CACHE_DIR)
 
         self.topic_id_cache_file = os.path.join(TOPIC_ID_CACHE_DIR, f"{self.username_hash}_topic_id.txt")
+        self.runtime_cache_file = os.path.join(TOPIC_ID_CACHE_DIR, f"{self.username_hash}_runtime.json")
 
     async def _is_logged_in(self, page) -> bool:
         try:
-            print(f"ℹ️ {self.masked_username}: Checking login status...")
+            logger.info("ℹ️ %s: Checking login status...", self.masked_username)
+
+            # 快速判断：没有未过期的 _t 会话 cookie 时肯定未登录，无需打开页面
+            now = time.time()
+            cookies = await page.context.cookies("https://linux.do")
+            if not any(c["name"] == "_t" and (c.get("expires", -1) == -1 or c["expires"] > now) for c in cookies):
+                logger.info("ℹ️ %s: No valid session cookie, not logged in", self.masked_username)
+                return False
+
+            # cookie 存在时用 session/current.json 确认（未登录返回 404），失败时再回退到打开首页检查
+            try:
+                response = await page.context.request.get(
+                    "https://linux.do/session/current.json",
+                    headers={"Accept": "application/json"},
+                    timeout=NAV_TIMEOUT,
+                )
+                if response.status == 200:
+                    logger.info("✅ %s: Already logged in (session/current.json)", self.masked_username)
+                    return True
+                logger.info("ℹ️ %s: session/current.json returned HTTP %s", self.masked_username, response.status)
+            except Exception as e:
+                logger.warning("⚠️ %s: Session probe failed: %s", self.masked_username, e)
+
             await page.goto("https://linux.do/", wait_until="domcontentloaded")
-            await page.wait_for_timeout(3000)
+            # 等待 Discourse 前端渲染出登录状态（头像 / 登录按钮 / 登录表单），而不是固定等待
+            try:
+                await page.wait_for_selector(
+                    "#current-user, .login-button, #login-account-name", timeout=NAV_TIMEOUT
+                )
+            except Exception:
+                logger.warning("⚠️ %s: Timeout waiting for page to render, checking URL anyway", self.masked_username)
 
             current_url = page.url
-            print(f"ℹ️ {self.masked_username}: Current URL: {current_url}")
+            logger.info("ℹ️ %s: Current URL: %s", self.masked_username, current_url)
 
             if current_url.startswith("https://linux.do/login"):
-                print(f"ℹ️ {self.masked_username}: Redirected to login page, not logged in")
+                logger.info("ℹ️ %s: Redirected to login page, not logged in", self.masked_username)
                 return False
 
-            print(f"✅ {self.masked_username}: Already logged in")
+            logger.info("✅ %s: Already logged in", self.masked_username)
             return True
         except Exception as e:
-            print(f"⚠️ {self.masked_username}: Error checking login status: {e}")
+            logger.warning("⚠️ %s: Error checking login status: %s", self.masked_username, e)
             return False
 
     async def _do_login(self, page) -> bool:
         try:
-            print(f"ℹ️ {self.masked_username}: Starting login process...")
+            logger.info("ℹ️ %s: Starting login process...", self.masked_username)
 
             if not page.url.startswith("https://linux.do/login"):
                 await page.goto("https://linux.do/login", wait_until="domcontentloaded")
 
-            await page.wait_for_timeout(2000)
+            await page.wait_for_selector("#login-account-name", timeout=NAV_TIMEOUT)
             await page.fill("#login-account-name", self.username)
-            await page.wait_for_timeout(2000)
+            await page.wait_for_timeout(random.randint(300, 800))
             await page.fill("#login-account-password", self.password)
-            await page.wait_for_timeout(2000)
+            await page.wait_for_selector("#login-button:not([disabled])", timeout=NAV_TIMEOUT)
             await page.click("#login-button")
-            await page.wait_for_timeout(10000)
 
-            await save_page_content_to_file(page, "login_result", self.username)
+            # 等待离开登录页（登录成功或进入 Cloudflare 验证），超时后由下面的 URL 检查判定失败
+            try:
+                await page.wait_for_url(
+                    lambda url: not url.startswith("https://linux.do/login"), timeout=NAV_TIMEOUT
+                )
+                await page.wait_for_load_state("domcontentloaded")
+            except Exception:
+                pass
 
             current_url = page.url
-            print(f"ℹ️ {self.masked_username}: URL after login: {current_url}")
+            logger.info("ℹ️ %s: URL after login: %s", self.masked_username, current_url)
 
+            # 只在进入 Cloudflare 验证或登录失败时保存页面内容（是否落盘仍由 DEBUG 控制）
             if "linux.do/challenge" in current_url:
-                print(
-                    f"⚠️ {self.masked_username}: Cloudflare challenge detected, "
-                    "Camoufox should bypass it automatically. Waiting..."
+                await save_page_content_to_file(page, "login_result", self.username)
+                logger.warning(
+                    "⚠️ %s: Cloudflare challenge detected, Camoufox should bypass it automatically. Waiting...",
+                    self.masked_username,
                 )
                 try:
                     await page.wait_for_url("https://linux.do/", timeout=60000)
-                    print(f"✅ {self.masked_username}: Cloudflare challenge bypassed")
+                    logger.info("✅ %s: Cloudflare challenge bypassed", self.masked_username)
                 except Exception:
-                    print(f"⚠️ {self.masked_username}: Cloudflare challenge timeout")
+                    logger.warning("⚠️ %s: Cloudflare challenge timeout", self.masked_username)
 
             current_url = page.url
             if current_url.startswith("https://linux.do/login"):
-                print(f"❌ {self.masked_username}: Login failed, still on login page")
+                logger.error("❌ %s: Login failed, still on login page", self.masked_username)
+                await save_page_content_to_file(page, "login_result", self.username)
                 await take_screenshot(page, "login_failed", self.username)
                 return False
 
-            print(f"✅ {self.masked_username}: Login successful")
+            logger.info("✅ %s: Login successful", self.masked_username)
             return True
 
         except Exception as e:
-            print(f"❌ {self.masked_username}: Error during login: {e}")
+            logger.error("❌ %s: Error during login: %s", self.masked_username, e)
             await take_screenshot(page, "login_error", self.username)
             return False
 
@@ -119,133 +227,213 @@ class LinuxDoReadPosts:
                     if content:
                         return int(content)
                     else:
-                        print(f"⚠️ {self.masked_username}: Failed to load topic ID from cache, content is empty")
+                        logger.warning(
+                            "⚠️ %s: Failed to load topic ID from cache, content is empty", self.masked_username
+                        )
         except (ValueError, IOError) as e:
-            print(f"⚠️ {self.masked_username}: Failed to load topic ID from cache: {e}")
+            logger.warning("⚠️ %s: Failed to load topic ID from cache: %s", self.masked_username, e)
         return 0
 
     def _save_topic_id(self, topic_id: int) -> None:
         try:
-            with open(self.topic_id_cache_file, "w", encoding="utf-8") as f:
+            # 先写临时文件再替换，避免并发运行时读到写了一半的文件
+            tmp_file = f"{self.topic_id_cache_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
                 f.write(str(topic_id))
-            print(f"ℹ️ {self.masked_username}: Saved topic ID {topic_id} to cache")
+            os.replace(tmp_file, self.topic_id_cache_file)
+            logger.info("ℹ️ %s: Saved topic ID %s to cache", self.masked_username, topic_id)
         except IOError as e:
-            print(f"⚠️ {self.masked_username}: Failed to save topic ID: {e}")
+            logger.warning("⚠️ %s: Failed to save topic ID: %s", self.masked_username, e)
 
-    async def _get_topic_ids_from_latest(self, page) -> list:
-        """从 latest.json 获取有效的帖子 ID 列表"""
+    def estimate_runtime(self, max_posts: int) -> float:
+        """根据上次运行的每帖耗时估算本次运行时间（秒），用于调度时让耗时长的账号先开始"""
         try:
-            print(f"ℹ️ {self.masked_username}: Fetching topic IDs from latest.json...")
-            await page.goto("https://linux.do/latest.json", wait_until="domcontentloaded")
-            await page.wait_for_timeout(3000)
+            with open(self.runtime_cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            seconds_per_topic = data["duration"] / max(data["read_count"], 1)
+        except (OSError, ValueError, KeyError, TypeError):
+            seconds_per_topic = DEFAULT_SECONDS_PER_TOPIC
+        return seconds_per_topic * max_posts
+
+    def _save_runtime(self, duration: float, read_count: int) -> None:
+        try:
+            with open(self.runtime_cache_file, "w", encoding="utf-8") as f:
+                json.dump({"duration": round(duration, 1), "read_count": read_count}, f)
+        except IOError as e:
+            logger.warning("⚠️ %s: Failed to save runtime: %s", self.masked_username, e)
 
-            # 获取页面内容
-            body = await page.query_selector('body')
-            if not body:
-                print(f"⚠️ {self.masked_username}: Cannot find body element")
-                return []
+    async def _get_topic_ids_from_latest(self, page) -> list:
+        """从 latest.json 获取有效的帖子 ID 列表
 
-            json_str = await body.inner_text()
+        通过 context.request 直接请求 JSON（共享 context 的登录 cookies），不经过页面渲染。
+        结果在磁盘上缓存 LATEST_CACHE_TTL 秒，同一次运行中的其它账号直接复用。
+        """
 
-            # 尝试解析 JSON
-            data = json.loads(json_str)
+        async def fetch() -> list:
+            logger.info("ℹ️ %s: Fetching topic IDs from latest.json...", self.masked_username)
+            response = await page.context.request.get(
+                LATEST_URL,
+                headers={"Accept": "application/json"},
+                timeout=NAV_TIMEOUT,
+            )
+            if not response.ok:
+                raise RuntimeError(f"latest.json returned HTTP {response.status}")
 
-            topic_ids = []
-            if 'topic_list' in data and 'topics' in data['topic_list']:
-                for topic in data['topic_list']['topics']:
-                    if 'id' in topic:
-                        topic_ids.append(topic['id'])
+            # orjson 直接解析原始字节，比 response.json()（先解码为 str 再 json.loads）更快、分配更少
+            data = orjson.loads(await response.body())
+
+            topics = data.get('topic_list', {}).get('topics', [])
+            topic_ids = [topic['id'] for topic in topics if 'id' in topic]
 
-            print(f"✅ {self.masked_username}: Got {len(topic_ids)} topic IDs from latest.json")
+            # 空列表不写缓存，让后续账号重新请求
+            if not topic_ids:
+                raise RuntimeError("latest.json contains no topics")
+            return topic_ids
+
+        try:
+            topic_ids = await get_or_fetch_json(LATEST_URL, LATEST_CACHE_TTL, fetch, LATEST_CACHE_DIR)
+            logger.info("✅ %s: Got %s topic IDs from latest.json", self.masked_username, len(topic_ids))
             return topic_ids
 
         except json.JSONDecodeError as e:
-            print(f"⚠️ {self.masked_username}: Failed to parse latest.json: {e}")
+            logger.warning("⚠️ %s: Failed to parse latest.json: %s", self.masked_username, e)
             return []
         except Exception as e:
-            print(f"⚠️ {self.masked_username}: Error fetching latest.json: {e}")
+            logger.warning("⚠️ %s: Error fetching latest.json: %s", self.masked_username, e)
             return []
 
+    async def _wait_for_timeline(self, page):
+        """等待帖子阅读进度元素出现；帖子不存在或无权限访问（Discourse 404 页面）或超时时返回 None"""
+        try:
+            await page.wait_for_selector(".timeline-replies, .page-not-found", timeout=NAV_TIMEOUT)
+        except Exception:
+            return None
+        return await page.query_selector(".timeline-replies")
+
     async def _scroll_to_read(self, page, max_scrolls: int = 5) -> int:
         """
         模拟阅读帖子：随机滚动几次
         返回实际滚动的次数
+
+        滚动、等待和到底检查全部在一次 page.evaluate 中由浏览器完成，避免每次滚动两次往返
         """
         # 随机决定滚动次数（3-max_scrolls次）
         scroll_count = random.randint(3, max_scrolls)
-        actual_scrolls = 0
 
-        for i in range(scroll_count):
-            # 随机滚动距离（0.5-1.5 个屏幕高度）
-            scroll_ratio = random.uniform(0.5, 1.5)
-            await page.evaluate(f"window.scrollBy(0, window.innerHeight * {scroll_ratio})")
-            actual_scrolls += 1
+        result = await page.evaluate(
+            SCROLL_TO_READ_JS,
+            {
+                "n": scroll_count,
+                # 随机滚动距离（0.5-1.5 个屏幕高度）
+                "minR": 0.5,
+                "maxR": 1.5,
+                # 随机等待 2-5 秒，模拟阅读
+                "minW": 2000,
+                "maxW": 5000,
+            },
+        )
 
-            # 随机等待 2-5 秒，模拟阅读
-            wait_time = random.randint(2000, 5000)
-            await page.wait_for_timeout(wait_time)
+        if result["bottom"]:
+            logger.debug("ℹ️ %s: Reached bottom after %s scrolls", self.masked_username, result["scrolls"])
 
-            # 检查是否已经到底部
-            at_bottom = await page.evaluate(
-                "(window.innerHeight + window.scrollY) >= document.body.scrollHeight - 100"
-            )
-            if at_bottom:
-                print(f"ℹ️ {self.masked_username}: Reached bottom after {actual_scrolls} scrolls")
-                break
-
-        return actual_scrolls
+        return result["scrolls"]
 
     async def _read_posts_from_list(self, page, topic_ids: list, max_posts: int) -> tuple[int, int]:
-        """从给定的帖子 ID 列表中阅读帖子"""
-        # 随机打乱顺序
-        random.shuffle(topic_ids)
-
-        read_count = 0
-        last_topic_id = 0
-
-        for topic_id in topic_ids:
-            if read_count >= max_posts:
-                break
+        """从给定的帖子 ID 列表中阅读帖子
 
-            topic_url = f"https://linux.do/t/topic/{topic_id}"
-
-            try:
-                print(f"ℹ️ {self.masked_username}: Opening topic {topic_id}...")
-                await page.goto(topic_url, wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
+        在同一个 context 中打开 LINUXDO_PAGES_PER_ACCOUNT 个页面，多个 worker 从队列中取帖子并行阅读。
+        """
+        # 随机打乱顺序（返回新列表，不修改调用方的列表）；不按 max_posts 截断，
+        # 部分帖子可能无法访问，需要后面的帖子补足
+        queue: asyncio.Queue = asyncio.Queue()
+        for topic_id in random.sample(topic_ids, k=len(topic_ids)):
+            queue.put_nowait(topic_id)
+
+        # 同一站点，页面数保持较小
+        page_count = max(1, min(int(os.getenv("LINUXDO_PAGES_PER_ACCOUNT", "2")), max_posts))
+        pages = [page] + [await page.context.new_page() for _ in range(page_count - 1)]
+        for p in pages:
+            p.set_default_navigation_timeout(NAV_TIMEOUT)
+
+        # 计数只在事件循环中同步修改，无需加锁；in_flight 为正在阅读的帖子数，避免多个 worker 超额阅读
+        state = {"read_count": 0, "in_flight": 0, "last_topic_id": 0}
+
+        def take_topic(worker_page):
+            """取出下一个帖子并立即开始导航，返回 (topic_id, 导航 task)；没有可读帖子时返回 None"""
+            if queue.empty() or state["read_count"] + state["in_flight"] >= max_posts:
+                return None
+            topic_id = queue.get_nowait()
+            state["in_flight"] += 1
+            logger.debug("ℹ️ %s: Opening topic %s...", self.masked_username, topic_id)
+            goto_task = asyncio.create_task(
+                worker_page.goto(f"https://linux.do/t/topic/{topic_id}", wait_until="domcontentloaded")
+            )
+            return topic_id, goto_task
 
-                timeline_element = await page.query_selector(".timeline-replies")
+        async def worker(worker_page, worker_index: int) -> None:
+            # 错开各 worker 的起始时间
+            if worker_index:
+                await asyncio.sleep(random.uniform(1, 3) * worker_index)
 
-                if timeline_element:
-                    inner_text = await timeline_element.inner_text()
-                    print(f"✅ {self.masked_username}: Topic {topic_id} - Progress: {inner_text.strip()}")
+            pending = take_topic(worker_page)
+            while pending is not None:
+                topic_id, goto_task = pending
+                pending = None
+                settled = False
 
-                    # 模拟阅读：滚动几次
-                    scrolls = await self._scroll_to_read(page)
-                    print(f"ℹ️ {self.masked_username}: Scrolled {scrolls} times")
+                try:
+                    await goto_task
+                    timeline_element = await self._wait_for_timeline(worker_page)
+
+                    if timeline_element:
+                        inner_text = await timeline_element.inner_text()
+                        logger.info("✅ %s: Topic %s - Progress: %s", self.masked_username, topic_id, inner_text.strip())
+
+                        # 模拟阅读：滚动几次
+                        scrolls = await self._scroll_to_read(worker_page)
+                        logger.debug("ℹ️ %s: Scrolled %s times", self.masked_username, scrolls)
+
+                        # 每个帖子计数 1
+                        state["read_count"] += 1
+                        state["in_flight"] -= 1
+                        settled = True
+                        state["last_topic_id"] = topic_id
+                        logger.info("ℹ️ %s: %s/%s topics read", self.masked_username, state["read_count"], max_posts)
+
+                        # 先开始下一个帖子的导航，帖子之间 2-5 秒的等待与网络请求重叠
+                        pending = take_topic(worker_page)
+                        await asyncio.sleep(random.uniform(2, 5))
+                    else:
+                        logger.warning("⚠️ %s: Topic %s not accessible, skipping...", self.masked_username, topic_id)
 
-                    # 每个帖子计数 1
-                    read_count += 1
-                    last_topic_id = topic_id
-                    print(f"ℹ️ {self.masked_username}: {read_count}/{max_posts} topics read")
+                except Exception as e:
+                    logger.warning("⚠️ %s: Error reading topic %s: %s", self.masked_username, topic_id, e)
+                finally:
+                    if not settled:
+                        state["in_flight"] -= 1
 
-                    # 帖子之间额外等待 2-5 秒
-                    await page.wait_for_timeout(random.randint(2000, 5000))
-                else:
-                    print(f"⚠️ {self.masked_username}: Topic {topic_id} not accessible, skipping...")
+                if pending is None:
+                    pending = take_topic(worker_page)
 
-            except Exception as e:
-                print(f"⚠️ {self.masked_username}: Error reading topic {topic_id}: {e}")
+        try:
+            await asyncio.gather(*(worker(p, i) for i, p in enumerate(pages)))
+        finally:
+            # 调用方负责关闭传入的 page
+            for p in pages[1:]:
+                await p.close()
 
-        return last_topic_id, read_count
+        return state["last_topic_id"], state["read_count"]
 
     async def _read_posts_sequential(self, page, base_topic_id: int, max_posts: int) -> tuple[int, int]:
         """顺序遍历模式（fallback）"""
         cached_topic_id = self._load_topic_id()
         current_topic_id = max(base_topic_id, cached_topic_id)
-        print(
-            f"ℹ️ {self.masked_username}: [Fallback] Starting from topic ID {current_topic_id} "
-            f"(base: {base_topic_id}, cached: {cached_topic_id})"
+        logger.info(
+            "ℹ️ %s: [Fallback] Starting from topic ID %s (base: %s, cached: %s)",
+            self.masked_username,
+            current_topic_id,
+            base_topic_id,
+            cached_topic_id,
         )
 
         read_count = 0
@@ -255,7 +443,12 @@ class LinuxDoReadPosts:
             if invalid_count >= 5:
                 jump = random.randint(50, 100)
                 current_topic_id += jump
-                print(f"⚠️ {self.masked_username}: Too many invalid topics, jumping ahead by {jump} to {current_topic_id}")
+                logger.warning(
+                    "⚠️ %s: Too many invalid topics, jumping ahead by %s to %s",
+                    self.masked_username,
+                    jump,
+                    current_topic_id,
+                )
                 invalid_count = 0
             else:
                 current_topic_id += random.randint(1, 5)
@@ -263,218 +456,321 @@ class LinuxDoReadPosts:
             topic_url = f"https://linux.do/t/topic/{current_topic_id}"
 
             try:
-                print(f"ℹ️ {self.masked_username}: Opening topic {current_topic_id}...")
+                logger.debug("ℹ️ %s: Opening topic %s...", self.masked_username, current_topic_id)
                 await page.goto(topic_url, wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
-
-                timeline_element = await page.query_selector(".timeline-replies")
+                timeline_element = await self._wait_for_timeline(page)
 
                 if timeline_element:
                     inner_text = await timeline_element.inner_text()
-                    print(f"✅ {self.masked_username}: Topic {current_topic_id} - Progress: {inner_text.strip()}")
+                    logger.info(
+                        "✅ %s: Topic %s - Progress: %s", self.masked_username, current_topic_id, inner_text.strip()
+                    )
 
                     invalid_count = 0
 
                     # 模拟阅读：滚动几次
                     scrolls = await self._scroll_to_read(page)
-                    print(f"ℹ️ {self.masked_username}: Scrolled {scrolls} times")
+                    logger.debug("ℹ️ %s: Scrolled %s times", self.masked_username, scrolls)
 
                     # 每个帖子计数 1
                     read_count += 1
-                    print(f"ℹ️ {self.masked_username}: {read_count}/{max_posts} topics read")
+                    logger.info("ℹ️ %s: %s/%s topics read", self.masked_username, read_count, max_posts)
 
                     # 帖子之间额外等待 2-5 秒
                     await page.wait_for_timeout(random.randint(2000, 5000))
                 else:
-                    print(f"⚠️ {self.masked_username}: Topic {current_topic_id} not found or invalid, skipping...")
+                    logger.warning(
+                        "⚠️ %s: Topic %s not found or invalid, skipping...", self.masked_username, current_topic_id
+                    )
                     invalid_count += 1
 
             except Exception as e:
-                print(f"⚠️ {self.masked_username}: Error reading topic {current_topic_id}: {e}")
+                logger.warning("⚠️ %s: Error reading topic %s: %s", self.masked_username, current_topic_id, e)
                 invalid_count += 1
 
         self._save_topic_id(current_topic_id)
 
         return current_topic_id, read_count
 
-    async def run(self, max_posts: int = 100) -> tuple[bool, dict]:
-        print(f"ℹ️ {self.masked_username}: Starting Linux.do read posts task")
+    async def run(self, max_posts: int = 100, browser=None, context_pool=None) -> tuple[bool, dict]:
+        """执行阅读任务
 
+        Args:
+            max_posts: 最多阅读的帖子数
+            browser: 外部传入的 Camoufox 浏览器实例，多个账号共享时使用；
+                为 None 时自行启动并关闭浏览器
+            context_pool: 多个账号共享的 ContextPool，优先于 browser 使用
+        """
+        logger.info("ℹ️ %s: Starting Linux.do read posts task", self.masked_username)
+        start = time.monotonic()
+
+        if context_pool is not None:
+            success, result = await self._run_with_pool(context_pool, max_posts)
+        elif browser is not None:
+            context_pool = ContextPool(browser)
+            try:
+                success, result = await self._run_with_pool(context_pool, max_posts)
+            finally:
+                await context_pool.close()
+        else:
+            async with AsyncCamoufox(**camoufox_options()) as browser:
+                success, result = await self._run_with_pool(ContextPool(browser), max_posts)
+
+        if success:
+            self._save_runtime(time.monotonic() - start, result.get("read_count", 0))
+        return success, result
+
+    async def _run_with_pool(self, context_pool: "ContextPool", max_posts: int) -> tuple[bool, dict]:
+        """从 context 池中取出 context 并换入当前账号的 cookies，登录并阅读帖子"""
         cache_file_path = f"{self.storage_state_dir}/linuxdo_{self.username_hash}_storage_state.json"
 
         base_topic_id_str = os.getenv("LINUXDO_BASE_TOPIC_ID", "")
         base_topic_id = int(base_topic_id_str) if base_topic_id_str else DEFAULT_BASE_TOPIC_ID
 
-        async with AsyncCamoufox(
-            headless=False,
-            humanize=True,
-            locale="en-US",
-        ) as browser:
-            storage_state = cache_file_path if os.path.exists(cache_file_path) else None
-            if storage_state:
-                print(f"ℹ️ {self.masked_username}: Restoring storage state from cache")
-            else:
-                print(f"ℹ️ {self.masked_username}: No cache file found, starting fresh")
+        storage_state = cache_file_path if os.path.exists(cache_file_path) else None
+        if storage_state:
+            logger.info("ℹ️ %s: Restoring storage state from cache", self.masked_username)
+        else:
+            logger.info("ℹ️ %s: No cache file found, starting fresh", self.masked_username)
 
-            context = await browser.new_context(storage_state=storage_state)
-            page = await context.new_page()
+        context = await context_pool.acquire(storage_state)
+        page = await context.new_page()
 
-            try:
-                is_logged_in = await self._is_logged_in(page)
+        try:
+            is_logged_in = await self._is_logged_in(page)
 
-                if not is_logged_in:
+            if not is_logged_in:
+                # 登录页的 Cloudflare 验证可能依赖图片等资源，登录期间不拦截
+                await context.unroute("**/*", _block_heavy_resources)
+                try:
                     login_success = await self._do_login(page)
-                    if not login_success:
-                        return False, {"error": "Login failed"}
+                finally:
+                    await context.route("**/*", _block_heavy_resources)
+                if not login_success:
+                    return False, {"error": "Login failed"}
 
-                    await context.storage_state(path=cache_file_path)
-                    print(f"✅ {self.masked_username}: Storage state saved to cache file")
+                await context.storage_state(path=cache_file_path)
+                logger.info("✅ %s: Storage state saved to cache file", self.masked_username)
 
-                print(f"ℹ️ {self.masked_username}: Starting to read posts...")
+            logger.info("ℹ️ %s: Starting to read posts...", self.masked_username)
 
-                # 优先从 latest.json 获取帖子 ID
-                topic_ids = []
-                try:
-                    topic_ids = await self._get_topic_ids_from_latest(page)
-                except Exception as e:
-                    print(f"⚠️ {self.masked_username}: Failed to get topic IDs: {e}")
+            # 优先从 latest.json 获取帖子 ID
+            topic_ids = []
+            try:
+                topic_ids = await self._get_topic_ids_from_latest(page)
+            except Exception as e:
+                logger.warning("⚠️ %s: Failed to get topic IDs: %s", self.masked_username, e)
+
+            if topic_ids and len(topic_ids) > 0:
+                # 使用 latest.json 获取的帖子列表
+                last_topic_id, read_count = await self._read_posts_from_list(page, topic_ids, max_posts)
+                # 记录实际读到的帖子 ID，下次 latest.json 不可用时顺序模式从这里附近开始；
+                # 没有读到任何帖子时不更新，避免跳过未读的帖子
+                if read_count > 0:
+                    self._save_topic_id(last_topic_id)
+            else:
+                # Fallback 到顺序遍历模式
+                logger.warning("⚠️ %s: Falling back to sequential mode...", self.masked_username)
+                last_topic_id, read_count = await self._read_posts_sequential(page, base_topic_id, max_posts)
 
-                if topic_ids and len(topic_ids) > 0:
-                    # 使用 latest.json 获取的帖子列表
-                    last_topic_id, read_count = await self._read_posts_from_list(page, topic_ids, max_posts)
-                else:
-                    # Fallback 到顺序遍历模式
-                    print(f"⚠️ {self.masked_username}: Falling back to sequential mode...")
-                    last_topic_id, read_count = await self._read_posts_sequential(page, base_topic_id, max_posts)
+            logger.info("✅ %s: Successfully read %s topics", self.masked_username, read_count)
+            return True, {
+                "read_count": read_count,
+                "last_topic_id": last_topic_id,
+            }
+
+        except Exception as e:
+            logger.error("❌ %s: Error occurred: %s", self.masked_username, e)
+            await take_screenshot(page, "error", self.username)
+            return False, {"error": str(e)}
+        finally:
+            await page.close()
+            await context_pool.release(context)
 
-                print(f"✅ {self.masked_username}: Successfully read {read_count} topics")
-                return True, {
-                    "read_count": read_count,
-                    "last_topic_id": last_topic_id,
-                }
 
-            except Exception as e:
-                print(f"❌ {self.masked_username}: Error occurred: {e}")
-                await take_screenshot(page, "error", self.username)
-                return False, {"error": str(e)}
-            finally:
-                await page.close()
+class ContextPool:
+    """可复用的 BrowserContext 池
+
+    账号之间复用已创建的 context，只换入 / 清空 cookies，省去反复创建和销毁 context 的开销。
+    linux.do 的登录状态只依赖 cookies（_t 等），storage state 中的 localStorage 不做恢复。
+    池的大小由同时取用的 worker 数自然限制。
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._all: list = []
+
+    async def acquire(self, storage_state_path: str | None = None):
+        """取出一个空闲 context（没有则新建），清空 cookies 后载入 storage state 中的 cookies"""
+        try:
+            context = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            context = await self.browser.new_context()
+            await context.route("**/*", _block_heavy_resources)
+            self._all.append(context)
+
+        await context.clear_cookies()
+        if storage_state_path:
+            try:
+                with open(storage_state_path, "r", encoding="utf-8") as f:
+                    cookies = json.load(f).get("cookies", [])
+                if cookies:
+                    await context.add_cookies(cookies)
+            except (OSError, ValueError) as e:
+                logger.warning("⚠️ Failed to load storage state %s: %s", storage_state_path, e)
+        return context
+
+    async def release(self, context) -> None:
+        """清空 cookies 后放回池中；context 已不可用时直接丢弃"""
+        try:
+            await context.clear_cookies()
+        except Exception:
+            self._all.remove(context)
+            return
+        self._idle.put_nowait(context)
+
+    async def close(self) -> None:
+        for context in self._all:
+            try:
                 await context.close()
+            except Exception:
+                pass
+        self._all.clear()
 
 
 def load_linuxdo_accounts() -> list[dict]:
     accounts_str = os.getenv("ACCOUNTS")
     if not accounts_str:
-        print("❌ ACCOUNTS environment variable not found")
+        logger.error("❌ ACCOUNTS environment variable not found")
         return []
 
     try:
         accounts_data = json.loads(accounts_str)
 
         if not isinstance(accounts_data, list):
-            print("❌ ACCOUNTS must be a JSON array")
+            logger.error("❌ ACCOUNTS must be a JSON array")
             return []
 
         linuxdo_accounts = []
         seen_usernames = set()
+        invalid_indexes = []
+        duplicate_count = 0
 
         for i, account in enumerate(accounts_data):
-            if not isinstance(account, dict):
-                print(f"⚠️ ACCOUNTS[{i}] must be a dictionary, skipping")
-                continue
-
-            username = account.get("username")
-            masked_username = mask_username(username)
-            password = account.get("password")
-
-            if not username or not password:
-                print(f"⚠️ ACCOUNTS[{i}] missing username or password, skipping")
+            if not isinstance(account, dict) or not account.get("username") or not account.get("password"):
+                invalid_indexes.append(i)
                 continue
 
+            username = account["username"]
             if username in seen_usernames:
-                print(f"ℹ️ Skipping duplicate account: {masked_username}")
+                duplicate_count += 1
                 continue
 
             seen_usernames.add(username)
-            linuxdo_accounts.append(
-                {
-                    "username": username,
-                    "password": password,
-                }
-            )
+            linuxdo_accounts.append({"username": username, "password": account["password"]})
+
+        # 汇总输出警告，避免逐条打印
+        if invalid_indexes:
+            logger.warning("⚠️ ACCOUNTS%s must be dictionaries with username and password, skipping", invalid_indexes)
+        if duplicate_count:
+            logger.info("ℹ️ Skipping %s duplicate account(s)", duplicate_count)
 
         return linuxdo_accounts
 
     except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse ACCOUNTS: {e}")
+        logger.error("❌ Failed to parse ACCOUNTS: %s", e)
         return []
     except Exception as e:
-        print(f"❌ Error loading ACCOUNTS: {e}")
+        logger.error("❌ Error loading ACCOUNTS: %s", e)
         return []
 
 
 async def main():
     load_dotenv(override=True)
 
-    print("🚀 Linux.do read posts script started")
-    print(f'🕒 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+    logger.info("🚀 Linux.do read posts script started")
+    logger.info("🕒 Execution time: %s", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
     accounts = load_linuxdo_accounts()
 
     if not accounts:
-        print("❌ No accounts with linux.do configuration found")
+        logger.error("❌ No accounts with linux.do configuration found")
         return
 
-    print(f"ℹ️ Found {len(accounts)} account(s) with linux.do configuration")
+    logger.info("ℹ️ Found %s account(s) with linux.do configuration", len(accounts))
 
-    results = []
+    concurrency = max(1, int(os.getenv("LINUXDO_CONCURRENCY", "3")))
+    logger.info("ℹ️ Running up to %s account(s) concurrently in a shared browser", concurrency)
+
+    # 最长处理时间优先（LPT）：按预估耗时从长到短排队，空闲的 worker 总是取下一个最长的任务
+    jobs = []
+    for index, account in enumerate(accounts):
+        reader = LinuxDoReadPosts(
+            username=account["username"],
+            password=account["password"],
+        )
+        # 每次阅读 10-20 个帖子
+        max_posts = random.randint(10, 20)
+        jobs.append((reader.estimate_runtime(max_posts), index, reader, max_posts))
+    jobs.sort(key=lambda job: job[0], reverse=True)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    outcomes: list = [None] * len(accounts)
+
+    async def run_one(context_pool: ContextPool, reader: LinuxDoReadPosts, max_posts: int) -> dict:
+        logger.info("📌 Processing: %s", reader.masked_username)
 
-    for account in accounts:
-        username = account["username"]
-        masked_username = mask_username(username)
-        password = account["password"]
+        start_time = datetime.now()
+        success, result = await reader.run(max_posts, context_pool=context_pool)
+        duration = datetime.now() - start_time
 
-        print(f"\n{'='*50}")
-        print(f"📌 Processing: {masked_username}")
-        print(f"{'='*50}")
+        total_seconds = int(duration.total_seconds())
+        hours, remainder = divmod(total_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        duration_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
+        logger.info(
+            "Result: %s success=%s, result=%s, duration=%s", reader.masked_username, success, result, duration_str
+        )
+
+        return {
+            "username": reader.username,
+            "success": success,
+            "result": result,
+            "duration": duration_str,
+        }
+
+    async def worker(context_pool: ContextPool) -> None:
+        while not queue.empty():
+            _, index, reader, max_posts = queue.get_nowait()
+            try:
+                outcomes[index] = await run_one(context_pool, reader, max_posts)
+            except Exception as e:
+                outcomes[index] = e
+
+    # 只启动一个浏览器，账号之间复用 ContextPool 中的 context，每次取用时换入该账号的 cookies
+    async with AsyncCamoufox(**camoufox_options()) as browser:
+        context_pool = ContextPool(browser)
         try:
-            reader = LinuxDoReadPosts(
-                username=username,
-                password=password,
-            )
+            await asyncio.gather(*(worker(context_pool) for _ in range(min(concurrency, len(jobs)))))
+        finally:
+            await context_pool.close()
 
-            start_time = datetime.now()
-            # 每次阅读 10-20 个帖子
-            success, result = await reader.run(random.randint(10, 20))
-            end_time = datetime.now()
-            duration = end_time - start_time
-
-            total_seconds = int(duration.total_seconds())
-            hours, remainder = divmod(total_seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            duration_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-            print(f"Result: success={success}, result={result}, duration={duration_str}")
-
-            results.append(
-                {
-                    "username": username,
-                    "success": success,
-                    "result": result,
-                    "duration": duration_str,
-                }
-            )
-        except Exception as e:
-            print(f"❌ {masked_username}: Exception occurred: {e}")
-            results.append(
-                {
-                    "username": username,
-                    "success": False,
-                    "result": {"error": str(e)},
-                    "duration": "00:00:00",
-                }
-            )
+    results = []
+    for account, outcome in zip(accounts, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error("❌ %s: Exception occurred: %s", mask_username(account["username"]), outcome)
+            outcome = {
+                "username": account["username"],
+                "success": False,
+                "result": {"error": str(outcome)},
+                "duration": "00:00:00",
+            }
+        results.append(outcome)
 
     if results:
         notification_lines = [
@@ -506,14 +802,25 @@ async def main():
         notify.push_message("Linux.do Read Posts", notify_content, msg_type="text")
 
 
+def setup_logging() -> None:
+    """配置日志：级别由 LOG_LEVEL 控制（DEBUG 时输出每个帖子的打开 / 滚动细节）
+
+    直接写 stdout 不做缓冲，CI 中任务卡住或被终止时也能看到已经执行到哪一步。
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[stream_handler])
+
+
 def run_main():
+    setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("\n⚠️ Program interrupted by user")
+        logger.warning("⚠️ Program interrupted by user")
         sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Error occurred during program execution: {e}")
+        logger.error("❌ Error occurred during program execution: %s", e)
         sys.exit(1)
 
 
@@ -6,12 +6,16 @@
 import asyncio
 import hashlib
 import json
+import logging
+import os
 import sys
 from datetime import datetime
 from dotenv import load_dotenv
 from utils.config import AppConfig
 from utils.notify import notify
 from utils.balance_hash import load_balance_hash, save_balance_hash
+from utils.http_utils import close_pooled_async_sessions
+from utils.get_cdk import close_shared_browsers
 from checkin import CheckIn
 
 load_dotenv(override=True)
@@ -41,161 +45,195 @@ async def main():
             退出码: 0 表示至少有一个账号成功, 1 表示全部失败
     """
 
-    print("🚀 newapi.ai multi-account auto check-in script started (using Camoufox)")
-    print(f'🕒 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+    try:
+        print("🚀 newapi.ai multi-account auto check-in script started (using Camoufox)")
+        print(f'🕒 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
 
-    app_config = AppConfig.load_from_env()
-    print(f"⚙️ Loaded {len(app_config.providers)} provider(s)")
+        app_config = AppConfig.load_from_env()
+        print(f"⚙️ Loaded {len(app_config.providers)} provider(s)")
 
-    # 检查账号配置
-    if not app_config.accounts:
-        print("❌ Unable to load account configuration, program exits")
-        return 1
+        # 检查账号配置
+        if not app_config.accounts:
+            print("❌ Unable to load account configuration, program exits")
+            return 1
     
-    print(f"⚙️ Found {len(app_config.accounts)} account(s)")
-
-    # 加载余额hash
-    last_balance_hash = load_balance_hash(BALANCE_HASH_FILE)
+        print(f"⚙️ Found {len(app_config.accounts)} account(s)")
 
-    # 为每个账号执行签到
-    success_count = 0
-    total_count = 0
-    notification_content = []
-    current_balances = {}
-    need_notify = False  # 是否需要发送通知
+        # 加载余额hash
+        last_balance_hash = load_balance_hash(BALANCE_HASH_FILE)
 
-    for i, account_config in enumerate(app_config.accounts):
-        account_key = f"account_{i + 1}"
-        account_name = account_config.get_display_name(i)
-        if len(notification_content) > 0:
-            notification_content.append("\n-------------------------------")
+        concurrency = max(1, int(os.getenv("CHECKIN_CONCURRENCY", "4")))
+        print(f"⚙️ Processing up to {concurrency} account(s) concurrently")
+        sem = asyncio.Semaphore(concurrency)
 
-        try:
+        async def process_account(account_name: str, account_config) -> list | None:
+            """执行单个账号的签到，未找到 provider 配置时返回 None"""
             provider_config = app_config.get_provider(account_config.provider)
             if not provider_config:
-                print(f"❌ {account_name}: Provider '{account_config.provider}' configuration not found")
-                need_notify = True
-                notification_content.append(
-                    f"[FAIL] {account_name}: Provider '{account_config.provider}' configuration not found"
-                )
+                return None
+
+            async with sem:
+                print(f"🌀 Processing {account_name} using provider '{account_config.provider}'")
+                checkin = CheckIn(account_name, account_config, provider_config, global_proxy=app_config.global_proxy)
+                return await checkin.execute()
+
+        # 并发执行所有账号的签到，之后按账号顺序汇总结果
+        account_names = [account_config.get_display_name(i) for i, account_config in enumerate(app_config.accounts)]
+        outcomes = await asyncio.gather(
+            *(
+                process_account(account_name, account_config)
+                for account_name, account_config in zip(account_names, app_config.accounts)
+            ),
+            return_exceptions=True,
+        )
+
+        # 汇总每个账号的签到结果
+        success_count = 0
+        total_count = 0
+        notification_content = []
+        current_balances = {}
+        need_notify = False  # 是否需要发送通知
+
+        for i, (account_config, account_name, results) in enumerate(zip(app_config.accounts, account_names, outcomes)):
+            account_key = f"account_{i + 1}"
+            if len(notification_content) > 0:
+                notification_content.append("\n-------------------------------")
+
+            if isinstance(results, BaseException):
+                print(f"❌ {account_name} processing exception: {results}")
+                need_notify = True  # 异常也需要通知
+                notification_content.append(f"❌ {account_name} Exception: {str(results)[:100]}...")
                 continue
 
-            print(f"🌀 Processing {account_name} using provider '{account_config.provider}'")
-            checkin = CheckIn(account_name, account_config, provider_config, global_proxy=app_config.global_proxy)
-            results = await checkin.execute()
-
-            total_count += len(results)
-
-            # 处理多个认证方式的结果
-            account_success = False
-            successful_methods = []
-            failed_methods = []
-
-            this_account_balances = {}
-            # 构建详细的结果报告
-            account_result = f"📣 {account_name} Summary:\n"
-            for auth_method, success, user_info in results:
-                status = "✅ SUCCESS" if success else "❌ FAILED"
-                account_result += f"  {status} with {auth_method} authentication\n"
-
-                if success and user_info and user_info.get("success"):
-                    account_success = True
-                    success_count += 1
-                    successful_methods.append(auth_method)
-                    account_result += f"    💰 {user_info['display']}\n"
-                    # 记录余额信息
-                    current_quota = user_info["quota"]
-                    current_used = user_info["used_quota"]
-                    current_bonus = user_info["bonus_quota"]
-                    this_account_balances[f"{auth_method}"] = {
-                        "quota": current_quota,
-                        "used": current_used,
-                        "bonus": current_bonus,
-                    }
-                else:
-                    failed_methods.append(auth_method)
-                    error_msg = user_info.get("error", "Unknown error") if user_info else "Unknown error"
-                    account_result += f"    🔺 {str(error_msg)}\n"
-
-            if account_success:
-                current_balances[account_key] = this_account_balances
-
-            # 如果所有认证方式都失败，需要通知
-            if not account_success and results:
+            try:
+                if results is None:
+                    print(f"❌ {account_name}: Provider '{account_config.provider}' configuration not found")
+                    need_notify = True
+                    notification_content.append(
+                        f"[FAIL] {account_name}: Provider '{account_config.provider}' configuration not found"
+                    )
+                    continue
+
+                total_count += len(results)
+
+                # 处理多个认证方式的结果
+                account_success = False
+                successful_methods = []
+                failed_methods = []
+
+                this_account_balances = {}
+                # 构建详细的结果报告
+                account_result = f"📣 {account_name} Summary:\n"
+                for auth_method, success, user_info in results:
+                    status = "✅ SUCCESS" if success else "❌ FAILED"
+                    account_result += f"  {status} with {auth_method} authentication\n"
+
+                    if success and user_info and user_info.get("success"):
+                        account_success = True
+                        success_count += 1
+                        successful_methods.append(auth_method)
+                        account_result += f"    💰 {user_info['display']}\n"
+                        # 记录余额信息
+                        current_quota = user_info["quota"]
+                        current_used = user_info["used_quota"]
+                        current_bonus = user_info["bonus_quota"]
+                        this_account_balances[f"{auth_method}"] = {
+                            "quota": current_quota,
+                            "used": current_used,
+                            "bonus": current_bonus,
+                        }
+                    else:
+                        failed_methods.append(auth_method)
+                        error_msg = user_info.get("error", "Unknown error") if user_info else "Unknown error"
+                        account_result += f"    🔺 {str(error_msg)}\n"
+
+                if account_success:
+                    current_balances[account_key] = this_account_balances
+
+                # 如果所有认证方式都失败，需要通知
+                if not account_success and results:
+                    need_notify = True
+                    print(f"🔔 {account_name} all authentication methods failed, will send notification")
+
+                # 如果有失败的认证方式，也通知
+                if failed_methods and successful_methods:
+                    need_notify = True
+                    print(f"🔔 {account_name} has some failed authentication methods, will send notification")
+
+                # 添加统计信息
+                success_count_methods = len(successful_methods)
+                failed_count_methods = len(failed_methods)
+
+                account_result += f"\n📊 Statistics: {success_count_methods}/{len(results)} methods successful"
+                if failed_count_methods > 0:
+                    account_result += f" ({failed_count_methods} failed)"
+
+                notification_content.append(account_result)
+
+            except Exception as e:
+                print(f"❌ {account_name} processing exception: {e}")
+                need_notify = True  # 异常也需要通知
+                notification_content.append(f"❌ {account_name} Exception: {str(e)[:100]}...")
+
+        # 检查余额变化
+        current_balance_hash = generate_balance_hash(current_balances) if current_balances else None
+        print(f"\n\nℹ️ Current balance hash: {current_balance_hash}, Last balance hash: {last_balance_hash}")
+        if current_balance_hash:
+            if last_balance_hash is None:
+                # 首次运行
                 need_notify = True
-                print(f"🔔 {account_name} all authentication methods failed, will send notification")
-
-            # 如果有失败的认证方式，也通知
-            if failed_methods and successful_methods:
+                print("🔔 First run detected, will send notification with current balances")
+            elif current_balance_hash != last_balance_hash:
+                # 余额有变化
                 need_notify = True
-                print(f"🔔 {account_name} has some failed authentication methods, will send notification")
-
-            # 添加统计信息
-            success_count_methods = len(successful_methods)
-            failed_count_methods = len(failed_methods)
-
-            account_result += f"\n📊 Statistics: {success_count_methods}/{len(results)} methods successful"
-            if failed_count_methods > 0:
-                account_result += f" ({failed_count_methods} failed)"
-
-            notification_content.append(account_result)
-
-        except Exception as e:
-            print(f"❌ {account_name} processing exception: {e}")
-            need_notify = True  # 异常也需要通知
-            notification_content.append(f"❌ {account_name} Exception: {str(e)[:100]}...")
-
-    # 检查余额变化
-    current_balance_hash = generate_balance_hash(current_balances) if current_balances else None
-    print(f"\n\nℹ️ Current balance hash: {current_balance_hash}, Last balance hash: {last_balance_hash}")
-    if current_balance_hash:
-        if last_balance_hash is None:
-            # 首次运行
-            need_notify = True
-            print("🔔 First run detected, will send notification with current balances")
-        elif current_balance_hash != last_balance_hash:
-            # 余额有变化
-            need_notify = True
-            print("🔔 Balance changes detected, will send notification")
+                print("🔔 Balance changes detected, will send notification")
+            else:
+                print("ℹ️ No balance changes detected")
+
+        # 保存当前余额hash
+        if current_balance_hash:
+            save_balance_hash(BALANCE_HASH_FILE, current_balance_hash)
+
+        if need_notify and notification_content:
+            # 构建通知内容
+            summary = [
+                "-------------------------------",
+                "📢 Check-in result statistics:",
+                f"🔵 Success: {success_count}/{total_count}",
+                f"🔴 Failed: {total_count - success_count}/{total_count}",
+            ]
+
+            if success_count == total_count:
+                summary.append("✅ All accounts check-in successful!")
+            elif success_count > 0:
+                summary.append("⚠️ Some accounts check-in successful")
+            else:
+                summary.append("❌ All accounts check-in failed")
+
+            time_info = f'🕓 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+
+            notify_content = "\n\n".join([time_info, "\n".join(notification_content), "\n".join(summary)])
+
+            print(notify_content)
+            notify.push_message("Check-in Alert", notify_content, msg_type="text")
+            print("🔔 Notification sent due to failures or balance changes")
         else:
-            print("ℹ️ No balance changes detected")
-
-    # 保存当前余额hash
-    if current_balance_hash:
-        save_balance_hash(BALANCE_HASH_FILE, current_balance_hash)
-
-    if need_notify and notification_content:
-        # 构建通知内容
-        summary = [
-            "-------------------------------",
-            "📢 Check-in result statistics:",
-            f"🔵 Success: {success_count}/{total_count}",
-            f"🔴 Failed: {total_count - success_count}/{total_count}",
-        ]
-
-        if success_count == total_count:
-            summary.append("✅ All accounts check-in successful!")
-        elif success_count > 0:
-            summary.append("⚠️ Some accounts check-in successful")
-        else:
-            summary.append("❌ All accounts check-in failed")
-
-        time_info = f'🕓 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
-
-        notify_content = "\n\n".join([time_info, "\n".join(notification_content), "\n".join(summary)])
+            print("ℹ️ All accounts successful and no balance changes detected, notification skipped")
 
-        print(notify_content)
-        notify.push_message("Check-in Alert", notify_content, msg_type="text")
-        print("🔔 Notification sent due to failures or balance changes")
-    else:
-        print("ℹ️ All accounts successful and no balance changes detected, notification skipped")
-
-    # 设置退出码
-    sys.exit(0 if success_count > 0 else 1)
+        # 设置退出码
+        sys.exit(0 if success_count > 0 else 1)
+    finally:
+        # 无论是否出现异常，都关闭共享的异步 HTTP 会话和浏览器，避免事件循环结束时残留
+        try:
+            await close_pooled_async_sessions()
+        finally:
+            await close_shared_browsers()
 
 
 def run_main():
     """运行主函数的包装函数"""
+    # 调试日志（如 b4u 抽奖原始响应）默认不输出，设置 LOG_LEVEL=DEBUG 时启用
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper(), format="%(levelname)s %(message)s")
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -3,6 +3,7 @@
 使用 GitHub 账号执行登录授权
 """
 
+import asyncio
 import json
 import os
 from urllib.parse import urlparse, parse_qs
@@ -186,7 +187,10 @@ class GitHubSignIn:
                                                 "description": "OTP from authenticator app",
                                             }
                                         }
-                                        secrets = wait_for_secrets.get(
+                                        # get() 内部会 time.sleep 轮询最长数分钟，放到线程中执行，
+                                        # 避免阻塞事件循环上其他并发账号的浏览器操作
+                                        secrets = await asyncio.to_thread(
+                                            wait_for_secrets.get,
                                             secret_obj,
                                             timeout=5,
                                             notification={
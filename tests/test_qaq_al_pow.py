@@ -0,0 +1,129 @@
+import hashlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录和 checkin_qaq_al 目录到 PATH（qaq_pow 原生模块构建在 checkin_qaq_al 下）
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.append(str(project_root / 'checkin_qaq_al'))
+
+from checkin_qaq_al import checkin as qaq_checkin
+
+
+def _leading_zero_bits(hash_bytes: bytes) -> int:
+	return 256 - int.from_bytes(hash_bytes, 'big').bit_length()
+
+
+def _assert_valid(challenge: str, difficulty: int, result: dict):
+	expected = hashlib.sha256(f'{challenge}:{result["nonce"]}'.encode()).digest()
+	assert result['hash'] == expected.hex()
+	assert result['leading'] >= difficulty
+	assert _leading_zero_bits(expected) >= difficulty
+
+
+@pytest.mark.parametrize('challenge', ['abc', 'c' * 60, 'd' * 130])
+def test_calculate_nonce(challenge):
+	result = qaq_checkin.calculate_nonce(challenge, 12)
+	_assert_valid(challenge, 12, result)
+
+
+def test_calculate_nonce_python_fallback(monkeypatch):
+	monkeypatch.setattr(qaq_checkin, 'qaq_pow', None)
+	monkeypatch.setattr(qaq_checkin, 'pow_numba', None)
+	result = qaq_checkin.calculate_nonce('fallback', 10)
+	_assert_valid('fallback', 10, result)
+
+
+def test_numba_find_nonce_matches_hashlib():
+	pow_numba = pytest.importorskip('pow_numba')
+	for prefix in (b'x:', b'y' * 54 + b':', b'w' * 63 + b':', b'z' * 70 + b':'):
+		nonce, hash_bytes = pow_numba.find_nonce(prefix, 10)
+		assert hash_bytes == hashlib.sha256(prefix + str(nonce).encode()).digest()
+		assert _leading_zero_bits(hash_bytes) >= 10
+
+
+def test_native_find_nonce_matches_hashlib():
+	qaq_pow = pytest.importorskip('qaq_pow')
+	for prefix in (b'x:', b'y' * 54 + b':', b'z' * 70 + b':'):
+		for difficulty in (0, 4, 16):
+			nonce, hash_bytes = qaq_pow.find_nonce(prefix, difficulty, 7)
+			assert nonce >= 7
+			assert hash_bytes == hashlib.sha256(prefix + str(nonce).encode()).digest()
+			assert _leading_zero_bits(hash_bytes) >= difficulty
+
+
+@pytest.mark.parametrize('backend', ['sha-ni', 'avx512', 'avx2', 'portable'])
+def test_native_backends(backend):
+	pytest.importorskip('qaq_pow')
+	code = (
+		'import hashlib, qaq_pow\n'
+		'for prefix in (b"a:", b"b" * 53 + b":", b"e" * 63 + b":", b"c" * 120 + b":"):\n'
+		'    for start in (0, 95, 999990):\n'
+		'        nonce, h = qaq_pow.find_nonce(prefix, 12, start)\n'
+		'        assert nonce >= start\n'
+		'        assert h == hashlib.sha256(prefix + str(nonce).encode()).digest()\n'
+		'        assert 256 - int.from_bytes(h, "big").bit_length() >= 12\n'
+	)
+	env = dict(os.environ, QAQ_POW_BACKEND=backend)
+	subprocess.run([sys.executable, '-c', code], cwd=project_root / 'checkin_qaq_al', env=env, check=True)
+
+
+def test_native_threads_match_single_thread():
+	pytest.importorskip('qaq_pow')
+	code = 'import qaq_pow; print(qaq_pow.find_nonce(b"threads:", 14, 5)[0])'
+	nonces = set()
+	for threads in ('1', '4'):
+		env = dict(os.environ, QAQ_POW_THREADS=threads)
+		result = subprocess.run(
+			[sys.executable, '-c', code],
+			cwd=project_root / 'checkin_qaq_al',
+			env=env,
+			check=True,
+			capture_output=True,
+			text=True,
+		)
+		nonces.add(result.stdout.strip())
+	assert len(nonces) == 1
+
+
+def test_benchmark_hps():
+	assert qaq_checkin.benchmark_hps() > 0
+
+
+def test_get_hps_uses_cache(tmp_path, monkeypatch):
+	monkeypatch.setattr(qaq_checkin, 'HPS_CACHE_FILE', tmp_path / 'hps.json')
+	calls = []
+
+	def fake_benchmark():
+		calls.append(1)
+		return 12345
+
+	monkeypatch.setattr(qaq_checkin, 'benchmark_hps', fake_benchmark)
+	assert qaq_checkin.get_hps() == 12345
+	assert qaq_checkin.get_hps() == 12345
+	assert len(calls) == 1
+
+	monkeypatch.setattr(qaq_checkin, 'HPS_CACHE_TTL', 0)
+	assert qaq_checkin.get_hps() == 12345
+	assert len(calls) == 2
+
+
+def test_execute_skips_benchmark_when_challenge_fails(monkeypatch):
+	import asyncio
+
+	def fail_benchmark():
+		raise AssertionError('benchmark should not run')
+
+	monkeypatch.setattr(qaq_checkin, 'benchmark_hps', fail_benchmark)
+	monkeypatch.setattr(qaq_checkin, 'load_cached_hps', lambda: None)
+	monkeypatch.setattr(qaq_checkin.CheckIn, '_check_me', lambda self, session: {'user': {}, 'signedInToday': False})
+	monkeypatch.setattr(qaq_checkin.CheckIn, '_get_challenge', lambda self, session, tier, hps: None)
+
+	checkin = qaq_checkin.CheckIn('account_test')
+	success, result = asyncio.run(checkin.execute('sid', cf_bundle=({'cf_clearance': 'x'}, {})))
+	assert not success
+	assert result['error'] == '获取挑战失败'
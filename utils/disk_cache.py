@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+磁盘 JSON 缓存模块
+
+按 key 把可 JSON 序列化的结果缓存到磁盘，在 TTL 内直接读取文件，过期后重新获取。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# 同一进程内按 key 加锁，避免并发任务同时请求同一资源
+_locks: dict[str, asyncio.Lock] = {}
+
+
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+
+def _read_fresh(path: str, ttl: float) -> Any | None:
+    """文件存在且修改时间在 TTL 内时返回内容，否则返回 None"""
+    try:
+        if time.time() - os.stat(path).st_mtime > ttl:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+async def get_or_fetch_json(
+    key: str,
+    ttl: float,
+    fetcher: Callable[[], Awaitable[Any]],
+    cache_dir: str,
+) -> Any:
+    """读取缓存，过期或不存在时调用 fetcher 获取并写入缓存
+
+    Args:
+        key: 缓存 key（如 URL）
+        ttl: 缓存有效期（秒）
+        fetcher: 无参协程函数，返回可 JSON 序列化的结果；抛出异常时不写缓存
+        cache_dir: 缓存目录
+
+    Returns:
+        缓存或新获取的结果
+    """
+    path = _cache_path(cache_dir, key)
+    lock = _locks.setdefault(path, asyncio.Lock())
+
+    async with lock:
+        cached = _read_fresh(path, ttl)
+        if cached is not None:
+            return cached
+
+        data = await fetcher()
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write cache %s: %s", path, e)
+
+        return data
@@ -3,36 +3,228 @@
 CDK 获取模块
 
 提供各个 provider 的 CDK 获取函数
-同步函数返回 Generator[tuple[bool, dict], None, None]，每次 yield 一个元组：
+均为异步函数，返回 AsyncGenerator[tuple[bool, dict], None]，每次 yield 一个元组：
   - (True, {"code": "xxx"}) 表示成功获取 CDK，code 可为空字符串表示不需要充值
   - (False, {"error": "error message"}) 表示失败，调用方应停止 topup
-异步函数返回 AsyncGenerator[tuple[bool, dict], None]，格式同上
+HTTP 请求使用 utils.http_utils 中共享的 curl_cffi AsyncSession，不阻塞事件循环
 """
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import json
+import logging
 import os
+import random
 import time
-from typing import TYPE_CHECKING, Generator, AsyncGenerator
-from urllib.parse import urlparse, parse_qs
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncGenerator
 
 from camoufox.async_api import AsyncCamoufox
+from curl_cffi import CurlECode
 from curl_cffi import requests as curl_requests
 
 from utils.browser_utils import take_screenshot, save_page_content_to_file
-from utils.http_utils import proxy_resolve, response_resolve
+from utils.http_utils import get_pooled_async_session, proxy_resolve, response_resolve
 from utils.get_headers import get_curl_cffi_impersonate
 from utils.get_cf_clearance import get_cf_clearance
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from utils.config import AccountConfig
 
+# 大转盘单批最大并发抽奖数，避免触发风控
+MAX_PARALLEL_SPINS = 4
+
+# 模拟 macOS Chrome 143 的基础请求头，模块级构建一次，各请求按 {**base, ...} 叠加，不要原地修改
+_BASE_HEADERS_MAC_CHROME143: dict[str, str] = {
+    "accept": "*/*",
+    "accept-language": "en,en-US;q=0.9,zh;q=0.8",
+    "cache-control": "no-cache",
+    "pragma": "no-cache",
+    "sec-ch-ua": '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"macOS"',
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36",
+}
+_SAME_ORIGIN_FETCH_HEADERS: dict[str, str] = {
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-origin",
+}
+
+# fuli.hxi.me（runawaytime）各接口请求头
+_FULI_STATUS_HEADERS = {**_BASE_HEADERS_MAC_CHROME143, "referer": "https://fuli.hxi.me/", **_SAME_ORIGIN_FETCH_HEADERS}
+_FULI_WHEEL_STATUS_HEADERS = {
+    **_BASE_HEADERS_MAC_CHROME143,
+    "referer": "https://fuli.hxi.me/wheel",
+    **_SAME_ORIGIN_FETCH_HEADERS,
+}
+_FULI_CHECKIN_HEADERS = {
+    **_BASE_HEADERS_MAC_CHROME143,
+    "content-length": "0",
+    "origin": "https://fuli.hxi.me",
+    "referer": "https://fuli.hxi.me/",
+    **_SAME_ORIGIN_FETCH_HEADERS,
+}
+_FULI_WHEEL_HEADERS = {
+    **_BASE_HEADERS_MAC_CHROME143,
+    "content-length": "0",
+    "origin": "https://fuli.hxi.me",
+    "referer": "https://fuli.hxi.me/wheel",
+    **_SAME_ORIGIN_FETCH_HEADERS,
+}
+
+# up.x666.me 请求头，authorization 按账号在请求时叠加
+_X666_BASE_HEADERS = {
+    **_BASE_HEADERS_MAC_CHROME143,
+    "accept-language": "en,en-US;q=0.9,zh;q=0.8,en-CN;q=0.7,zh-CN;q=0.6",
+}
+_X666_STATUS_HEADERS = {**_X666_BASE_HEADERS, "referer": "https://up.x666.me/", **_SAME_ORIGIN_FETCH_HEADERS}
+_X666_SPIN_HEADERS = {
+    **_X666_BASE_HEADERS,
+    "content-length": "0",
+    "content-type": "application/json",
+    "origin": "https://up.x666.me",
+    "referer": "https://up.x666.me/",
+    **_SAME_ORIGIN_FETCH_HEADERS,
+}
+
+# tw.b4u.qzz.io Server Actions 请求头（未获取到浏览器指纹时使用）
+_BASE_HEADERS_B4U: dict[str, str] = {
+    "Accept": "text/x-component",
+    "Accept-Language": "en,en-US;q=0.9,zh;q=0.8,en-CN;q=0.7,zh-CN;q=0.6",
+    "Content-Type": "text/plain;charset=UTF-8",
+    "Cache-Control": "no-store",
+    "Pragma": "no-cache",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36",
+    "Origin": "https://tw.b4u.qzz.io",
+    "Referer": "https://tw.b4u.qzz.io/luckydraw",
+    **_SAME_ORIGIN_FETCH_HEADERS,
+}
+
+
+# 暂时性失败的重试设置。签到 / 抽奖 POST 不是幂等的，只重试服务端明确未处理的情况：
+# 429 / 503 响应，以及请求发出前的连接阶段错误（DNS、TCP 连接、TLS 握手、代理）。
+# 读超时、连接被重置等错误发生时服务端可能已经处理了请求，不重试
+POST_MAX_RETRIES = 3
+TRANSIENT_STATUS_CODES = frozenset({429, 503})
+CONNECT_PHASE_ERROR_CODES = frozenset(
+    {
+        CurlECode.COULDNT_RESOLVE_PROXY,
+        CurlECode.COULDNT_RESOLVE_HOST,
+        CurlECode.COULDNT_CONNECT,
+        CurlECode.SSL_CONNECT_ERROR,
+        CurlECode.PROXY,
+    }
+)
+# Retry-After 最长等待秒数，避免服务端返回过大的值拖住整个任务
+MAX_RETRY_AFTER = 60
+
+
+class _TokenBucket:
+    """异步令牌桶，限制同一站点的请求速率（所有账号共享）"""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量，即允许的突发请求数
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_FULI_LIMITER = _TokenBucket(rate=4, capacity=MAX_PARALLEL_SPINS)
+
+_X666_LIMITER = _TokenBucket(rate=2, capacity=2)
+# b4u 抽奖每批最大并发数，与限速器的突发容量一致
+B4U_MAX_PARALLEL_DRAWS = 2
+_B4U_LIMITER = _TokenBucket(rate=2, capacity=B4U_MAX_PARALLEL_DRAWS)
+# b4u 的状态查询只做少量重试，避免 Cloudflare 判定为异常流量；
+# 抽奖每次都会消耗次数，不重试，避免重放后兑换码丢失
+B4U_MAX_RETRIES = 2
+
+
+def _parse_retry_after(response) -> float | None:
+    """解析秒数格式的 Retry-After 响应头，无效或缺失时返回 None"""
+    try:
+        return min(float(response.headers.get("retry-after", "")), MAX_RETRY_AFTER)
+    except ValueError:
+        return None
 
-def get_runawaytime_cdk(
+
+def _is_connect_phase_error(error: curl_requests.RequestsError) -> bool:
+    """判断网络错误是否发生在请求发出之前（此时重试不会重复执行服务端操作）"""
+    code = getattr(error, "code", None)
+    if code in CONNECT_PHASE_ERROR_CODES:
+        return True
+    # 超时统一是 OPERATION_TIMEDOUT，连接阶段超时的消息为 "Connection timed out" / "Resolving timed out"
+    message = str(error)
+    return code == CurlECode.OPERATION_TIMEDOUT and (
+        "Connection timed out" in message or "Resolving timed out" in message
+    )
+
+
+async def _rate_limited_post(
+    session: curl_requests.AsyncSession,
+    url: str,
+    limiter: _TokenBucket,
+    account_name: str,
+    max_retries: int = POST_MAX_RETRIES,
+    **kwargs,
+):
+    """经令牌桶限流的 POST，暂时性失败时指数退避重试
+
+    429 / 503 和连接阶段的网络错误视为暂时性失败，优先按 Retry-After 等待，
+    否则等待 2^attempt 秒加随机抖动；读超时等请求发出后的错误直接抛出，避免重复执行签到 / 抽奖。
+    重试用尽后返回最后一次响应（或抛出最后一次网络错误），由调用方按原有逻辑处理。
+    传入 stream=True 时，返回的流式响应需由调用方读取并关闭。
+    """
+    for attempt in range(max_retries + 1):
+        await limiter.acquire()
+        try:
+            response = await session.post(url, **kwargs)
+        except curl_requests.RequestsError as e:
+            if attempt == max_retries or not _is_connect_phase_error(e):
+                raise
+            delay = 2**attempt + random.random()
+            print(f"⚠️ {account_name}: Request to {url} failed ({e}), retrying in {delay:.1f}s")
+        else:
+            if response.status_code not in TRANSIENT_STATUS_CODES or attempt == max_retries:
+                return response
+            delay = _parse_retry_after(response) or 2**attempt + random.random()
+            if kwargs.get("stream"):
+                # 流式响应占用连接，重试前先关闭
+                await response.aclose()
+            print(
+                f"⚠️ {account_name}: Request to {url} returned HTTP {response.status_code}, "
+                f"retrying in {delay:.1f}s"
+            )
+        await asyncio.sleep(delay)
+
+
+async def get_runawaytime_cdk(
     account_config: "AccountConfig",
-) -> Generator[tuple[bool, dict], None, None]:
+) -> AsyncGenerator[tuple[bool, dict], None]:
     """获取 runawaytime CDK（签到 + 大转盘）
 
     通过 fuli.hxi.me 签到和大转盘获取 CDK
@@ -58,67 +250,62 @@ def get_runawaytime_cdk(
     http_proxy = proxy_resolve(proxy_config)
 
     try:
-        session = curl_requests.Session(proxy=http_proxy, timeout=30)
-        try:
-            # 构建基础请求头
-            headers = {
-                "accept": "*/*",
-                "accept-language": "en,en-US;q=0.9,zh;q=0.8",
-                "cache-control": "no-cache",
-                "pragma": "no-cache",
-                "sec-ch-ua": '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"macOS"',
-                "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36",
-            }
-
-            # 设置 cookies
-            session.cookies.update(get_cdk_cookies)
-            session.cookies.set("i18next", "en")
+        session = get_pooled_async_session(http_proxy)
 
-            # ===== 第一部分：签到 =====
-            # 先检查签到状态
-            status_headers = headers.copy()
-            status_headers.update(
-                {
-                    "referer": "https://fuli.hxi.me/",
-                    "sec-fetch-dest": "empty",
-                    "sec-fetch-mode": "cors",
-                    "sec-fetch-site": "same-origin",
-                }
+        # cookies 按请求传入，不写入共享 session 的 cookie jar
+        cookies = {**get_cdk_cookies, "i18next": "en"}
+
+        def get_wheel_status():
+            return session.get(
+                "https://fuli.hxi.me/api/wheel/status",
+                headers=_FULI_WHEEL_STATUS_HEADERS,
+                cookies=cookies,
+                timeout=30,
             )
 
-            status_response = session.get(
+        # 解析大转盘状态响应中的剩余次数
+        def resolve_remaining(wheel_status_response) -> int:
+            if wheel_status_response.status_code != 200:
+                return 0
+            status_data = response_resolve(wheel_status_response, "get_wheel_status", account_name)
+            return status_data.get("remaining", 0) if status_data else 0
+
+        # 签到状态和大转盘状态互不依赖，并发查询；签到状态带出大转盘次数时取消大转盘状态查询。
+        # 是否带出次数由本次响应判断，不跨账号缓存
+        wheel_status_task = asyncio.ensure_future(get_wheel_status())
+        # 任务被取消或结果不再需要时，取走异常，避免 "Task exception was never retrieved"
+        wheel_status_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            status_response = await session.get(
                 "https://fuli.hxi.me/api/checkin/status",
-                headers=status_headers,
+                headers=_FULI_STATUS_HEADERS,
+                cookies=cookies,
                 timeout=30,
             )
 
+            # ===== 第一部分：签到 =====
             already_checked_in = False
+            wheel_remaining = None
             if status_response.status_code == 200:
                 status_data = response_resolve(status_response, "get_checkin_status", account_name)
-                if status_data and status_data.get("checked"):
-                    print(f"✅ {account_name}: Already checked in today")
-                    already_checked_in = True
-
+                if status_data:
+                    # 部分部署会在签到状态中一并返回大转盘剩余次数，此时不需要单独查询
+                    if isinstance(status_data.get("wheel_remaining"), int):
+                        wheel_remaining = status_data["wheel_remaining"]
+                    if status_data.get("checked"):
+                        print(f"✅ {account_name}: Already checked in today")
+                        already_checked_in = True
+
+            checked_in_now = False
             if not already_checked_in:
                 # 执行签到
-                checkin_headers = headers.copy()
-                checkin_headers.update(
-                    {
-                        "content-length": "0",
-                        "origin": "https://fuli.hxi.me",
-                        "referer": "https://fuli.hxi.me/",
-                        "sec-fetch-dest": "empty",
-                        "sec-fetch-mode": "cors",
-                        "sec-fetch-site": "same-origin",
-                    }
-                )
-
-                response = session.post(
+                response = await _rate_limited_post(
+                    session,
                     "https://fuli.hxi.me/api/checkin",
-                    headers=checkin_headers,
+                    _FULI_LIMITER,
+                    account_name,
+                    headers=_FULI_CHECKIN_HEADERS,
+                    cookies=cookies,
                     timeout=30,
                 )
 
@@ -126,6 +313,7 @@ def get_runawaytime_cdk(
                     json_data = response_resolve(response, "execute_checkin", account_name)
                     if json_data is not None:
                         if json_data.get("success"):
+                            checked_in_now = True
                             code = json_data.get("code", "")
                             if code:
                                 print(f"✅ {account_name}: Checkin successful! Code: {code}")
@@ -138,104 +326,219 @@ def get_runawaytime_cdk(
                                 print(f"❌ {account_name}: Checkin failed - {message}")
 
             # ===== 第二部分：大转盘 =====
-            # 先检查大转盘状态
-            wheel_status_headers = headers.copy()
-            wheel_status_headers.update(
-                {
-                    "referer": "https://fuli.hxi.me/wheel",
-                    "sec-fetch-dest": "empty",
-                    "sec-fetch-mode": "cors",
-                    "sec-fetch-site": "same-origin",
-                }
-            )
-
-            wheel_status_response = session.get(
-                "https://fuli.hxi.me/api/wheel/status",
-                headers=wheel_status_headers,
-                timeout=30,
-            )
-
-            remaining = 0
-            if wheel_status_response.status_code == 200:
-                status_data = response_resolve(wheel_status_response, "get_wheel_status", account_name)
-                if status_data:
-                    remaining = status_data.get("remaining", 0)
-                    if remaining <= 0:
-                        print(f"ℹ️ {account_name}: No wheel spins remaining")
-                    else:
-                        print(f"ℹ️ {account_name}: {remaining} wheel spin(s) remaining")
-
-            # 执行大转盘（循环直到 remaining <= 0）
-            if remaining > 0:
-                wheel_headers = headers.copy()
-                wheel_headers.update(
-                    {
-                        "content-length": "0",
-                        "origin": "https://fuli.hxi.me",
-                        "referer": "https://fuli.hxi.me/wheel",
-                        "sec-fetch-dest": "empty",
-                        "sec-fetch-mode": "cors",
-                        "sec-fetch-site": "same-origin",
-                    }
-                )
+            if wheel_remaining is not None:
+                remaining = wheel_remaining
+            else:
+                remaining = resolve_remaining(await wheel_status_task)
+        finally:
+            # 签到请求抛出异常或调用方提前关闭生成器时，也不会遗留未完成的任务
+            wheel_status_task.cancel()
 
-                spin_count = 0
+        # 大转盘状态是在签到前查询的，刚签到成功时次数可能已变化，重新查询一次
+        if checked_in_now and remaining <= 0:
+            remaining = resolve_remaining(await get_wheel_status())
 
-                while remaining > 0:
-                    response = session.post(
-                        "https://fuli.hxi.me/api/wheel",
-                        headers=wheel_headers,
-                        timeout=30,
-                    )
+        if remaining <= 0:
+            print(f"ℹ️ {account_name}: No wheel spins remaining")
+        else:
+            print(f"ℹ️ {account_name}: {remaining} wheel spin(s) remaining")
 
-                    if response.status_code in [200, 400]:
-                        json_data = response_resolve(response, "execute_wheel", account_name)
-                        if json_data is None:
-                            break
+        # 执行大转盘（循环直到 remaining <= 0）
+        if remaining > 0:
+            spin_count = 0
 
-                        if json_data.get("success"):
-                            code = json_data.get("code", "")
-                            # 从响应中更新 remaining
-                            remaining = json_data.get("remaining", remaining - 1)
-                            if code:
-                                spin_count += 1
-                                print(
-                                    f"✅ {account_name}: Wheel spin #{spin_count} successful! Code: {code}, remaining: {remaining}"
-                                )
-                                yield True, {"code": code}
-                                continue
-
-                        message = json_data.get("message", json_data.get("msg", ""))
-                        if (
-                            "already" in message.lower()
-                            or "已经" in message
-                            or "次数" in message
-                            or "no more" in message.lower()
-                        ):
-                            print(f"ℹ️ {account_name}: No more wheel spins remaining")
-                            break
+            # 每批最多并发 MAX_PARALLEL_SPINS 次抽奖，批次之间按服务端返回的 remaining 继续
+            while remaining > 0:
+                batch_size = min(remaining, MAX_PARALLEL_SPINS)
+                responses = await asyncio.gather(
+                    *(
+                        _rate_limited_post(
+                            session,
+                            "https://fuli.hxi.me/api/wheel",
+                            _FULI_LIMITER,
+                            account_name,
+                            headers=_FULI_WHEEL_HEADERS,
+                            cookies=cookies,
+                            timeout=30,
+                        )
+                        for _ in range(batch_size)
+                    ),
+                    return_exceptions=True,
+                )
 
-                        print(f"❌ {account_name}: Wheel spin #{spin_count + 1} failed - {message}")
-                        break
+                stop = False
+                server_remaining = None
+                for response in responses:
+                    if isinstance(response, Exception):
+                        print(f"❌ {account_name}: Wheel spin #{spin_count + 1} failed - {response}")
+                        stop = True
+                        continue
+                    if response.status_code not in [200, 400]:
+                        stop = True
+                        continue
+
+                    json_data = response_resolve(response, "execute_wheel", account_name)
+                    if json_data is None:
+                        stop = True
+                        continue
+
+                    if json_data.get("success"):
+                        code = json_data.get("code", "")
+                        # 并发响应的先后顺序不确定，取最小的 remaining
+                        if "remaining" in json_data:
+                            if server_remaining is None:
+                                server_remaining = json_data["remaining"]
+                            else:
+                                server_remaining = min(server_remaining, json_data["remaining"])
+                        if code:
+                            spin_count += 1
+                            print(f"✅ {account_name}: Wheel spin #{spin_count} successful! Code: {code}")
+                            yield True, {"code": code}
+                            continue
+
+                    stop = True
+                    message = json_data.get("message", json_data.get("msg", ""))
+                    if (
+                        "already" in message.lower()
+                        or "已经" in message
+                        or "次数" in message
+                        or "no more" in message.lower()
+                    ):
+                        print(f"ℹ️ {account_name}: No more wheel spins remaining")
                     else:
-                        break
+                        print(f"❌ {account_name}: Wheel spin #{spin_count + 1} failed - {message}")
 
-                if spin_count > 0:
-                    print(f"✅ {account_name}: Total {spin_count} CDK(s) obtained from wheel")
-        finally:
-            session.close()
+                if stop:
+                    break
+                remaining = server_remaining if server_remaining is not None else remaining - batch_size
+                if remaining > 0:
+                    print(f"ℹ️ {account_name}: {remaining} wheel spin(s) remaining")
+
+            if spin_count > 0:
+                print(f"✅ {account_name}: Total {spin_count} CDK(s) obtained from wheel")
     except Exception as e:
         print(f"❌ {account_name}: Error getting runawaytime CDK - {e}")
         yield False, {"error": f"Error getting runawaytime CDK - {e}"}
 
 
+# Linux.do OAuth 授权页的“允许”按钮
+LINUXDO_APPROVE_SELECTOR = 'a[href^="/oauth2/approve"]'
+# userToken 距离过期不足该秒数时视为失效，避免请求途中过期
+X666_TOKEN_EXPIRY_MARGIN = 60
+
+
+@lru_cache(maxsize=64)
+def _username_hash(username: str) -> str:
+    """用户名 SHA-256 的前 8 位十六进制，用于缓存文件名（只格式化前 4 字节）"""
+    return hashlib.sha256(username.encode()).digest()[:4].hex()
+
+
+def _get_jwt_exp(token: str) -> float | None:
+    """解析 JWT payload 中的 exp（秒级时间戳），格式不合法时返回 None"""
+    try:
+        parts = token.split('.')
+        if len(parts) != 3:
+            return None
+
+        # JWT 使用无 padding 的 base64url，多余的 padding 在非严格模式下会被忽略
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + '=='))
+        exp = payload.get('exp')
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+
+def _load_x666_token_cache(token_cache_path: str) -> str | None:
+    """读取缓存的 userToken，仅在 exp 未临近过期时返回
+
+    缓存格式为 {"userToken": "...", "exp": 1730000000}，exp 在写入时解析一次，
+    读取时只需比较时间戳，不必再解码 JWT。
+    """
+    try:
+        with open(token_cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        token = cache.get("userToken")
+        exp = cache.get("exp")
+        if token and isinstance(exp, (int, float)) and exp - X666_TOKEN_EXPIRY_MARGIN > time.time():
+            return token
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def _save_x666_token_cache(token_cache_path: str, token: str) -> None:
+    """保存 userToken 及其 exp，exp 无法解析时不写缓存"""
+    exp = _get_jwt_exp(token)
+    if exp is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(token_cache_path), exist_ok=True)
+        with open(token_cache_path, "w", encoding="utf-8") as f:
+            json.dump({"userToken": token, "exp": exp}, f)
+    except OSError as e:
+        print(f"⚠️ Failed to save x666 token cache {token_cache_path}: {e}")
+
+
+def _load_x666_token_from_storage_state(cache_file_path: str) -> str | None:
+    """从 Playwright storage_state 文件中读取 up.x666.me 的 localStorage userToken"""
+    try:
+        with open(cache_file_path, "r", encoding="utf-8") as f:
+            storage_state = json.load(f)
+        for origin in storage_state.get("origins", []):
+            if origin.get("origin") != "https://up.x666.me":
+                continue
+            for item in origin.get("localStorage", []):
+                if item.get("name") == "userToken":
+                    return item.get("value") or None
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+# x666 自动登录共享的 Camoufox 浏览器，按代理区分，每个账号只新建 context
+_SHARED_BROWSERS: dict[str | None, tuple[AsyncCamoufox, object]] = {}
+_shared_browser_lock = asyncio.Lock()
+
+
+async def _get_shared_browser(http_proxy: str | None):
+    """获取（必要时启动）代理对应的共享浏览器，断开连接时重新启动"""
+    async with _shared_browser_lock:
+        entry = _SHARED_BROWSERS.get(http_proxy)
+        if entry is not None and entry[1].is_connected():
+            return entry[1]
+
+        proxy_args = {"proxy": {"server": http_proxy}} if http_proxy else {}
+        manager = AsyncCamoufox(
+            headless=False,
+            humanize=True,
+            locale="en-US",
+            os="macos",
+            config={"forceScopeAccess": True},
+            **proxy_args,
+        )
+        browser = await manager.__aenter__()
+        _SHARED_BROWSERS[http_proxy] = (manager, browser)
+        return browser
+
+
+async def close_shared_browsers() -> None:
+    """关闭所有共享浏览器，由入口在全部账号处理完后调用"""
+    async with _shared_browser_lock:
+        for manager, _ in _SHARED_BROWSERS.values():
+            try:
+                await manager.__aexit__(None, None, None)
+            except Exception as e:
+                print(f"⚠️ Failed to close shared browser: {e}")
+        _SHARED_BROWSERS.clear()
+
+
 async def _get_x666_user_token(
     account_name: str, username: str, password: str, proxy_config=None
 ) -> str | None:
     """通过 Linux.do OAuth 自动登录 up.x666.me 获取 userToken
 
     流程：
-    1. 启动 Camoufox 浏览器
+    1. 获取共享的 Camoufox 浏览器（同一代理只启动一次），新建 context
     2. 导航到 up.x666.me，检查 localStorage 是否已有 userToken
     3. 如果没有，调用 /api/auth/login 获取 auth_url
     4. 导航到 connect.linux.do 授权页面，登录并授权
@@ -254,198 +557,204 @@ async def _get_x666_user_token(
 
     def is_jwt_valid(token: str) -> bool:
         """验证 JWT token 是否有效（未过期）"""
+        exp = _get_jwt_exp(token)
+        return exp is not None and exp > time.time()
+
+    def is_token_url(url: str) -> bool:
+        return "up.x666.me" in url and "token=" in url
+
+    async def login_linuxdo(page) -> None:
+        """填写 Linux.do 登录表单，等待表单消失（登录完成）"""
+        await page.wait_for_selector("#login-account-name", state="visible", timeout=15000)
+        await page.fill("#login-account-name", username)
+        await page.fill("#login-account-password", password)
+        await page.click("#login-button")
         try:
-            parts = token.split('.')
-            if len(parts) != 3:
-                return False
-
-            # 解码 payload（添加 padding）
-            payload_b64 = parts[1]
-            padding = 4 - len(payload_b64) % 4
-            if padding != 4:
-                payload_b64 += '=' * padding
+            await page.wait_for_selector("#login-account-name", state="detached", timeout=15000)
+        except Exception:
+            pass  # 登录失败时表单仍在，后续授权步骤会给出错误
 
-            payload = json.loads(base64.b64decode(payload_b64))
-            exp = payload.get('exp')
+    async def wait_first(*waiters) -> None:
+        """等待任一条件满足即返回，全部超时或失败时静默返回，由调用方检查页面状态"""
+        tasks = [asyncio.ensure_future(waiter) for waiter in waiters]
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(not task.exception() for task in done):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            if not exp:
-                return False
+    username_hash = _username_hash(username)
+    cache_file_path = f"storage-states/x666_up_{username_hash}.json"
+    token_cache_path = f"storage-states/x666_up_{username_hash}_token.json"
 
-            # 检查是否过期（exp 是秒级时间戳）
-            return exp > time.time()
-        except Exception:
-            return False
+    # 缓存的 userToken 未过期时直接返回，无需启动浏览器
+    cached_token = _load_x666_token_cache(token_cache_path)
+    if cached_token:
+        print(f"✅ {account_name}: Using cached x666 userToken")
+        return cached_token
 
-    username_hash = hashlib.sha256(username.encode()).hexdigest()[:8]
-    cache_file_path = f"storage-states/x666_up_{username_hash}.json"
+    # 兼容只有 storage_state 缓存的情况：直接从文件中的 localStorage 取 userToken 校验
+    stored_token = _load_x666_token_from_storage_state(cache_file_path)
+    if stored_token and is_jwt_valid(stored_token):
+        print(f"✅ {account_name}: Using valid userToken from x666 storage state")
+        _save_x666_token_cache(token_cache_path, stored_token)
+        return stored_token
 
     print(f"ℹ️ {account_name}: Attempting auto-login to up.x666.me via Linux.do")
 
     try:
-        proxy_args = {}
-        if proxy_config:
-            http_proxy = proxy_resolve(proxy_config)
-            if http_proxy:
-                proxy_args["proxy"] = {"server": http_proxy} if isinstance(http_proxy, str) else http_proxy
+        browser = await _get_shared_browser(proxy_resolve(proxy_config))
 
-        async with AsyncCamoufox(
-            headless=False,
-            humanize=True,
-            locale="en-US",
-            os="macos",
-            config={"forceScopeAccess": True},
-            **proxy_args,
-        ) as browser:
-            storage_state = cache_file_path if os.path.exists(cache_file_path) else None
-            if storage_state:
-                print(f"ℹ️ {account_name}: Found x666 cache file, restoring storage state")
-            else:
-                print(f"ℹ️ {account_name}: No x666 cache file found, starting fresh")
+        storage_state = cache_file_path if os.path.exists(cache_file_path) else None
+        if storage_state:
+            print(f"ℹ️ {account_name}: Found x666 cache file, restoring storage state")
+        else:
+            print(f"ℹ️ {account_name}: No x666 cache file found, starting fresh")
 
-            context = await browser.new_context(storage_state=storage_state)
-            page = await context.new_page()
+        context = await browser.new_context(storage_state=storage_state)
+        page = await context.new_page()
 
-            try:
-                # Step 1: 导航到 up.x666.me 并检查是否已有 userToken
-                await page.goto("https://up.x666.me/", wait_until="domcontentloaded")
-                await page.wait_for_timeout(2000)
-
-                # 检查 localStorage 中是否已有 userToken（缓存有效时）
-                existing_token = await page.evaluate("() => localStorage.getItem('userToken')")
-                if existing_token:
-                    print(f"ℹ️ {account_name}: Found existing userToken in localStorage, validating...")
-                    if is_jwt_valid(existing_token):
-                        print(f"✅ {account_name}: Cached userToken is valid")
-                        await context.storage_state(path=cache_file_path)
-                        return existing_token
-                    else:
-                        print(f"⚠️ {account_name}: Cached userToken expired, need to re-login")
-
-                # Step 2: 调用 /api/auth/login 获取 auth_url
-                print(f"ℹ️ {account_name}: No cached token, fetching auth_url from /api/auth/login")
-                auth_result = await page.evaluate("""
-                    async () => {
-                        try {
-                            const resp = await fetch('/api/auth/login');
-                            const data = await resp.json();
-                            return data.auth_url || null;
-                        } catch (e) {
-                            return null;
-                        }
+        try:
+            # Step 1: 导航到 up.x666.me 并检查是否已有 userToken
+            # localStorage 由 storage_state 恢复，页面 DOM 就绪后即可读取
+            await page.goto("https://up.x666.me/", wait_until="domcontentloaded")
+
+            # 检查 localStorage 中是否已有 userToken（缓存有效时）
+            existing_token = await page.evaluate("() => localStorage.getItem('userToken')")
+            if existing_token:
+                print(f"ℹ️ {account_name}: Found existing userToken in localStorage, validating...")
+                if is_jwt_valid(existing_token):
+                    print(f"✅ {account_name}: Cached userToken is valid")
+                    await context.storage_state(path=cache_file_path)
+                    _save_x666_token_cache(token_cache_path, existing_token)
+                    return existing_token
+                else:
+                    print(f"⚠️ {account_name}: Cached userToken expired, need to re-login")
+
+            # Step 2: 调用 /api/auth/login 获取 auth_url
+            print(f"ℹ️ {account_name}: No cached token, fetching auth_url from /api/auth/login")
+            auth_result = await page.evaluate("""
+                async () => {
+                    try {
+                        const resp = await fetch('/api/auth/login');
+                        const data = await resp.json();
+                        return data.auth_url || null;
+                    } catch (e) {
+                        return null;
                     }
-                """)
+                }
+            """)
 
-                if not auth_result:
-                    print(f"❌ {account_name}: Failed to get auth_url from /api/auth/login")
-                    await take_screenshot(page, "x666_auth_url_failed", account_name)
-                    return None
+            if not auth_result:
+                print(f"❌ {account_name}: Failed to get auth_url from /api/auth/login")
+                await take_screenshot(page, "x666_auth_url_failed", account_name)
+                return None
 
-                print(f"ℹ️ {account_name}: Got auth_url, navigating to Linux.do authorization page")
+            print(f"ℹ️ {account_name}: Got auth_url, navigating to Linux.do authorization page")
 
-                # Step 3: 导航到 connect.linux.do 授权页面
-                await page.goto(auth_result, wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
+            # Step 3: 导航到 connect.linux.do 授权页面，等待 授权按钮 / 登录表单 / 带 token 重定向 任一出现
+            await page.goto(auth_result, wait_until="domcontentloaded")
+            await wait_first(
+                page.wait_for_url(is_token_url, timeout=10000),
+                page.wait_for_selector(f"{LINUXDO_APPROVE_SELECTOR}, #login-account-name", timeout=10000),
+            )
 
-                current_url = page.url
+            current_url = page.url
 
-                # 检查是否已经被重定向回 up.x666.me（已授权过）
-                if "up.x666.me" in current_url and "token=" in current_url:
-                    print(f"✅ {account_name}: Already authorized, redirected back with token")
-                else:
-                    # 检查是否出现授权按钮（已登录 linux.do）
-                    allow_btn = await page.query_selector('a[href^="/oauth2/approve"]')
-
-                    if not allow_btn:
-                        # 未登录，需要填写用户名密码
-                        print(f"ℹ️ {account_name}: Not logged in to Linux.do, performing login")
-
-                        # 如果在 linux.do 登录页面
-                        if "linux.do" in current_url:
-                            # 可能需要先去登录页面
-                            if "/login" not in current_url:
-                                await page.goto("https://linux.do/login", wait_until="domcontentloaded")
-                                await page.wait_for_timeout(3000)
-
-                            await page.fill("#login-account-name", username)
-                            await page.wait_for_timeout(2000)
-                            await page.fill("#login-account-password", password)
-                            await page.wait_for_timeout(2000)
-                            await page.click("#login-button")
-                            await page.wait_for_timeout(10000)
-
-                            await save_page_content_to_file(
-                                page, "x666_linuxdo_login_result", account_name, prefix="x666"
-                            )
-
-                            # 登录后重新访问授权页面
-                            await page.goto(auth_result, wait_until="domcontentloaded")
-                            await page.wait_for_timeout(3000)
-                        else:
-                            # 在 connect.linux.do 页面但需要登录
-                            login_form = await page.query_selector("#login-account-name")
-                            if login_form:
-                                await page.fill("#login-account-name", username)
-                                await page.wait_for_timeout(2000)
-                                await page.fill("#login-account-password", password)
-                                await page.wait_for_timeout(2000)
-                                await page.click("#login-button")
-                                await page.wait_for_timeout(10000)
-
-                        # 再次检查授权按钮
-                        allow_btn = await page.query_selector('a[href^="/oauth2/approve"]')
-
-                    # 点击授权按钮
-                    if allow_btn:
-                        print(f"ℹ️ {account_name}: Clicking authorize button")
-                        await allow_btn.click()
-                        await page.wait_for_timeout(5000)
-
-                # Step 4: 等待重定向回 up.x666.me
-                try:
-                    await page.wait_for_url("**/up.x666.me/**", timeout=30000)
-                except Exception:
-                    pass  # 可能已经在 up.x666.me 了
-
-                await page.wait_for_timeout(3000)
-                current_url = page.url
-
-                # Step 5: 从 URL 参数提取 token
-                user_token = None
-                if "token=" in current_url:
-                    parsed = urlparse(current_url)
-                    params = parse_qs(parsed.query)
-                    token_list = params.get("token", [])
-                    if token_list:
-                        user_token = token_list[0]
-                        print(f"✅ {account_name}: Got userToken from URL parameter")
-
-                # 如果 URL 中没有，尝试从 localStorage 获取
-                if not user_token:
-                    try:
-                        await page.wait_for_timeout(3000)
-                        user_token = await page.evaluate("() => localStorage.getItem('userToken')")
-                        if user_token:
-                            print(f"✅ {account_name}: Got userToken from localStorage")
-                    except Exception:
-                        pass
+            # 检查是否已经被重定向回 up.x666.me（已授权过）
+            if is_token_url(current_url):
+                print(f"✅ {account_name}: Already authorized, redirected back with token")
+            else:
+                # 检查是否出现授权按钮（已登录 linux.do）
+                allow_btn = await page.query_selector(LINUXDO_APPROVE_SELECTOR)
+
+                if not allow_btn:
+                    # 未登录，需要填写用户名密码
+                    print(f"ℹ️ {account_name}: Not logged in to Linux.do, performing login")
+
+                    # 如果在 linux.do 登录页面
+                    if "linux.do" in current_url:
+                        # 可能需要先去登录页面
+                        if "/login" not in current_url:
+                            await page.goto("https://linux.do/login", wait_until="domcontentloaded")
+
+                        await login_linuxdo(page)
+
+                        await save_page_content_to_file(
+                            page, "x666_linuxdo_login_result", account_name, prefix="x666"
+                        )
+
+                        # 登录后重新访问授权页面
+                        await page.goto(auth_result, wait_until="domcontentloaded")
+                    else:
+                        # 在 connect.linux.do 页面但需要登录
+                        login_form = await page.query_selector("#login-account-name")
+                        if login_form:
+                            await login_linuxdo(page)
+
+                    # 再次检查授权按钮
+                    await wait_first(
+                        page.wait_for_url(is_token_url, timeout=10000),
+                        page.wait_for_selector(LINUXDO_APPROVE_SELECTOR, timeout=10000),
+                    )
+                    allow_btn = await page.query_selector(LINUXDO_APPROVE_SELECTOR)
 
+                # 点击授权按钮
+                if allow_btn:
+                    print(f"ℹ️ {account_name}: Clicking authorize button")
+                    await allow_btn.click()
+
+            # Step 4: 等待重定向回 up.x666.me
+            try:
+                await page.wait_for_url(lambda url: "up.x666.me" in url, timeout=30000)
+            except Exception:
+                pass  # 可能已经在 up.x666.me 了
+
+            current_url = page.url
+
+            # Step 5: 从 URL 参数提取 token
+            user_token = None
+            if "token=" in current_url:
+                # JWT 只含 base64url 字符和 "."，无需 URL 解码，直接截取参数值
+                user_token = current_url.partition("token=")[2].partition("&")[0].partition("#")[0] or None
                 if user_token:
-                    # 保存 storage_state 用于下次缓存
-                    await context.storage_state(path=cache_file_path)
-                    print(f"✅ {account_name}: Storage state saved for x666 up")
-                    return user_token
-                else:
-                    print(f"❌ {account_name}: Failed to obtain userToken from up.x666.me")
-                    await take_screenshot(page, "x666_token_failed", account_name)
-                    return None
+                    print(f"✅ {account_name}: Got userToken from URL parameter")
 
-            except Exception as e:
-                print(f"❌ {account_name}: Error during x666 auto-login: {e}")
-                await take_screenshot(page, "x666_auto_login_error", account_name)
+            # 如果 URL 中没有，尝试从 localStorage 获取
+            if not user_token:
+                try:
+                    token_handle = await page.wait_for_function(
+                        "() => localStorage.getItem('userToken')", timeout=5000
+                    )
+                    user_token = await token_handle.json_value()
+                    if user_token:
+                        print(f"✅ {account_name}: Got userToken from localStorage")
+                except Exception:
+                    pass
+
+            if user_token:
+                # 保存 storage_state 用于下次缓存
+                await context.storage_state(path=cache_file_path)
+                _save_x666_token_cache(token_cache_path, user_token)
+                print(f"✅ {account_name}: Storage state saved for x666 up")
+                return user_token
+            else:
+                print(f"❌ {account_name}: Failed to obtain userToken from up.x666.me")
+                await take_screenshot(page, "x666_token_failed", account_name)
                 return None
-            finally:
-                await page.close()
-                await context.close()
+
+        except Exception as e:
+            print(f"❌ {account_name}: Error during x666 auto-login: {e}")
+            await take_screenshot(page, "x666_auto_login_error", account_name)
+            return None
+        finally:
+            await page.close()
+            await context.close()
 
     except Exception as e:
         print(f"❌ {account_name}: Failed to launch browser for x666 auto-login: {e}")
@@ -498,122 +807,200 @@ async def get_x666_cdk(
     http_proxy = proxy_resolve(proxy_config)
 
     try:
-        session = curl_requests.Session(proxy=http_proxy, timeout=30)
-        try:
-            # 构建基础请求头
-            headers = {
-                "accept": "*/*",
-                "accept-language": "en,en-US;q=0.9,zh;q=0.8,en-CN;q=0.7,zh-CN;q=0.6",
-                "cache-control": "no-cache",
-                "pragma": "no-cache",
-                "sec-ch-ua": '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"macOS"',
-                "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36",
-            }
-
-            session.cookies.set("i18next", "en")
-
-            # 先获取用户信息，检查是否可以抽奖
-            status_headers = headers.copy()
-            status_headers.update(
-                {
-                    "authorization": f"Bearer {access_token}",
-                    "referer": "https://up.x666.me/",
-                    "sec-fetch-dest": "empty",
-                    "sec-fetch-mode": "cors",
-                    "sec-fetch-site": "same-origin",
-                }
-            )
+        session = get_pooled_async_session(http_proxy)
 
-            status_response = session.get(
-                "https://up.x666.me/api/checkin/status",
-                headers=status_headers,
-                timeout=30,
-            )
+        cookies = {"i18next": "en"}
 
-            if status_response.status_code == 200:
-                status_data = response_resolve(status_response, "get_checkin_status", account_name)
-                if status_data and status_data.get("success"):
-                    # API 响应格式：can_spin 和 today_record 直接在顶层
-                    # {"success":true,"can_spin":false,"today_record":{...},"total_quota":...}
-                    can_spin = status_data.get("can_spin", False)
+        # 先获取用户信息，检查是否可以抽奖
+        status_headers = {**_X666_STATUS_HEADERS, "authorization": f"Bearer {access_token}"}
 
-                    if not can_spin:
+        status_response = await session.get(
+            "https://up.x666.me/api/checkin/status",
+            headers=status_headers,
+            cookies=cookies,
+            timeout=30,
+        )
+
+        if status_response.status_code == 200:
+            status_data = response_resolve(status_response, "get_checkin_status", account_name)
+            if status_data and status_data.get("success"):
+                # API 响应格式：can_spin 和 today_record 直接在顶层
+                # {"success":true,"can_spin":false,"today_record":{...},"total_quota":...}
+                can_spin = status_data.get("can_spin", False)
+
+                if not can_spin:
+                    today_record = status_data.get("today_record")
+                    if today_record:
                         # 今天已经抽过，显示今日奖励
-                        today_record = status_data.get("today_record")
                         today_quota = today_record.get("quota_amount", 0)
                         today_quota_display = round(today_quota / 500, 2)
                         print(f"✅ {account_name}: Already spun today, today's prize: {today_quota_display}")
-                        # 已经抽过，返回成功但 code 为空表示不需要充值
-                        yield True, {"code": ""}
-                        return
-                else:
-                    error_msg = status_data.get("message", "Unknown error") if status_data else "Invalid response"
-                    print(f"❌ {account_name}: Failed to get checkin status: {error_msg}")
-                    yield False, {"error": f"Failed to get checkin status: {error_msg}"}
+                    else:
+                        # 没有今日记录但不可抽奖（如活动关闭），抽奖请求必然失败，直接跳过
+                        print(f"ℹ️ {account_name}: Spin not available today, skipping spin request")
+                    # 不需要抽奖，返回成功但 code 为空表示不需要充值
+                    yield True, {"code": ""}
                     return
             else:
-                print(f"❌ {account_name}: Failed to get checkin status, HTTP {status_response.status_code}")
-                yield False, {"error": f"Failed to get checkin status, HTTP {status_response.status_code}"}
+                error_msg = status_data.get("message", "Unknown error") if status_data else "Invalid response"
+                print(f"❌ {account_name}: Failed to get checkin status: {error_msg}")
+                yield False, {"error": f"Failed to get checkin status: {error_msg}"}
                 return
+        else:
+            print(f"❌ {account_name}: Failed to get checkin status, HTTP {status_response.status_code}")
+            yield False, {"error": f"Failed to get checkin status, HTTP {status_response.status_code}"}
+            return
 
-            # 执行抽奖
-            spin_headers = headers.copy()
-            spin_headers.update(
-                {
-                    "authorization": f"Bearer {access_token}",
-                    "content-length": "0",
-                    "content-type": "application/json",
-                    "origin": "https://up.x666.me",
-                    "referer": "https://up.x666.me/",
-                    "sec-fetch-dest": "empty",
-                    "sec-fetch-mode": "cors",
-                    "sec-fetch-site": "same-origin",
-                }
-            )
+        # 执行抽奖
+        spin_headers = {**_X666_SPIN_HEADERS, "authorization": f"Bearer {access_token}"}
+
+        response = await _rate_limited_post(
+            session,
+            "https://up.x666.me/api/checkin/spin",
+            _X666_LIMITER,
+            account_name,
+            headers=spin_headers,
+            cookies=cookies,
+            timeout=30,
+        )
 
-            response = session.post(
-                "https://up.x666.me/api/checkin/spin",
-                headers=spin_headers,
-                timeout=30,
-            )
+        if response.status_code in [200, 400]:
+            json_data = response_resolve(response, "execute_spin", account_name)
+            if json_data is None:
+                return
 
-            if response.status_code in [200, 400]:
-                json_data = response_resolve(response, "execute_spin", account_name)
-                if json_data is None:
-                    return
+            if json_data.get("success"):
+                # 新 API 响应格式：直接充值到账户
+                # {"success":true,"level":6,"times":150,"quota":75000,"label":"150次","new_balance":33497000,"message":"恭喜获得 150次！"}
+                message = json_data.get("message", "")
 
-                if json_data.get("success"):
-                    # 新 API 响应格式：直接充值到账户
-                    # {"success":true,"level":6,"times":150,"quota":75000,"label":"150次","new_balance":33497000,"message":"恭喜获得 150次！"}
-                    message = json_data.get("message", "")
-                    
-                    print(f"✅ {account_name}: Spin successful! {message}")
-                    # 成功，返回空 code 表示不需要充值（奖励已直接充值到账户）
-                    yield True, {"code": ""}
-                    return
+                print(f"✅ {account_name}: Spin successful! {message}")
+                # 成功，返回空 code 表示不需要充值（奖励已直接充值到账户）
+                yield True, {"code": ""}
+                return
 
-                message = json_data.get("message", json_data.get("msg", ""))
-                if "already" in message.lower() or "已签到" in message:
-                    print(f"✅ {account_name}: Already spun today, {message}")
-                    # 已经抽过，返回成功但 code 为空
-                    yield True, {"code": ""}
-                    return
+            message = json_data.get("message", json_data.get("msg", ""))
+            if "already" in message.lower() or "已签到" in message:
+                print(f"✅ {account_name}: Already spun today, {message}")
+                # 已经抽过，返回成功但 code 为空
+                yield True, {"code": ""}
+                return
 
-                print(f"❌ {account_name}: Spin failed - {message}")
-                yield False, {"error": f"Spin failed - {message}"}
-            else:
-                print(f"❌ {account_name}: Spin failed, HTTP {response.status_code}")
-                yield False, {"error": f"Spin failed, HTTP {response.status_code}"}
-        finally:
-            session.close()
+            print(f"❌ {account_name}: Spin failed - {message}")
+            yield False, {"error": f"Spin failed - {message}"}
+        else:
+            print(f"❌ {account_name}: Spin failed, HTTP {response.status_code}")
+            yield False, {"error": f"Spin failed, HTTP {response.status_code}"}
     except Exception as e:
         print(f"❌ {account_name}: Error executing x666 spin - {e}")
         yield False, {"error": f"Error executing x666 spin - {e}"}
 
 
+# Next.js Server Actions 需要的 next-router-state-tree header，纯 ASCII，预先编码为 bytes，
+# curl_cffi 的 Headers 遇到 bytes 值时不再逐请求做 latin-1 编码
+_NEXT_ROUTER_STATE_TREE = b"%5B%22%22%2C%7B%22children%22%3A%5B%22(dashboard)%22%2C%7B%22children%22%3A%5B%22luckydraw%22%2C%7B%22children%22%3A%5B%22__PAGE__%22%2C%7B%7D%2C%22%2Fluckydraw%22%2C%22refresh%22%5D%7D%5D%7D%5D%7D%2Cnull%2Cnull%2Ctrue%5D"
+# 查询抽奖状态 / 执行抽奖两个 Server Action 的附加请求头
+_B4U_STATUS_ACTION_HEADERS: dict[str, str | bytes] = {
+    "next-action": "7a7a7bf7f7c47cf1a8351d225a4338b0f017cd35",
+    "next-router-state-tree": _NEXT_ROUTER_STATE_TREE,
+}
+_B4U_DRAW_ACTION_HEADERS: dict[str, str | bytes] = {
+    "next-action": "cfc5966b4123c674815ce067b6b8894545c15604",
+    "next-router-state-tree": _NEXT_ROUTER_STATE_TREE,
+}
+# Server Action 响应只有两三行，读取上限足够容纳完整响应
+B4U_MAX_BODY_BYTES = 8192
+# 两个 Server Action 的请求体，预先编码为 bytes
+_B4U_STATUS_BODY = b"[]"
+_B4U_DRAW_BODY = b'[{"excludeThankYou":false}]'
+
+# 从浏览器指纹透传的 Client Hints 及缺省值
+_B4U_CLIENT_HINT_DEFAULTS: dict[str, str] = {
+    "sec-ch-ua": "",
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": "",
+    "sec-ch-ua-platform-version": "",
+    "sec-ch-ua-arch": "",
+    "sec-ch-ua-bitness": "",
+    "sec-ch-ua-full-version": "",
+    "sec-ch-ua-full-version-list": "",
+    "sec-ch-ua-model": '""',
+}
+
+
+def _build_b4u_headers(browser_headers: dict | None) -> dict[str, str]:
+    """根据浏览器指纹一次性构建 b4u 基础请求头，没有指纹时返回默认请求头"""
+    if not browser_headers:
+        return _BASE_HEADERS_B4U
+
+    headers = {**_BASE_HEADERS_B4U, "User-Agent": browser_headers.get("User-Agent", "")}
+    # 添加 Client Hints（如果有）
+    if "sec-ch-ua" in browser_headers:
+        headers.update(
+            {name: browser_headers.get(name, default) for name, default in _B4U_CLIENT_HINT_DEFAULTS.items()}
+        )
+    return headers
+
+
+async def _read_capped_body(response, limit: int) -> bytes:
+    """读取流式响应体的前 limit 字节后关闭响应，避免异常大的响应被完整读入内存"""
+    chunks = []
+    size = 0
+    try:
+        async for chunk in response.aiter_content():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                break
+    finally:
+        await response.aclose()
+    return b"".join(chunks)[:limit]
+
+
+def _extract_action_line(body: bytes, prefix: bytes = b"1:") -> str | None:
+    """从 Next.js Server Action（RSC）响应体中取出以 prefix 开头的那一行（不含 prefix）
+
+    用 rpartition / partition 两次 C 级查找取出该行，只解码这一行，不解码整个响应；找不到时返回 None
+    """
+    body = body.lstrip()
+    _, sep, tail = body.rpartition(b"\n" + prefix)
+    if not sep:
+        if not body.startswith(prefix):
+            return None
+        tail = body[len(prefix) :]
+    return tail.partition(b"\n")[0].rstrip().decode("utf-8", errors="replace")
+
+
+# cf_clearance 缓存：{代理 URL: (cf_cookies, browser_headers, 获取时间)}
+# cf_clearance 与出口 IP + 浏览器指纹绑定，同一代理的账号可以共用，有效期约 30 分钟
+_CF_CACHE: dict[str | None, tuple[dict, dict | None, float]] = {}
+CF_CLEARANCE_TTL = 1500
+
+
+async def _get_b4u_cf_clearance(
+    account_name: str, proxy_config: dict | None, http_proxy: str | None, use_cache: bool = True
+) -> tuple[dict | None, dict | None, bool]:
+    """获取 tw.b4u.qzz.io 的 cf_clearance，TTL 内直接返回缓存
+
+    Returns:
+        tuple: (cf_cookies, browser_headers, 是否来自缓存)
+    """
+    cached = _CF_CACHE.get(http_proxy)
+    if use_cache and cached and time.time() - cached[2] < CF_CLEARANCE_TTL:
+        print(f"ℹ️ {account_name}: Using cached cf_clearance for tw.b4u.qzz.io")
+        return cached[0], cached[1], True
+
+    _CF_CACHE.pop(http_proxy, None)
+    cf_cookies, browser_headers = await get_cf_clearance(
+        url="https://tw.b4u.qzz.io/luckydraw",
+        account_name=account_name,
+        proxy_config=proxy_config,
+    )
+    if cf_cookies and "cf_clearance" in cf_cookies:
+        _CF_CACHE[http_proxy] = (cf_cookies, browser_headers, time.time())
+    return cf_cookies, browser_headers, False
+
+
 async def get_b4u_cdk(
     account_config: "AccountConfig",
 ) -> AsyncGenerator[tuple[bool, dict], None]:
@@ -640,14 +1027,10 @@ async def get_b4u_cdk(
     proxy_config = account_config.proxy or account_config.get("global_proxy")
     http_proxy = proxy_resolve(proxy_config)
 
-    # 获取 cf_clearance cookie（使用公共方法，直接 await）
+    # 获取 cf_clearance cookie（同一代理在有效期内复用缓存）
     print(f"ℹ️ {account_name}: Getting cf_clearance for tw.b4u.qzz.io...")
     try:
-        cf_cookies, browser_headers = await get_cf_clearance(
-            url="https://tw.b4u.qzz.io/luckydraw",
-            account_name=account_name,
-            proxy_config=proxy_config,
-        )
+        cf_cookies, browser_headers, from_cache = await _get_b4u_cf_clearance(account_name, proxy_config, http_proxy)
     except Exception as e:
         print(f"❌ {account_name}: Failed to get cf_clearance: {e}")
         yield False, {"error": f"Failed to get cf_clearance: {e}"}
@@ -658,190 +1041,189 @@ async def get_b4u_cdk(
         yield False, {"error": "Failed to get cf_clearance for tw.b4u.qzz.io"}
         return
 
-    # 根据浏览器指纹选择 impersonate
-    user_agent = browser_headers.get("User-Agent", "") if browser_headers else ""
-    impersonate = get_curl_cffi_impersonate(user_agent) if user_agent else "firefox135"
-
-    try:
-        session = curl_requests.Session(impersonate=impersonate, proxy=http_proxy, timeout=30)
-        try:
-            # 构建基础请求头，使用浏览器指纹
-            if browser_headers:
-                headers = {
-                    "Accept": "text/x-component",
-                    "Accept-Language": "en,en-US;q=0.9,zh;q=0.8,en-CN;q=0.7,zh-CN;q=0.6",
-                    "Content-Type": "text/plain;charset=UTF-8",
-                    "Cache-Control": "no-store",
-                    "Pragma": "no-cache",
-                    "User-Agent": browser_headers.get("User-Agent", ""),
-                    "Origin": "https://tw.b4u.qzz.io",
-                    "Referer": "https://tw.b4u.qzz.io/luckydraw",
-                    "sec-fetch-dest": "empty",
-                    "sec-fetch-mode": "cors",
-                    "sec-fetch-site": "same-origin",
-                }
-                # 添加 Client Hints（如果有）
-                if "sec-ch-ua" in browser_headers:
-                    headers.update(
-                        {
-                            "sec-ch-ua": browser_headers.get("sec-ch-ua", ""),
-                            "sec-ch-ua-mobile": browser_headers.get("sec-ch-ua-mobile", "?0"),
-                            "sec-ch-ua-platform": browser_headers.get("sec-ch-ua-platform", ""),
-                            "sec-ch-ua-platform-version": browser_headers.get("sec-ch-ua-platform-version", ""),
-                            "sec-ch-ua-arch": browser_headers.get("sec-ch-ua-arch", ""),
-                            "sec-ch-ua-bitness": browser_headers.get("sec-ch-ua-bitness", ""),
-                            "sec-ch-ua-full-version": browser_headers.get("sec-ch-ua-full-version", ""),
-                            "sec-ch-ua-full-version-list": browser_headers.get("sec-ch-ua-full-version-list", ""),
-                            "sec-ch-ua-model": browser_headers.get("sec-ch-ua-model", '""'),
-                        }
-                    )
-            else:
-                headers = {
-                    "Accept": "text/x-component",
-                    "Accept-Language": "en,en-US;q=0.9,zh;q=0.8,en-CN;q=0.7,zh-CN;q=0.6",
-                    "Content-Type": "text/plain;charset=UTF-8",
-                    "Cache-Control": "no-store",
-                    "Pragma": "no-cache",
-                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36",
-                    "Origin": "https://tw.b4u.qzz.io",
-                    "Referer": "https://tw.b4u.qzz.io/luckydraw",    
-                    "sec-fetch-dest": "empty",
-                    "sec-fetch-mode": "cors",
-                    "sec-fetch-site": "same-origin",            
-                }
+    def prepare_request(cf_cookies: dict, browser_headers: dict | None):
+        """根据 cf_clearance 结果选择 session，并构建带 Cookie 的基础请求头"""
+        # 根据浏览器指纹选择 impersonate
+        user_agent = browser_headers.get("User-Agent", "") if browser_headers else ""
+        impersonate = get_curl_cffi_impersonate(user_agent) if user_agent else "firefox135"
+        session = get_pooled_async_session(http_proxy, impersonate)
+
+        # 合并 cf_clearance 和用户 cookies，一次性拼成 Cookie 请求头，
+        # 避免 curl_cffi 每次请求都由 cookies 参数重建 cookie jar
+        cookies = {**cf_cookies, **get_cdk_cookies, "i18next": "en"}
+        cookie_header = "; ".join(f"{name}={value}" for name, value in cookies.items())
+        headers = {**_build_b4u_headers(browser_headers), "Cookie": cookie_header}
+        return session, headers
+
+    async def post_action(session, headers: dict, data: bytes, max_retries: int) -> tuple[int, bytes]:
+        """以流式请求调用 Server Action，只读取响应体的前 B4U_MAX_BODY_BYTES 字节"""
+        response = await _rate_limited_post(
+            session,
+            "https://tw.b4u.qzz.io/luckydraw",
+            _B4U_LIMITER,
+            account_name,
+            max_retries=max_retries,
+            headers=headers,
+            data=data,
+            stream=True,
+        )
+        return response.status_code, await _read_capped_body(response, B4U_MAX_BODY_BYTES)
 
-            # 设置 cookies（合并 cf_clearance 和用户 cookies）
-            session.cookies.update(cf_cookies)
-            session.cookies.update(get_cdk_cookies)
-            session.cookies.set("i18next", "en")
+    def post_status(session, headers: dict):
+        return post_action(session, {**headers, **_B4U_STATUS_ACTION_HEADERS}, _B4U_STATUS_BODY, B4U_MAX_RETRIES)
 
-            # Next.js Server Actions 需要的 next-router-state-tree header
-            next_router_state_tree = "%5B%22%22%2C%7B%22children%22%3A%5B%22(dashboard)%22%2C%7B%22children%22%3A%5B%22luckydraw%22%2C%7B%22children%22%3A%5B%22__PAGE__%22%2C%7B%7D%2C%22%2Fluckydraw%22%2C%22refresh%22%5D%7D%5D%7D%5D%7D%2Cnull%2Cnull%2Ctrue%5D"
+    try:
+        session, headers = prepare_request(cf_cookies, browser_headers)
 
-            # ===== 第一步：检查抽奖状态 =====
-            status_headers = headers.copy()
-            status_headers["next-action"] = "7a7a7bf7f7c47cf1a8351d225a4338b0f017cd35"
-            status_headers["next-router-state-tree"] = next_router_state_tree
+        # ===== 第一步：检查抽奖状态 =====
+        status_code, body = await post_status(session, headers)
 
-            status_response = session.post(
-                "https://tw.b4u.qzz.io/luckydraw",
-                headers=status_headers,
-                data="[]",
-                timeout=30,
+        # 缓存的 cf_clearance 可能已被 Cloudflare 作废，重新获取后重试一次
+        if status_code == 403 and from_cache:
+            print(f"⚠️ {account_name}: Cached cf_clearance rejected (HTTP 403), refreshing...")
+            cf_cookies, browser_headers, _ = await _get_b4u_cf_clearance(
+                account_name, proxy_config, http_proxy, use_cache=False
             )
+            if not cf_cookies or "cf_clearance" not in cf_cookies:
+                print(f"❌ {account_name}: Failed to get cf_clearance for tw.b4u.qzz.io, cannot proceed")
+                yield False, {"error": "Failed to get cf_clearance for tw.b4u.qzz.io"}
+                return
+            session, headers = prepare_request(cf_cookies, browser_headers)
+            status_code, body = await post_status(session, headers)
+
+        remaining = 0
+        if status_code == 200:
+            # 解析响应，格式如: 0:["$@1",["xxx",null]]\n1:1
+            # 其中 "1:N" 的 N 表示剩余抽奖次数
+            # 原始响应只在 DEBUG 级别解码输出
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "%s: Luckydraw status response: %.200s", account_name, body.decode("utf-8", errors="replace")
+                )
 
-            import json
+            # 解析剩余次数
+            remaining_str = _extract_action_line(body)
+            if remaining_str is not None:
+                # 先判断是否为整数（至多一个前导负号 + ASCII 数字），避免非数字内容走 int() 的异常路径；
+                # isdigit 会接受 "²" 等 int() 无法解析的字符，因此用 isascii + isdecimal
+                digits = remaining_str[1:] if remaining_str.startswith("-") else remaining_str
+                if digits.isascii() and digits.isdecimal():
+                    remaining = int(remaining_str)
+                    print(f"ℹ️ {account_name}: Remaining draws: {remaining}")
+                else:
+                    # 不是数字，可能是其他格式
+                    print(f"⚠️ {account_name}: Could not parse remaining draws, trying once")
+                    remaining = 1
+        else:
+            print(f"⚠️ {account_name}: Failed to check luckydraw status, HTTP {status_code}")
+            # 即使状态检查失败，也尝试抽奖一次
+            remaining = 1
+
+        if remaining <= 0:
+            print(f"ℹ️ {account_name}: No draws remaining today")
+            # 没有抽奖次数，返回成功但 code 为空
+            yield True, {"code": ""}
+            return
 
-            remaining = 0
-            if status_response.status_code == 200:
-                # 解析响应，格式如: 0:["$@1",["xxx",null]]\n1:1
-                # 其中 "1:N" 的 N 表示剩余抽奖次数
-                response_text = status_response.text
-                print(f"ℹ️ {account_name}: Luckydraw status response: {response_text[:200]}")
-
-                # 解析剩余次数
-                lines = response_text.strip().split("\n")
-                for line in lines:
-                    if line.startswith("1:"):
-                        try:
-                            remaining = int(line[2:])
-                            print(f"ℹ️ {account_name}: Remaining draws: {remaining}")
-                        except ValueError:
-                            # 不是数字，可能是其他格式
-                            print(f"⚠️ {account_name}: Could not parse remaining draws, trying once")
-                            remaining = 1
-                        break
-            else:
-                print(f"⚠️ {account_name}: Failed to check luckydraw status, HTTP {status_response.status_code}")
-                # 即使状态检查失败，也尝试抽奖一次
-                remaining = 1
+        # ===== 第二步：分批并发抽奖直到次数用完 =====
+        draw_headers = {**headers, **_B4U_DRAW_ACTION_HEADERS}
+
+        draw_count = 0
+        # 循环内每次响应都会用到，先绑定到局部变量
+        extract_action_line = _extract_action_line
+        json_loads = json.loads
+        json_decode_error = json.JSONDecodeError
+        # 第一批只抽一次，确认服务端仍接受抽奖后，后续每批最多并发 B4U_MAX_PARALLEL_DRAWS 次
+        batch_size = 1
+        while remaining > 0:
+            batch_size = min(remaining, batch_size)
+            results = await asyncio.gather(
+                *(post_action(session, draw_headers, _B4U_DRAW_BODY, 0) for _ in range(batch_size)),
+                return_exceptions=True,
+            )
 
-            if remaining <= 0:
-                print(f"ℹ️ {account_name}: No draws remaining today")
-                # 没有抽奖次数，返回成功但 code 为空
-                yield True, {"code": ""}
-                return
+            stop = False
+            server_remaining = None
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"❌ {account_name}: Luckydraw failed - {result}")
+                    yield False, {"error": f"Luckydraw failed - {result}"}
+                    stop = True
+                    continue
+                status_code, body = result
+                if status_code != 200:
+                    print(f"❌ {account_name}: Luckydraw failed - HTTP {status_code}")
+                    yield False, {"error": f"Luckydraw failed - HTTP {status_code}"}
+                    stop = True
+                    continue
+
+                # 原始响应只在 DEBUG 级别解码输出，%.300s 的截断在格式化时才执行
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "%s: Luckydraw response: %.300s", account_name, body.decode("utf-8", errors="replace")
+                    )
 
-            # ===== 第二步：循环执行抽奖直到次数用完 =====
-            draw_headers = headers.copy()
-            draw_headers["next-action"] = "cfc5966b4123c674815ce067b6b8894545c15604"
-            draw_headers["next-router-state-tree"] = next_router_state_tree
+                # 解析响应，格式如:
+                # 0:["$@1",["xxx",null]]
+                # 1:{"success":true,"message":"...","prize":{...},"redemptionCode":"xxx"}
+                json_str = extract_action_line(body)
+                if json_str is None:
+                    # 如果没有找到有效的 JSON 响应
+                    print(f"⚠️ {account_name}: Could not parse luckydraw response")
+                    stop = True
+                    continue
+
+                # 纯数字（如 "1:0" 表示已抽完）时直接作为服务端剩余次数，不走 JSON 解析；
+                # 并发响应的先后顺序不确定，取最小值；isascii + isdecimal 保证 int() 一定能解析
+                if json_str.isascii() and json_str.isdecimal():
+                    value = int(json_str)
+                    server_remaining = value if server_remaining is None else min(server_remaining, value)
+                    if value <= 0:
+                        print(f"ℹ️ {account_name}: No more draws remaining")
+                    continue
 
-            draw_count = 0
-            while remaining > 0:
-                response = session.post(
-                    "https://tw.b4u.qzz.io/luckydraw",
-                    headers=draw_headers,
-                    data='[{"excludeThankYou":false}]',
-                    timeout=30,
-                )
+                try:
+                    json_data = json_loads(json_str)
+                except json_decode_error:
+                    print(f"⚠️ {account_name}: Could not parse luckydraw response")
+                    stop = True
+                    continue
+
+                if not isinstance(json_data, dict):
+                    print(f"⚠️ {account_name}: Unexpected luckydraw response format")
+                    stop = True
+                elif json_data.get("success"):
+                    redemption_code = json_data.get("redemptionCode", "")
+                    prize = json_data.get("prize", {})
+                    prize_name = prize.get("name", "Unknown")
+                    message = json_data.get("message", "")
 
-                if response.status_code == 200:
-                    response_text = response.text
-                    print(f"ℹ️ {account_name}: Luckydraw response #{draw_count + 1}: {response_text[:300]}")
-
-                    # 解析响应，格式如:
-                    # 0:["$@1",["xxx",null]]
-                    # 1:{"success":true,"message":"...","prize":{...},"redemptionCode":"xxx"}
-
-                    # 尝试从响应中提取 JSON 部分
-                    # 查找以 "1:" 开头的行
-                    lines = response_text.strip().split("\n")
-                    for line in lines:
-                        if line.startswith("1:"):
-                            json_str = line[2:]  # 去掉 "1:" 前缀
-                            try:
-                                json_data = json.loads(json_str)
-                                if isinstance(json_data, dict):
-                                    if json_data.get("success"):
-                                        redemption_code = json_data.get("redemptionCode", "")
-                                        prize = json_data.get("prize", {})
-                                        prize_name = prize.get("name", "Unknown")
-                                        message = json_data.get("message", "")
-
-                                        if redemption_code:
-                                            draw_count += 1
-                                            remaining -= 1
-                                            print(
-                                                f"✅ {account_name}: Luckydraw #{draw_count} successful! Prize: {prize_name}, Code: {redemption_code}, remaining: {remaining}"
-                                            )
-                                            yield True, {"code": redemption_code}
-                                        else:
-                                            print(
-                                                f"⚠️ {account_name}: Luckydraw successful but no redemption code: {message}"
-                                            )
-                                            remaining -= 1
-                                    else:
-                                        message = json_data.get("message", "Unknown error")
-                                        print(f"❌ {account_name}: Luckydraw failed - {message}")
-                                        yield False, {"error": f"Luckydraw failed - {message}"}
-                                        remaining = 0  # 失败时停止
-                                        break
-                            except json.JSONDecodeError:
-                                # 如果不是 JSON，可能是数字（如 "1:0" 表示已抽完）
-                                try:
-                                    new_remaining = int(json_str)
-                                    if new_remaining == 0:
-                                        print(f"ℹ️ {account_name}: No more draws remaining")
-                                        remaining = 0
-                                except ValueError:
-                                    pass
-                                continue
-                            break
+                    if redemption_code:
+                        draw_count += 1
+                        print(
+                            f"✅ {account_name}: Luckydraw #{draw_count} successful! Prize: {prize_name}, Code: {redemption_code}"
+                        )
+                        yield True, {"code": redemption_code}
                     else:
-                        # 如果没有找到有效的 JSON 响应
-                        print(f"⚠️ {account_name}: Could not parse luckydraw response")
-                        remaining = 0
+                        print(f"⚠️ {account_name}: Luckydraw successful but no redemption code: {message}")
                 else:
-                    print(f"❌ {account_name}: Luckydraw failed - HTTP {response.status_code}")
-                    yield False, {"error": f"Luckydraw failed - HTTP {response.status_code}"}
-                    remaining = 0
+                    message = json_data.get("message", "Unknown error")
+                    print(f"❌ {account_name}: Luckydraw failed - {message}")
+                    yield False, {"error": f"Luckydraw failed - {message}"}
+                    stop = True  # 失败时停止
+
+            if stop:
+                break
+            # 本批每次请求都已消耗次数，服务端返回了剩余次数时取较小值，保证循环一定会结束
+            remaining -= batch_size
+            if server_remaining is not None:
+                remaining = min(remaining, server_remaining)
+            if remaining > 0:
+                print(f"ℹ️ {account_name}: {remaining} draw(s) remaining")
+            batch_size = B4U_MAX_PARALLEL_DRAWS
 
-            if draw_count > 0:
-                print(f"✅ {account_name}: Total {draw_count} CDK(s) obtained from luckydraw")
-        finally:
-            session.close()
+        if draw_count > 0:
+            print(f"✅ {account_name}: Total {draw_count} CDK(s) obtained from luckydraw")
     except Exception as e:
         print(f"❌ {account_name}: Error getting b4u CDK - {e}")
         yield False, {"error": f"Error getting b4u CDK - {e}"}
@@ -7,6 +7,7 @@ Cloudflare cf_clearance cookie 获取模块
 
 from __future__ import annotations
 
+import asyncio
 import tempfile
 from camoufox.async_api import AsyncCamoufox
 from playwright_captcha import CaptchaType, ClickSolver, FrameworkType
@@ -62,75 +63,157 @@ async def get_cf_clearance(
                 "forceScopeAccess": True,
             }
         ) as browser:
-            page = await browser.new_page()
+            return await _solve_cf_clearance(browser, url, account_name)
+
+
+async def _solve_cf_clearance(
+    browser,
+    url: str,
+    account_name: str,
+) -> tuple[dict | None, dict | None]:
+    """在给定的浏览器上下文中打开新页面，解决 Cloudflare 验证并读取 cookies 与浏览器指纹
+
+    Args:
+        browser: Camoufox 持久化上下文或 browser.new_context() 创建的上下文
+        url: 目标 URL
+        account_name: 账号名称，用于日志输出
+
+    Returns:
+        tuple: (cf_cookies, browser_headers)，与 get_cf_clearance 相同
+    """
+    page = await browser.new_page()
+    
+    try:
+        print(f"ℹ️ {account_name}: Access {url} to trigger Cloudflare challenge")
+        
+        async with ClickSolver(
+            framework=FrameworkType.CAMOUFOX,
+            page=page,
+            max_attempts=5,
+            attempt_delay=3
+        ) as solver:
+            await page.goto(url, wait_until="networkidle")
+            await page.wait_for_timeout(5000)
             
-            try:
-                print(f"ℹ️ {account_name}: Access {url} to trigger Cloudflare challenge")
-                
-                async with ClickSolver(
-                    framework=FrameworkType.CAMOUFOX,
-                    page=page,
-                    max_attempts=5,
-                    attempt_delay=3
-                ) as solver:
-                    await page.goto(url, wait_until="networkidle")
-                    await page.wait_for_timeout(5000)
-                    
-                    # 检查是否在 Cloudflare 验证页面
-                    page_title = await page.title()
-                    page_content = await page.content()
-                    
-                    if "Just a moment" in page_title or "Checking your browser" in page_content:
-                        print(f"ℹ️ {account_name}: Cloudflare challenge detected, auto-solving...")
-                        try:
-                            await solver.solve_captcha(
-                                captcha_container=page,
-                                captcha_type=CaptchaType.CLOUDFLARE_INTERSTITIAL
-                            )
-                            print(f"✅ {account_name}: Cloudflare challenge auto-solved")
-                            await page.wait_for_timeout(10000)
-                        except Exception as solve_err:
-                            print(f"⚠️ {account_name}: Auto-solve failed: {solve_err}, waiting for manual verification...")
-                            # 自动求解失败，回退到手动等待
-                            await wait_for_cf_clearance_manually(browser, page, account_name)
-                    else:
-                        print(f"ℹ️ {account_name}: No Cloudflare challenge detected")
-                        # 不需要手动操作，但需要等待后台完成 Cloudflare 验证
-                        await wait_for_cf_clearance_manually(browser, page, account_name)
-                
-                # 获取所有 cookies
-                cookies = await browser.cookies()
-                
-                cf_cookies = {}
-                for cookie in cookies:
-                    cookie_name = cookie.get("name")
-                    cookie_value = cookie.get("value")
-                    print(f"  📚 Cookie: {cookie_name} (value: {cookie_value[:50] if cookie_value and len(cookie_value) > 50 else cookie_value}...)")
-                    if cookie_name in ["cf_clearance", "__cf_bm", "cf_chl_2", "cf_chl_prog"] and cookie_value is not None:
-                        cf_cookies[cookie_name] = cookie_value
-                
-                print(f"ℹ️ {account_name}: Got {len(cf_cookies)} Cloudflare cookies")
-                
-                # 获取浏览器指纹信息
-                browser_headers = await get_browser_headers(page)
-                print_browser_headers(account_name, browser_headers)
-                
-                # 检查是否获取到 cf_clearance cookie
-                if "cf_clearance" not in cf_cookies:
-                    print(f"⚠️ {account_name}: cf_clearance cookie not obtained")
-                    return None, browser_headers
-                
-                cookie_names = list(cf_cookies.keys())
-                print(f"✅ {account_name}: Successfully got Cloudflare cookies: {cookie_names}")
-                
-                return cf_cookies, browser_headers
-                
-            except Exception as e:
-                print(f"⚠️ {account_name}: Error getting cf_clearance: {e}")
-                return None, None
+            # 检查是否在 Cloudflare 验证页面
+            page_title = await page.title()
+            page_content = await page.content()
             
-            finally:
-                await page.close()
+            if "Just a moment" in page_title or "Checking your browser" in page_content:
+                print(f"ℹ️ {account_name}: Cloudflare challenge detected, auto-solving...")
+                try:
+                    await solver.solve_captcha(
+                        captcha_container=page,
+                        captcha_type=CaptchaType.CLOUDFLARE_INTERSTITIAL
+                    )
+                    print(f"✅ {account_name}: Cloudflare challenge auto-solved")
+                    await page.wait_for_timeout(10000)
+                except Exception as solve_err:
+                    print(f"⚠️ {account_name}: Auto-solve failed: {solve_err}, waiting for manual verification...")
+                    # 自动求解失败，回退到手动等待
+                    await wait_for_cf_clearance_manually(browser, page, account_name)
+            else:
+                print(f"ℹ️ {account_name}: No Cloudflare challenge detected")
+                # 不需要手动操作，但需要等待后台完成 Cloudflare 验证
+                await wait_for_cf_clearance_manually(browser, page, account_name)
+        
+        # 获取所有 cookies
+        cookies = await browser.cookies()
+        
+        cf_cookies = {}
+        for cookie in cookies:
+            cookie_name = cookie.get("name")
+            cookie_value = cookie.get("value")
+            print(f"  📚 Cookie: {cookie_name} (value: {cookie_value[:50] if cookie_value and len(cookie_value) > 50 else cookie_value}...)")
+            if cookie_name in ["cf_clearance", "__cf_bm", "cf_chl_2", "cf_chl_prog"] and cookie_value is not None:
+                cf_cookies[cookie_name] = cookie_value
+        
+        print(f"ℹ️ {account_name}: Got {len(cf_cookies)} Cloudflare cookies")
+        
+        # 获取浏览器指纹信息
+        browser_headers = await get_browser_headers(page)
+        print_browser_headers(account_name, browser_headers)
+        
+        # 检查是否获取到 cf_clearance cookie
+        if "cf_clearance" not in cf_cookies:
+            print(f"⚠️ {account_name}: cf_clearance cookie not obtained")
+            return None, browser_headers
+        
+        cookie_names = list(cf_cookies.keys())
+        print(f"✅ {account_name}: Successfully got Cloudflare cookies: {cookie_names}")
+        
+        return cf_cookies, browser_headers
+        
+    except Exception as e:
+        print(f"⚠️ {account_name}: Error getting cf_clearance: {e}")
+        return None, None
+    
+    finally:
+        await page.close()
+
+
+class BrowserPool:
+    """多账号共享一个 Camoufox 浏览器获取 cf_clearance
+
+    只启动一次浏览器，每个账号使用独立的 context（cookie 隔离）并行打开页面，
+    省去逐个账号启动浏览器的开销。
+    """
+
+    def __init__(self, proxy_config: dict | None = None, max_pages: int = 4):
+        """
+        Args:
+            proxy_config: 代理配置，格式同 get_cf_clearance
+            max_pages: 同时打开的最大页面数
+        """
+        self.proxy_config = proxy_config
+        self.max_pages = max(1, max_pages)
+
+    async def get_many(
+        self, urls_and_accounts: list[tuple[str, str]]
+    ) -> dict[str, tuple[dict | None, dict | None]]:
+        """并行获取多个账号的 cf_clearance
+
+        Args:
+            urls_and_accounts: [(url, account_name), ...]
+
+        Returns:
+            dict: {account_name: (cf_cookies, browser_headers)}，单个账号失败时为 (None, None)
+        """
+        if not urls_and_accounts:
+            return {}
+
+        print(
+            f"ℹ️ Starting shared browser to get cf_clearance for {len(urls_and_accounts)} accounts "
+            f"(using proxy: {'true' if self.proxy_config else 'false'})"
+        )
+        sem = asyncio.Semaphore(self.max_pages)
+
+        async with AsyncCamoufox(
+            headless=False,
+            humanize=True,
+            locale="en-US",
+            geoip=True if self.proxy_config else False,
+            proxy=self.proxy_config,
+            os="macos",
+            config={
+                "forceScopeAccess": True,
+            }
+        ) as browser:
+
+            async def solve(url: str, account_name: str) -> tuple[dict | None, dict | None]:
+                async with sem:
+                    context = await browser.new_context()
+                    try:
+                        return await _solve_cf_clearance(context, url, account_name)
+                    except Exception as e:
+                        print(f"⚠️ {account_name}: Error getting cf_clearance: {e}")
+                        return None, None
+                    finally:
+                        await context.close()
+
+            results = await asyncio.gather(*(solve(url, account_name) for url, account_name in urls_and_accounts))
+
+        return {account_name: result for (_, account_name), result in zip(urls_and_accounts, results)}
 
 
 async def wait_for_cf_clearance_manually(
@@ -4,9 +4,17 @@
 用于 Cloudflare cf_clearance cookie 验证时保持指纹一致性
 """
 
+import functools
 import re
 
+# 预编译 User-Agent 版本匹配
+FIREFOX_VERSION_RE = re.compile(r'Firefox/(\d+)')
+CHROME_VERSION_RE = re.compile(r'Chrome/(\d+)')
+SAFARI_VERSION_RE = re.compile(r'Version/(\d+)\.(\d+)')
+EDGE_VERSION_RE = re.compile(r'Edg/(\d+)')
 
+
+@functools.lru_cache(maxsize=64)
 def get_curl_cffi_impersonate(user_agent: str) -> str:
     """根据 User-Agent 获取 curl_cffi 的 impersonate 值
     
@@ -21,9 +29,11 @@ def get_curl_cffi_impersonate(user_agent: str) -> str:
         
     Returns:
         curl_cffi impersonate 值，如 "firefox135", "chrome131" 等
+
+    多账号时 User-Agent 大多相同，结果按 User-Agent 缓存。
     """
     # 检测 Firefox
-    firefox_match = re.search(r'Firefox/(\d+)', user_agent)
+    firefox_match = FIREFOX_VERSION_RE.search(user_agent)
     if firefox_match:
         version = int(firefox_match.group(1))
         # 选择最接近的支持版本
@@ -35,7 +45,7 @@ def get_curl_cffi_impersonate(user_agent: str) -> str:
             return "firefox133"
     
     # 检测 Chrome
-    chrome_match = re.search(r'Chrome/(\d+)', user_agent)
+    chrome_match = CHROME_VERSION_RE.search(user_agent)
     if chrome_match:
         version = int(chrome_match.group(1))
         # 选择最接近的支持版本
@@ -71,7 +81,7 @@ def get_curl_cffi_impersonate(user_agent: str) -> str:
             return "chrome99"
     
     # 检测 Safari
-    safari_match = re.search(r'Version/(\d+)\.(\d+)', user_agent)
+    safari_match = SAFARI_VERSION_RE.search(user_agent)
     if safari_match and 'Safari' in user_agent and 'Chrome' not in user_agent:
         major = int(safari_match.group(1))
         minor = int(safari_match.group(2))
@@ -101,7 +111,7 @@ def get_curl_cffi_impersonate(user_agent: str) -> str:
             return "safari153"
     
     # 检测 Edge
-    edge_match = re.search(r'Edg/(\d+)', user_agent)
+    edge_match = EDGE_VERSION_RE.search(user_agent)
     if edge_match:
         version = int(edge_match.group(1))
         if version >= 101:
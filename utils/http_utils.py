@@ -3,13 +3,34 @@
 响应处理工具函数
 """
 
+import asyncio
 import json
 import os
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urlparse, urlunparse
 
+from curl_cffi import CurlOpt
 from curl_cffi import requests as curl_requests
 
+try:
+    # C 扩展解析器，比标准库 json 快数倍；未安装时回退到标准库
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 共享 Session 的默认超时 (连接, 读取)，请求未显式传 timeout 时使用
+_SESSION_TIMEOUT = (5, 30)
+# libcurl 默认已开启 TCP_NODELAY；再开启 TCP keepalive，保持连接池中空闲连接可复用。
+# PIPEWAIT: 并发请求优先等待并复用同一 HTTP/2 连接多路复用，而不是各自新建连接
+_SESSION_CURL_OPTIONS = {CurlOpt.TCP_KEEPALIVE: 1, CurlOpt.PIPEWAIT: 1}
+
+# 进程内共享的 AsyncSession，复用连接池避免每次请求重新握手；
+# AsyncSession 绑定事件循环，按 (loop, proxy, impersonate) 区分
+_ASYNC_SESSION_POOL: dict[tuple[asyncio.AbstractEventLoop, str | None, str | None], curl_requests.AsyncSession] = {}
+
 
 def proxy_resolve(proxy_config: dict | None = None) -> str | None:
     """将 proxy_config 转换为代理 URL 字符串
@@ -23,13 +44,15 @@ def proxy_resolve(proxy_config: dict | None = None) -> str | None:
     if not proxy_config:
         return None
 
-    proxy_url = proxy_config.get("server")
+    return _build_proxy_url(proxy_config.get("server"), proxy_config.get("username"), proxy_config.get("password"))
+
+
+@lru_cache(maxsize=128)
+def _build_proxy_url(proxy_url: str | None, username: str | None, password: str | None) -> str | None:
+    """按 (server, username, password) 缓存代理 URL，多个账号共用同一代理时只解析一次"""
     if not proxy_url:
         return None
 
-    username = proxy_config.get("username")
-    password = proxy_config.get("password")
-
     if username and password:
         # 解析 URL 并添加认证信息
         parsed = urlparse(proxy_url)
@@ -42,6 +65,42 @@ def proxy_resolve(proxy_config: dict | None = None) -> str | None:
     return proxy_url
 
 
+def get_pooled_async_session(proxy: str | None = None, impersonate: str | None = None) -> curl_requests.AsyncSession:
+    """获取当前事件循环中 (proxy, impersonate) 对应的共享 AsyncSession
+
+    共享 Session 不绑定任何账号，也不保存响应 cookies：账号 cookies 应通过每次请求的
+    cookies 参数传入，不要修改 session.cookies，调用方也不应关闭返回的 Session；
+    事件循环结束前由入口调用 close_pooled_async_sessions 统一关闭。
+
+    Args:
+        proxy: 代理 URL（proxy_resolve 的返回值）
+        impersonate: curl_cffi 浏览器指纹，None 表示不模拟
+
+    Returns:
+        共享的 curl_cffi AsyncSession
+    """
+    key = (asyncio.get_running_loop(), proxy, impersonate)
+    session = _ASYNC_SESSION_POOL.get(key)
+    if session is None:
+        # discard_cookies: 响应的 Set-Cookie 不写入 session cookie jar，避免一个账号的 cookies 泄漏到下一个账号
+        session = curl_requests.AsyncSession(
+            proxy=proxy,
+            impersonate=impersonate,
+            timeout=_SESSION_TIMEOUT,
+            discard_cookies=True,
+            curl_options=_SESSION_CURL_OPTIONS,
+        )
+        _ASYNC_SESSION_POOL[key] = session
+    return session
+
+
+async def close_pooled_async_sessions() -> None:
+    """关闭当前事件循环中的所有共享 AsyncSession"""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _ASYNC_SESSION_POOL if key[0] is loop]:
+        await _ASYNC_SESSION_POOL.pop(key).close()
+
+
 def response_resolve(
     response: curl_requests.Response,
     context: str,
@@ -57,16 +116,17 @@ def response_resolve(
     Returns:
         JSON 数据字典，如果响应是 HTML 则返回 None
     """
-    safe_account_name = "".join(c if c.isalnum() else "_" for c in account_name)
-
-    logs_dir = "logs"
-    os.makedirs(logs_dir, exist_ok=True)
-
     try:
-        return response.json()
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类；两者都接受 bytes
+        return _json_loads(response.content)
     except json.JSONDecodeError as e:
         print(f"❌ {account_name}: Failed to parse JSON response: {e}")
 
+        # 只有解析失败需要落盘时才创建日志目录，正常响应不做任何文件系统操作
+        safe_account_name = "".join(c if c.isalnum() else "_" for c in account_name)
+        logs_dir = "logs"
+        os.makedirs(logs_dir, exist_ok=True)
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_context = "".join(c if c.isalnum() else "_" for c in context)
 